@@ -0,0 +1,54 @@
+"""Times the ``backtest`` command on a price cache filled with synthetic multi-year histories.
+
+Usage: ``python -m benchmarks.bench_backtest --tickers 3000 --years 5``
+"""
+
+import argparse
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.backtest import BacktestCommand
+from src.price_store import PriceStore
+from src.rule_engine import RuleSet
+
+from .synthetic import synthetic_history, synthetic_tickers
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--horizons", type=int, nargs="+", default=[5, 20, 60])
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    # one extra year of history warms up the indicators before the first counted bar
+    days = (args.years + 1) * 252
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        store = PriceStore(data_dir)
+        start = time.perf_counter()
+        for ticker in tickers:
+            store.write(ticker, synthetic_history(ticker, days))
+        store.flush()
+        print(f"{len(tickers)} tickers x {days} bars cached in {time.perf_counter() - start:.1f}s")
+
+        command = BacktestCommand()
+        command._store = store
+        cutoff = np.datetime64(pd.Timestamp.now().normalize() - pd.DateOffset(years=args.years), "D")
+
+        start = time.perf_counter()
+        stats = command.backtest(tickers, RuleSet.load(), cutoff, args.horizons, top=False)
+        elapsed = time.perf_counter() - start
+
+    row = command.summarize("All", "", stats, list(range(len(tickers))), args.horizons)
+    print(f"backtest: {elapsed:.1f}s  {len(tickers) * days / elapsed:,.0f} ticker-days/s")
+    for horizon in args.horizons:
+        print(f"  {horizon:>3}d: {row[f'Signals {horizon}d']} signals")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Measures the CLI startup time with ``python -X importtime`` so import regressions are visible.
+
+Runs ``rules.py`` with each scenario's arguments in a fresh interpreter, sums the import times it reports, lists the
+slowest top-level imports, and checks that ``rules.py --help`` does not import any of the heavy libraries the
+commands use. Exits with status 1 when a check or the ``--max-help-ms`` budget fails.
+
+Usage: ``python -m benchmarks.bench_import_time [--repeat 5] [--max-help-ms 150] [--output results.json]``
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "help": ["--help"],
+    "rule-runner": ["rule-runner", "--help"],
+    "backtest": ["backtest", "--help"],
+    "serve": ["serve", "--help"],
+    "sweep": ["sweep", "--help"],
+    "market-value": ["market-value", "--help"],
+    "import": ["import", "--help"],
+}
+
+# none of these may be imported just to print the list of commands
+HEAVY_MODULES = ["pandas", "numpy", "plotly", "yfinance", "jinja2", "requests", "rich", "dotenv", "openpyxl"]
+
+
+def measure(args: list[str]) -> dict:
+    """Runs ``rules.py`` once with ``-X importtime`` and returns the wall time and the parsed import times."""
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", os.path.join(ROOT, "rules.py"), *args],
+        cwd=ROOT,
+        stdin=subprocess.DEVNULL,
+        capture_output=True,
+        text=True,
+    )
+    wall = time.perf_counter() - start
+
+    modules = {}
+    top_level = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_part, cumulative_part, name = line.split("|")
+        self_us = int(self_part.split(":")[1])
+        cumulative_us = int(cumulative_part)
+        module = name.strip()
+        modules[module] = self_us
+        # nested imports are indented below the module that triggered them
+        if len(name) - len(name.lstrip()) == 1:
+            top_level[module] = cumulative_us
+    return {"wall_ms": wall * 1000, "import_ms": sum(modules.values()) / 1000, "modules": modules, "top": top_level}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per scenario, the median is reported")
+    parser.add_argument("--top", type=int, default=5, help="slowest top-level imports to list per scenario")
+    parser.add_argument("--max-help-ms", type=float, help="fail when the median import time of --help exceeds this")
+    parser.add_argument("--output", help="also write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    failed = False
+    results = {}
+    for scenario, scenario_args in SCENARIOS.items():
+        runs = [measure(scenario_args) for _ in range(args.repeat)]
+        wall_ms = statistics.median(r["wall_ms"] for r in runs)
+        import_ms = statistics.median(r["import_ms"] for r in runs)
+        slowest = sorted(runs[-1]["top"].items(), key=lambda item: -item[1])[: args.top]
+        results[scenario] = {"wall_ms": wall_ms, "import_ms": import_ms, "slowest": dict(slowest)}
+
+        print(f"{' '.join(scenario_args):<24} wall: {wall_ms:7.1f}ms  imports: {import_ms:7.1f}ms")
+        for module, cumulative_us in slowest:
+            print(f"    {cumulative_us / 1000:7.1f}ms  {module}")
+
+        if scenario == "help":
+            heavy = sorted(m for m in runs[-1]["modules"] if m.split(".")[0] in HEAVY_MODULES)
+            if heavy:
+                failed = True
+                print(f"❌ --help imports {', '.join(sorted({m.split('.')[0] for m in heavy}))}")
+            if args.max_help_ms is not None and import_ms > args.max_help_ms:
+                failed = True
+                print(f"❌ --help imports took {import_ms:.1f}ms, the budget is {args.max_help_ms:.1f}ms")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print("❌ startup checks failed" if failed else "✅ startup checks passed")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
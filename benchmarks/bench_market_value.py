@@ -0,0 +1,69 @@
+"""Times the vectorized portfolio valuation of ``market-value`` and checks it against a per-lot loop.
+
+Usage: ``python -m benchmarks.bench_market_value --lots 5000 --symbols 200 --accounts 4``
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.portfolio import value_portfolio
+
+from .synthetic import synthetic_history
+
+
+def synthetic_lots(symbols: list[str], dates: pd.DatetimeIndex, lots: int, accounts: int) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(
+        {
+            "account": [f"account-{i}" for i in rng.integers(0, accounts, lots)],
+            "symbol": rng.choice(symbols, lots),
+            # calendar dates, so that weekend purchases roll to the next bar
+            "date": dates[0] + pd.to_timedelta(rng.integers(0, (dates[-1] - dates[0]).days + 30, lots), unit="D"),
+            "shares": rng.integers(-20, 100, lots).astype(float),
+            "price": np.where(rng.random(lots) < 0.5, np.nan, rng.uniform(10, 100, lots)),
+        }
+    )
+
+
+def value_with_loop(lots: pd.DataFrame, close: pd.DataFrame) -> pd.DataFrame:
+    """The per-lot ``searchsorted`` and ``.loc`` loop the command used before."""
+    close = close.ffill()
+    shares = pd.DataFrame(0.0, index=close.index, columns=close.columns)
+    for lot in lots.itertuples():
+        position = close.index.searchsorted(lot.date)
+        if position < len(close):
+            shares.iloc[position, close.columns.get_loc(lot.symbol)] += lot.shares
+    return shares.cumsum() * close.fillna(0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lots", type=int, default=5000)
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--accounts", type=int, default=4)
+    parser.add_argument("--days", type=int, default=1300)
+    args = parser.parse_args()
+
+    symbols = [f"S{i:04d}" for i in range(args.symbols)]
+    close = pd.DataFrame({s: synthetic_history(s, args.days)["Close"] for s in symbols})
+    lots = synthetic_lots(symbols, close.index, args.lots, args.accounts)
+
+    start = time.perf_counter()
+    valuation = value_portfolio(lots, close)
+    vectorized_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = value_with_loop(lots, close)
+    loop_time = time.perf_counter() - start
+
+    agree = np.allclose(valuation.market_value.to_numpy(), expected.to_numpy())
+    print(f"{len(lots)} lots, {len(symbols)} symbols, {len(close)} days")
+    print(f"vectorized: {vectorized_time:.3f}s  loop: {loop_time:.3f}s  speed-up: {loop_time / vectorized_time:.0f}x")
+    print("✅ market values agree" if agree else "❌ market values differ")
+
+
+if __name__ == "__main__":
+    main()
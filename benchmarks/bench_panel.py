@@ -0,0 +1,150 @@
+"""Compares the vectorized panel screener with the per-ticker screens on synthetic data.
+
+The reference is the per-ticker screen the panel replaced, ``baseline_row()``: pandas rolling columns and ``ta``'s RSI
+and MACD for every ticker. The rule engine's per-ticker path, which ``rule-runner`` uses without ``--panel``, is timed
+as well. Checks that all three produce the same result rows (numeric fields within a tolerance) and reports the
+speed-ups of the panel.
+
+Usage: ``python -m benchmarks.bench_panel --tickers 5000``
+"""
+
+import argparse
+import math
+import time
+
+import pandas as pd
+
+from src.panel_screener import screen_panel
+from src.rule_engine import Result, RuleSet
+from src.rule_runner import RuleRunnerCommand
+
+from .synthetic import synthetic_history, synthetic_tickers
+
+
+def baseline_row(ticker: str, df: pd.DataFrame) -> dict:
+    """The result row of the per-ticker screen before the rule engine and the panel, with the Core Criteria Score as
+    a count instead of squares.
+
+    ``ta`` is no longer a dependency, its ``RSIIndicator`` and ``MACD`` are the ``ewm()`` calls they made.
+    """
+    if df.empty or len(df) < 60:
+        return {"Ticker": ticker, "Error": "Not enough data"}
+
+    df["50dma"] = df["Close"].rolling(window=50).mean()
+    df["10ema"] = df["Close"].ewm(span=10).mean()
+    df["volume_avg_20"] = df["Volume"].rolling(window=20).mean()
+    df["max_20d"] = df["Close"].rolling(window=20).max()
+    df["max_60d"] = df["Close"].rolling(window=60).max()
+    df["max_vol_10d"] = df["Volume"].rolling(window=10).max()
+
+    close_series = df["Close"].squeeze()
+    diff = close_series.diff(1)
+    up = diff.where(diff > 0, 0.0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    down = -diff.where(diff < 0, 0.0).ewm(alpha=1 / 14, min_periods=14, adjust=False).mean()
+    rsi = pd.Series((100 - 100 / (1 + up / down)).where(down != 0, 100), index=close_series.index)
+    macd_line = (
+        close_series.ewm(span=12, min_periods=12, adjust=False).mean()
+        - close_series.ewm(span=26, min_periods=26, adjust=False).mean()
+    )
+    signal_line = macd_line.ewm(span=9, min_periods=9, adjust=False).mean()
+
+    price = df["Close"].iloc[-1].item()
+    volume = df["Volume"].iloc[-1].item()
+    avg_vol = df["volume_avg_20"].iloc[-1].item()
+    dma_50 = df["50dma"].iloc[-1].item()
+    dma_50_prev = df["50dma"].iloc[-15] if len(df) >= 65 else float("nan")
+    dma_50_early = df["50dma"].iloc[-25] if len(df) >= 75 else float("nan")
+    ema_10 = df["10ema"].iloc[-1].item()
+    high_20d = df["max_20d"].iloc[-2].item()
+    high_60d = df["max_60d"].iloc[-2].item()
+    high_vol_10d = df["max_vol_10d"].iloc[-2].item()
+    rsi_val = rsi.iloc[-1].item()
+    macd_val = macd_line.iloc[-1].item()
+    signal_val = signal_line.iloc[-1].item()
+
+    core = [
+        price > high_20d or price > high_60d,
+        volume >= 1.5 * avg_vol and volume >= high_vol_10d,
+        price > dma_50,
+        price > ema_10,
+        dma_50 > dma_50_prev and dma_50_prev > dma_50_early,
+    ]
+    return {
+        "Ticker": ticker,
+        "Price": round(price, 2),
+        "Core Criteria Met": all(core),
+        "Core Criteria Score": sum(core),
+        "20d High": round(high_20d, 2),
+        "60d High": round(high_60d, 2),
+        "Volume": int(volume),
+        "20d Avg Vol": int(avg_vol),
+        "Max Vol (10d)": int(high_vol_10d),
+        "50DMA": round(dma_50, 2),
+        "10EMA": round(ema_10, 2),
+        "50DMA Prev (15d)": round(dma_50_prev, 2) if pd.notna(dma_50_prev) else None,
+        "50DMA (25d ago)": round(dma_50_early, 2) if pd.notna(dma_50_early) else None,
+        "RSI": round(rsi_val, 2),
+        "MACD": round(macd_val, 2),
+        "Signal": round(signal_val, 2),
+        "Breakout 20d": price > high_20d,
+        "Breakout 60d": price > high_60d,
+        "Breakout Confirmed": core[1],
+        "Price > 50DMA": core[2],
+        "Price > 10EMA": core[3],
+        "50DMA Rising": core[4],
+        "RSI 50-75": 50 < rsi_val < 75,
+        "MACD Bullish": macd_val > signal_val,
+    }
+
+
+def compare(name: str, expected_rows: list[dict], panel_rows: list[dict], tolerance: float) -> int:
+    mismatches = 0
+    for expected, actual in zip(expected_rows, panel_rows):
+        for key, value in expected.items():
+            other = actual.get(key)
+            if isinstance(value, float) and isinstance(other, float):
+                same = math.isclose(value, other, rel_tol=tolerance, abs_tol=0.011)
+            else:
+                same = value == other
+            if not same:
+                mismatches += 1
+                print(f"❌ {expected['Ticker']} {key}: {name}={value!r} panel={other!r}")
+    return mismatches
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=84, help="bars per ticker (120 calendar days ≈ 84 bars)")
+    parser.add_argument("--tolerance", type=float, default=1e-6)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    # vary the history length so that the NaN padding of the panel is exercised
+    data_map = {t: synthetic_history(t, args.days - i % 12)[["Close", "Volume"]] for i, t in enumerate(tickers)}
+    runner = RuleRunnerCommand()
+
+    start = time.perf_counter()
+    baseline = [baseline_row(t, data_map[t].copy()) for t in tickers]
+    baseline_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    per_ticker: list[Result] = [runner.check_stock_criteria(t, data_map[t].copy()) for t in tickers]
+    per_ticker_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rules = RuleSet.load()
+    panel = screen_panel(tickers, data_map, rules)
+    panel_time = time.perf_counter() - start
+
+    panel_rows = [rules.row(r) for r in panel]
+    mismatches = compare("baseline", baseline, panel_rows, args.tolerance)
+    mismatches += compare("per-ticker", [rules.row(r) for r in per_ticker], panel_rows, args.tolerance)
+    print(f"baseline (pandas + ta): {baseline_time:.3f}s  speed-up of the panel: {baseline_time / panel_time:.1f}x")
+    print(f"per-ticker rule engine: {per_ticker_time:.3f}s  speed-up of the panel: {per_ticker_time / panel_time:.1f}x")
+    print(f"panel:                  {panel_time:.3f}s")
+    print("✅ results agree" if not mismatches else f"❌ {mismatches} mismatching fields")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Times a cold screen that overlaps the downloads with the screening, compared with downloading everything first.
+
+The fake Tiingo server delays every response by ``--latency`` seconds, which stands in for the network round trip
+that dominates real downloads. Each run starts with an empty price cache.
+
+Usage: ``python -m benchmarks.bench_pipeline --tickers 500 --latency 0.2 [--max-in-flight 8]``
+"""
+
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+from src.rule_runner import RuleRunnerCommand
+from src.tiingo_fetcher import TiingoFetcher
+
+from .fake_tiingo import FakeTiingoServer
+from .synthetic import synthetic_tickers
+
+
+def new_runner(server: FakeTiingoServer, max_in_flight: int) -> RuleRunnerCommand:
+    runner = RuleRunnerCommand()
+    runner._fetcher = TiingoFetcher(
+        "bench", base_url=server.base_url, max_in_flight=max_in_flight, requests_per_hour=1e9
+    )
+    return runner
+
+
+def timed(run) -> float:
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.chdir(work_dir):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            run()
+            return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    with FakeTiingoServer(latency=args.latency) as server:
+        for ticker in tickers:
+            server.history(ticker)
+
+        def download_first() -> None:
+            runner = new_runner(server, args.max_in_flight)
+            runner.screen_data(tickers, runner.download_batch_data(tickers))
+
+        def streamed() -> None:
+            new_runner(server, args.max_in_flight).screen_streamed(tickers)
+
+        def screen_only() -> None:
+            runner = new_runner(server, args.max_in_flight)
+            data_map = runner.download_batch_data(tickers)
+            start = time.perf_counter()
+            runner.screen_data(tickers, data_map)
+            screen_times.append(time.perf_counter() - start)
+
+        screen_times = []
+        timed(screen_only)
+        print(f"{len(tickers)} tickers, {args.latency}s latency, {args.max_in_flight} in flight")
+        print(f"  screening alone          {screen_times[0]:7.2f}s")
+        print(f"  download, then screen    {timed(download_first):7.2f}s")
+        print(f"  screen while downloading {timed(streamed):7.2f}s")
+
+
+if __name__ == "__main__":
+    main()
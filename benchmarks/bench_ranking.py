@@ -0,0 +1,62 @@
+"""Times ``rank_universe()`` on a synthetic universe, compared with ranking every group on its own.
+
+Usage: ``python -m benchmarks.bench_ranking --tickers 10000 --bars 250 [--group-size 25]``
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from src.panel_screener import build_panel
+from src.ranking import rank_universe, relative_strength
+from src.ticker_group import TickerGroup, Universe
+
+from .synthetic import synthetic_history, synthetic_tickers, synthetic_universe
+
+
+def rank_each_group(universe: Universe, tickers: list[str], close: np.ndarray) -> dict:
+    """The straightforward version: one sorted list of relative strengths per group."""
+    rs = dict(zip(tickers, relative_strength(close).tolist()))
+    ranks = {}
+    for group in universe.groups:
+        values = sorted(rs[t] for t in group.tickers if t in rs)
+        ranks[(group.sector, group.subsector)] = {
+            t: int(np.ceil(99 * np.searchsorted(values, rs[t], side="right") / len(values)))
+            for t in group.tickers
+            if t in rs
+        }
+    return ranks
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=10000)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--group-size", type=int, default=25)
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    universe = Universe.from_groups(
+        [TickerGroup.from_dict(item) for item in synthetic_universe(tickers, group_size=args.group_size)]
+    )
+    close, _, _ = build_panel(tickers, {t: synthetic_history(t, args.bars) for t in tickers})
+
+    start = time.perf_counter()
+    ranking = rank_universe(universe, tickers, close)
+    elapsed = time.perf_counter() - start
+    print(f"rank_universe: {len(tickers)} tickers in {len(universe.groups)} groups in {elapsed * 1000:.1f}ms")
+
+    start = time.perf_counter()
+    expected = rank_each_group(universe, tickers, close)
+    print(f"one sorted list per group: {(time.perf_counter() - start) * 1000:.1f}ms")
+    assert expected == ranking.group_rs_rank, "the group RS Ranks differ"
+
+    start = time.perf_counter()
+    leaders = ranking.strongest(25)
+    elapsed = time.perf_counter() - start
+    print(f"25 strongest of {len(tickers)}: {elapsed * 1000:.2f}ms, {', '.join(leaders[:5])}, ...")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Measures the memory a screen keeps per ticker: the results, and the price frames ``serve`` keeps in memory.
+
+The results are compared with the row dicts they replaced, one per ticker with the Core Criteria Score as a string
+of squares, and the ``float32`` price frames with ``float64`` ones. Allocations are counted with ``tracemalloc``.
+
+Usage: ``python -m benchmarks.bench_result_memory --tickers 20000 [--days 84]``
+"""
+
+import argparse
+import gc
+import pickle
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from src.price_store import PriceStore
+from src.rule_engine import RuleSet
+
+from .synthetic import synthetic_history, synthetic_tickers
+
+
+def allocated(build) -> tuple[object, int]:
+    """Calls ``build`` and returns what it built and the bytes still allocated for it."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        built = build()
+        gc.collect()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return built, size
+
+
+def frame(arr: np.ndarray, dtype: str) -> pd.DataFrame:
+    """Built like ``PriceStore.to_frame()``, with ``dtype`` columns."""
+    return pd.DataFrame(
+        {"Close": arr["close"].astype(dtype), "Volume": arr["volume"].astype(dtype)},
+        index=pd.DatetimeIndex(arr["date"].astype("datetime64[ns]"), name="date"),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=20000)
+    parser.add_argument("--days", type=int, default=84, help="bars per ticker (120 calendar days ≈ 84 bars)")
+    args = parser.parse_args()
+
+    rules = RuleSet.load()
+    # the rows of a few hundred distinct histories, repeated, screening 20,000 tickers is not what is measured here
+    sample = [synthetic_history(t, args.days) for t in synthetic_tickers(min(args.tickers, 500))]
+    evaluated = [
+        rules.evaluate(f"S{i}", df["Close"].to_numpy(), df["Volume"].to_numpy()) for i, df in enumerate(sample)
+    ]
+    tickers = synthetic_tickers(args.tickers)
+    blob = pickle.dumps(evaluated)
+
+    def results() -> list:
+        # unpickled copies, so every ticker holds its own values like after a screen
+        results = []
+        while len(results) < len(tickers):
+            results.extend(pickle.loads(blob))
+        for ticker, result in zip(tickers, results):
+            result.ticker = ticker
+        return results[: len(tickers)]
+
+    def rows() -> list[dict]:
+        rows = []
+        for i, result in enumerate(results()):
+            row = rules.row(result, i % 99 + 1)
+            row["Core Criteria Score"] = rules.score_bar(result.score)
+            rows.append(row)
+        return rows
+
+    _, row_bytes = allocated(rows)
+    _, result_bytes = allocated(results)
+    print(f"results of {len(tickers)} tickers")
+    print(f"  row dicts      {row_bytes / 2**20:8.1f} MiB  {row_bytes / len(tickers):7.0f} bytes per ticker")
+    print(f"  Result records {result_bytes / 2**20:8.1f} MiB  {result_bytes / len(tickers):7.0f} bytes per ticker")
+
+    arrays = [PriceStore.from_frame(df) for df in sample]
+    arrays = (arrays * (len(tickers) // len(arrays) + 1))[: len(tickers)]
+    _, wide_bytes = allocated(lambda: [frame(arr, "f8") for arr in arrays])
+    _, compact_bytes = allocated(lambda: [frame(arr, "f4") for arr in arrays])
+    print(f"price frames of {len(tickers)} tickers, {args.days} bars each")
+    print(f"  float64        {wide_bytes / 2**20:8.1f} MiB  {wide_bytes / len(tickers):7.0f} bytes per ticker")
+    print(f"  float32        {compact_bytes / 2**20:8.1f} MiB  {compact_bytes / len(tickers):7.0f} bytes per ticker")
+
+
+if __name__ == "__main__":
+    main()
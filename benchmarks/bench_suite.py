@@ -0,0 +1,168 @@
+"""Times each stage of ``rule-runner`` offline, against synthetic prices served by the fake Tiingo server.
+
+For every universe size, a fresh working directory gets a synthetic universe JSON file and an empty price cache, and
+these stages are timed separately:
+
+* ``download_batch_data``: cold download of every ticker from the fake server
+* ``save_cached_data`` and ``load_cached_data``: writing every history to the price store and reading it back
+* ``check_stock_criteria``: screening every ticker one at a time
+* ``render_report``: streaming the HTML report (the successor of ``generate_html_table``)
+* ``handle_cold`` and ``handle_warm``: the full command with an empty and with a fresh cache
+
+The results are written as JSON together with the commit and machine they were measured on, and ``--compare``
+prints the ratio to an earlier results file.
+
+Usage: ``python -m benchmarks.bench_suite --sizes 100 1000 10000 --output bench.json [--compare old.json]``
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+from src.price_store import PriceStore
+from src.report_renderer import ReportRenderer
+from src.rule_runner import RuleRunnerCommand
+from src.ticker_group import TickerGroup, Universe
+from src.tiingo_fetcher import TiingoFetcher
+
+from .fake_tiingo import FakeTiingoServer
+from .synthetic import synthetic_tickers, synthetic_universe
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class Timer:
+    def __init__(self) -> None:
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        # the commands print a line per ticker, which is not what is being measured
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            start = time.perf_counter()
+            yield
+            self.stages[name] = time.perf_counter() - start
+
+
+def new_runner(server: FakeTiingoServer, max_in_flight: int) -> RuleRunnerCommand:
+    runner = RuleRunnerCommand()
+    runner._fetcher = TiingoFetcher(
+        "bench", base_url=server.base_url, max_in_flight=max_in_flight, requests_per_hour=1e9
+    )
+    return runner
+
+
+def run_size(count: int, server: FakeTiingoServer, max_in_flight: int) -> dict:
+    tickers = synthetic_tickers(count)
+    for ticker in tickers:
+        server.history(ticker)
+
+    timer = Timer()
+    with tempfile.TemporaryDirectory() as work_dir, contextlib.chdir(work_dir):
+        universe = Universe.from_groups([TickerGroup.from_dict(group) for group in synthetic_universe(tickers)])
+        with open("universe.json", "w") as f:
+            json.dump(universe.to_dict(), f)
+        groups = universe.groups
+
+        runner = new_runner(server, max_in_flight)
+        with timer.stage("download_batch_data"):
+            data_map = runner.download_batch_data(tickers)
+
+        runner._store = PriceStore("save_bench")
+        with timer.stage("save_cached_data"):
+            for ticker in tickers:
+                runner.save_cached_data(ticker, data_map[ticker])
+            runner._store.flush()
+
+        with timer.stage("load_cached_data"):
+            for ticker in tickers:
+                runner.load_cached_data(ticker)
+
+        with timer.stage("check_stock_criteria"):
+            results = {t: runner.check_stock_criteria(t, data_map[t]) for t in tickers}
+
+        with timer.stage("render_report"):
+            sections = runner.report_sections(groups, results, set())
+            ReportRenderer("report_bench").write_page("index.html", "Benchmark", "now", sections=sections)
+
+        parser = argparse.ArgumentParser()
+        runner.add_arguments(parser)
+        args = parser.parse_args(["--json", os.path.abspath("universe.json")])
+        with contextlib.chdir(tempfile.mkdtemp(dir=work_dir)):
+            with timer.stage("handle_cold"):
+                new_runner(server, max_in_flight).handle(args)
+            with timer.stage("handle_warm"):
+                new_runner(server, max_in_flight).handle(args)
+
+    return {"tickers": count, "groups": len(groups), "stages": timer.stages}
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_comparison(results: list[dict], path: str) -> None:
+    with open(path) as f:
+        previous = {r["tickers"]: r["stages"] for r in json.load(f)["results"]}
+    print(f"\nCompared with {path} (< 1.00x is faster):")
+    for result in results:
+        before = previous.get(result["tickers"])
+        if before is None:
+            continue
+        for stage, seconds in result["stages"].items():
+            if before.get(stage):
+                print(f"  {result['tickers']:>6} tickers  {stage:<22} {seconds / before[stage]:6.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--history-days", type=int, default=250, help="bars the fake server has for each ticker")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the fake server delays each response")
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--output", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="print the ratio of each stage to an earlier results file")
+    args = parser.parse_args()
+
+    results = []
+    with FakeTiingoServer(latency=args.latency, history_days=args.history_days) as server:
+        for count in args.sizes:
+            result = run_size(count, server, args.max_in_flight)
+            results.append(result)
+            print(f"{count} tickers, {result['groups']} groups")
+            for stage, seconds in result["stages"].items():
+                print(f"  {stage:<22} {seconds:9.3f}s  {count / seconds:10.0f} tickers/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "timestamp": datetime.now().isoformat(timespec="seconds"),
+                    "commit": git_commit(),
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "cpu_count": os.cpu_count(),
+                    "args": vars(args),
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"✅ Results saved to: {args.output}")
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
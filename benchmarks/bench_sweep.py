@@ -0,0 +1,52 @@
+"""Times ``RuleSet.sweep()`` on a synthetic universe, compared with evaluating one rule set per variant.
+
+Usage: ``python -m benchmarks.bench_sweep --tickers 3000 --bars 250 [--loop-variants 10]``
+"""
+
+import argparse
+import itertools
+import time
+
+from src.panel_screener import build_panel
+from src.rule_engine import RuleSet
+
+from .synthetic import synthetic_history, synthetic_tickers
+
+# 3 x 3 x 3 x 2 x 2 x 3 = 324 variants, 18 of them with different indicator windows
+GRID = {
+    "volume_multiple": [1.25, 1.5, 2.0],
+    "rsi_low": [40, 50, 55],
+    "rsi_high": [70, 75, 80],
+    "breakout_short": [10, 20],
+    "breakout_long": [40, 60],
+    "dma_slope_recent": [10, 14, 20],
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=3000)
+    parser.add_argument("--bars", type=int, default=250)
+    parser.add_argument("--loop-variants", type=int, default=10, help="variants timed one rule set at a time")
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    close, volume, lengths = build_panel(tickers, {t: synthetic_history(t, args.bars) for t in tickers})
+    rules = RuleSet.load()
+
+    start = time.perf_counter()
+    variants, scores, passes = rules.sweep(GRID, close, volume)
+    elapsed = time.perf_counter() - start
+    print(f"sweep: {len(variants)} variants x {len(tickers)} tickers in {elapsed:.2f}s")
+
+    start = time.perf_counter()
+    for variant in itertools.islice(variants, args.loop_variants):
+        RuleSet.from_dict({**rules.definition, "params": {**rules.params, **variant}}).evaluate_panel(
+            tickers, close, volume, lengths
+        )
+    per_variant = (time.perf_counter() - start) / args.loop_variants
+    print(f"one rule set per variant: {per_variant:.2f}s each, {per_variant * len(variants):.1f}s for the grid")
+
+
+if __name__ == "__main__":
+    main()
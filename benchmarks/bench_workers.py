@@ -0,0 +1,69 @@
+"""Measures screening throughput with 1, 2, 4 and 8 worker processes on synthetic data.
+
+One worker runs in-process, exactly like ``rule-runner`` without ``--workers``; more workers go through the shared
+memory process pool.
+
+Usage: ``python -m benchmarks.bench_workers --tickers 5000 [--panel] [--output results.json]``
+"""
+
+import argparse
+import json
+import os
+import time
+
+from src.panel_screener import screen_panel
+from src.parallel_screener import screen_parallel
+from src.rule_engine import Result, RuleSet
+from src.rule_runner import RuleRunnerCommand
+
+from .synthetic import synthetic_history, synthetic_tickers
+
+
+def screen_in_process(tickers: list[str], data_map: dict, panel: bool) -> list[Result]:
+    if panel:
+        return screen_panel(tickers, data_map, RuleSet.load())
+    runner = RuleRunnerCommand()
+    return [runner.check_stock_criteria(t, data_map[t].copy()) for t in tickers]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=5000)
+    parser.add_argument("--days", type=int, default=84, help="bars per ticker (120 calendar days ≈ 84 bars)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--panel", action="store_true", help="use the vectorized panel screener in each worker")
+    parser.add_argument("--output", help="also write the measurements to this JSON file")
+    args = parser.parse_args()
+
+    tickers = synthetic_tickers(args.tickers)
+    data_map = {t: synthetic_history(t, args.days)[["Close", "Volume"]] for t in tickers}
+
+    print(f"{len(tickers)} tickers, {'panel' if args.panel else 'per-ticker'} mode, {os.cpu_count()} CPUs")
+    rules = RuleSet.load()
+    measurements = []
+    expected = None
+    for workers in args.workers:
+        start = time.perf_counter()
+        if workers == 1:
+            results = screen_in_process(tickers, data_map, args.panel)
+        else:
+            results, _ = screen_parallel(tickers, data_map, workers, panel=args.panel)
+        elapsed = time.perf_counter() - start
+
+        # rows must come back in ticker order and identical to the single process run
+        rows = [rules.row(r) for r in results]
+        if expected is None:
+            expected = rows
+        elif rows != expected:
+            print(f"❌ results with {workers} workers differ from the first run")
+
+        measurements.append({"workers": workers, "seconds": elapsed, "tickers_per_second": len(tickers) / elapsed})
+        print(f"  {workers:>2} workers: {elapsed:8.3f}s  {len(tickers) / elapsed:10.0f} tickers/s")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"tickers": len(tickers), "panel": args.panel, "measurements": measurements}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
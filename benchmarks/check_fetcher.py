@@ -0,0 +1,94 @@
+"""Checks the Tiingo downloader's concurrency cap, rate limit and retry behaviour against the fake server.
+
+Usage: ``python -m benchmarks.check_fetcher``
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.tiingo_fetcher import TiingoError, TiingoFetcher
+
+from .fake_tiingo import FakeTiingoServer
+
+
+def fetch_all(fetcher: TiingoFetcher, starts: dict[str, datetime]) -> dict:
+    """Fetches every ticker from its start date on as many threads as the fetcher allows requests in flight.
+
+    A failed ticker maps to its exception instead of a frame.
+    """
+
+    def fetch(ticker: str):
+        try:
+            return fetcher.get_prices(ticker, starts[ticker])
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=fetcher.max_in_flight) as executor:
+        return dict(zip(starts, executor.map(fetch, starts)))
+
+
+def check_concurrency(tickers: int, max_in_flight: int, latency: float) -> None:
+    starts = {f"C{i}": datetime.now() - timedelta(days=120) for i in range(tickers)}
+    with FakeTiingoServer(latency=latency) as server:
+        # generate the synthetic histories up front so that only the HTTP round trips are timed
+        for ticker in starts:
+            server.history(ticker)
+        fetcher = TiingoFetcher("test", base_url=server.base_url, max_in_flight=max_in_flight, requests_per_hour=1e9)
+        start = time.monotonic()
+        results = fetch_all(fetcher, starts)
+        elapsed = time.monotonic() - start
+
+    assert all(not isinstance(r, Exception) for r in results.values()), "unexpected fetch failures"
+    assert server.max_in_flight <= max_in_flight, f"{server.max_in_flight} requests in flight > {max_in_flight}"
+    serial = tickers * latency
+    print(f"✅ concurrency: {tickers} tickers in {elapsed:.2f}s (serial ≈ {serial:.2f}s), peak {server.max_in_flight}")
+
+
+def check_rate_limit(requests: int, requests_per_hour: float) -> None:
+    with FakeTiingoServer() as server:
+        fetcher = TiingoFetcher("test", base_url=server.base_url, max_in_flight=4, requests_per_hour=requests_per_hour)
+        fetch_all(fetcher, {f"R{i}": datetime.now() - timedelta(days=30) for i in range(requests)})
+
+    # the bucket starts full (one token per in-flight slot), after that requests are spaced by the refill interval
+    times = server.request_times
+    steady = times[4:]
+    observed = (len(steady) - 1) / (steady[-1] - steady[0]) * 3600
+    assert observed <= requests_per_hour * 1.1, f"observed {observed:.0f} requests/hour > {requests_per_hour:.0f}"
+    print(f"✅ rate limit: observed {observed:.0f} requests/hour, limit {requests_per_hour:.0f}")
+
+
+def check_retries() -> None:
+    with FakeTiingoServer(throttle_every=3, unknown_tickers={"NOPE"}) as server:
+        fetcher = TiingoFetcher("test", base_url=server.base_url, max_in_flight=2, requests_per_hour=1e9, backoff=0.01)
+        results = fetch_all(fetcher, {f"X{i}": datetime.now() - timedelta(days=30) for i in range(10)})
+        unknown = fetch_all(fetcher, {"NOPE": datetime.now() - timedelta(days=30)})
+
+    assert all(not isinstance(r, Exception) for r in results.values()), "throttled requests were not retried"
+    assert isinstance(unknown["NOPE"], TiingoError) and unknown["NOPE"].status == 404
+    print(f"✅ retries: 10 tickers fetched with {len(server.request_times) - 1} requests despite HTTP 429s")
+
+    with FakeTiingoServer(latency=0.5) as server:
+        fetcher = TiingoFetcher("test", base_url=server.base_url, max_retries=2, backoff=0.01, timeout=0.1)
+        slow = fetch_all(fetcher, {"SLOW": datetime.now() - timedelta(days=30)})["SLOW"]
+
+    assert isinstance(slow, TiingoError) and slow.status is None, f"unexpected result of a timed out fetch: {slow!r}"
+    assert len(server.request_times) == 3, f"{len(server.request_times)} requests for 2 retries of a timed out fetch"
+    print("✅ retries: a timed out request is retried like a dropped connection")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=64)
+    parser.add_argument("--max-in-flight", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    check_concurrency(args.tickers, args.max_in_flight, args.latency)
+    check_rate_limit(24, 36000)
+    check_retries()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Checks that a longer ``--lookback-days`` grows the cached price history and that later runs keep it.
+
+Usage: ``python -m benchmarks.check_lookback``
+"""
+
+import contextlib
+import os
+import tempfile
+from datetime import datetime, timedelta
+
+from src.rule_runner import RuleRunnerCommand
+from src.tiingo_fetcher import TiingoFetcher
+
+from .fake_tiingo import FakeTiingoServer
+
+TICKERS = ["L00001", "L00002"]
+
+
+def download(server: FakeTiingoServer, lookback_days: int, stale: bool = False) -> dict[str, int]:
+    """Runs the download stage of rule-runner with ``lookback_days`` and returns the cached rows of each ticker.
+
+    With ``stale``, the cached prices are first made to look a week old, so only the missing bars are requested.
+    """
+    runner = RuleRunnerCommand()
+    runner._fetcher = TiingoFetcher("check", base_url=server.base_url, requests_per_hour=1e9)
+    runner._lookback_days = lookback_days
+    if stale:
+        for ticker in TICKERS:
+            meta = runner._store.meta(ticker)
+            meta["fetched_at"] = (datetime.now() - timedelta(days=7)).isoformat()
+            meta["last_date"] = (datetime.now() - timedelta(days=7)).date().isoformat()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        runner.download_batch_data(TICKERS)
+    return {ticker: runner._store.meta(ticker)["rows"] for ticker in TICKERS}
+
+
+def main() -> None:
+    with FakeTiingoServer() as server, tempfile.TemporaryDirectory() as work_dir, contextlib.chdir(work_dir):
+        short = download(server, 120)
+        requests = len(server.request_times)
+        long = download(server, 1500)
+        assert len(server.request_times) > requests, "the longer lookback did not download anything"
+        assert all(long[t] > 3 * short[t] for t in TICKERS), f"history did not grow: {short} -> {long}"
+        print(f"✅ backfill: --lookback-days 1500 grew the cached history from {short} to {long} rows")
+
+        requests = len(server.request_times)
+        kept = download(server, 120)
+        assert len(server.request_times) == requests, "a shorter lookback downloaded the history again"
+        assert kept == long, f"a shorter lookback changed the cached history: {long} -> {kept}"
+        merged = download(server, 120, stale=True)
+        assert len(server.request_times) > requests, "the stale prices were not downloaded"
+        assert all(merged[t] >= long[t] for t in TICKERS), f"a delta download cut the history: {long} -> {merged}"
+        print(f"✅ retention: later runs with --lookback-days 120 keep {merged} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""A local stand-in for the Tiingo daily prices endpoint.
+
+Serves deterministic synthetic prices from :mod:`benchmarks.synthetic` and records how many requests arrived, when,
+and how many were in flight at once, so the downloader's concurrency and rate limits can be checked offline.
+
+Run standalone with ``python -m benchmarks.fake_tiingo --port 8765`` and point rule-runner at it with
+``TIINGO_BASE_URL=http://127.0.0.1:8765``.
+"""
+
+import argparse
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from .synthetic import synthetic_history
+
+_PRICES_PATH = re.compile(r"^/tiingo/daily/(?P<ticker>[^/]+)/prices$")
+
+
+class FakeTiingoServer:
+    """Threaded HTTP server answering ``/tiingo/daily/<ticker>/prices`` requests.
+
+    ``latency`` delays every response, ``throttle_every`` answers every n-th request with HTTP 429, and tickers in
+    ``unknown_tickers`` get the 404 Tiingo returns for symbols it does not know.
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        throttle_every: int = 0,
+        unknown_tickers: set[str] | None = None,
+        history_days: int = 1300,
+    ) -> None:
+        self.latency = latency
+        self.throttle_every = throttle_every
+        self.unknown_tickers = unknown_tickers or set()
+        self.history_days = history_days
+
+        self.request_times: list[float] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._histories: dict[str, pd.DataFrame] = {}
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTiingoServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeTiingoServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def history(self, ticker: str) -> pd.DataFrame:
+        history = self._histories.get(ticker)
+        if history is None:
+            history = self._histories.setdefault(ticker, synthetic_history(ticker, self.history_days))
+        return history
+
+    def _handler_class(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                with server._lock:
+                    server.request_times.append(time.monotonic())
+                    count = len(server.request_times)
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                if server.latency:
+                    time.sleep(server.latency)
+                # leave the in-flight count before answering, the client may reuse the slot as soon as it has a reply
+                with server._lock:
+                    server.in_flight -= 1
+                self._respond(count)
+
+            def _respond(self, count: int) -> None:
+                url = urlparse(self.path)
+                match = _PRICES_PATH.match(url.path)
+                if match is None:
+                    return self._send(404, {"detail": "Not found."})
+                if server.throttle_every and count % server.throttle_every == 0:
+                    return self._send(429, {"detail": "Too many requests."})
+
+                ticker = match.group("ticker").upper()
+                if ticker in server.unknown_tickers:
+                    return self._send(404, {"detail": f"Error: Ticker '{ticker}' not found"})
+
+                query = parse_qs(url.query)
+                df = server.history(ticker)
+                if "startDate" in query:
+                    df = df.loc[df.index >= pd.Timestamp(query["startDate"][0])]
+                if "endDate" in query:
+                    df = df.loc[df.index <= pd.Timestamp(query["endDate"][0])]
+
+                rows = [
+                    {"date": f"{day:%Y-%m-%d}T00:00:00.000Z", "adjClose": close, "adjVolume": volume}
+                    for day, close, volume in zip(df.index, df["Close"], df["Volume"])
+                ]
+                self._send(200, rows)
+
+            def _send(self, status: int, body) -> None:
+                payload = json.dumps(body).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    # the client timed out and closed the connection
+                    pass
+
+        return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Runs a fake Tiingo daily prices server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to delay every response")
+    parser.add_argument("--throttle-every", type=int, default=0, help="answer every n-th request with HTTP 429")
+    args = parser.parse_args()
+
+    server = FakeTiingoServer(args.port, latency=args.latency, throttle_every=args.throttle_every)
+    print(f"🧪 Fake Tiingo listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
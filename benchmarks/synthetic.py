@@ -0,0 +1,63 @@
+"""Deterministic synthetic OHLCV histories used by the offline benchmarks and the fake Tiingo server."""
+
+import zlib
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+
+def ticker_seed(ticker: str) -> int:
+    return zlib.crc32(ticker.encode("utf-8"))
+
+
+def synthetic_tickers(count: int) -> list[str]:
+    return [f"T{i:05d}" for i in range(count)]
+
+
+def synthetic_universe(tickers: list[str], group_size: int = 25, sectors: int = 11) -> list[dict]:
+    """Splits ``tickers`` into groups in the format of the JSON files ``rule-runner --json`` reads.
+
+    Every tenth ticker is also listed in the next group, like stocks that belong to several subsectors.
+    """
+    groups = []
+    for i, start in enumerate(range(0, len(tickers), group_size)):
+        members = tickers[start : start + group_size]
+        members += [t for t in tickers[start + group_size : start + 2 * group_size : 10] if t not in members]
+        groups.append(
+            {
+                "Sector": f"Sector {i % sectors + 1}",
+                "Subsector": f"Subsector {i + 1}",
+                "Company Ticker Symbols": ", ".join(members),
+            }
+        )
+    return groups
+
+
+@lru_cache(maxsize=16)
+def _business_days(end: date, days: int) -> pd.DatetimeIndex:
+    return pd.bdate_range(end=pd.Timestamp(end), periods=days, name="date")
+
+
+def synthetic_history(ticker: str, days: int = 1300, end: date | None = None) -> pd.DataFrame:
+    """Returns ``days`` business days of random-walk OHLCV data for ``ticker``, identical on every call."""
+    rng = np.random.default_rng(ticker_seed(ticker))
+    index = _business_days(end or date.today(), days)
+
+    drift = rng.normal(0.0003, 0.0005)
+    returns = rng.normal(drift, 0.02, size=days)
+    close = 20 + 80 * rng.random() * np.exp(np.cumsum(returns))
+    spread = np.abs(rng.normal(0, 0.01, size=days)) * close
+    volume = rng.lognormal(13, 0.6, size=days).round()
+
+    return pd.DataFrame(
+        {
+            "Open": close - spread * rng.uniform(-1, 1, size=days),
+            "High": close + spread,
+            "Low": close - spread,
+            "Close": close,
+            "Volume": volume,
+        },
+        index=index,
+    )
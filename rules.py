@@ -1,10 +1,32 @@
 import argparse
+import importlib
+import sys
 
-from src.market_value import MarketValueCommand
-from src.rule_runner import RuleRunnerCommand
-from src.importer import ImporterCommand
 from src.base_command import BaseCommand, CLI_Interface
 
+# name -> (module, class, help text). A command's module is only imported when that command runs, so --help and
+# every other command do not pay for plotly, yfinance, pandas and friends.
+COMMANDS = {
+    "rule-runner": ("src.rule_runner", "RuleRunnerCommand", "runs the rules on ticker symbols in a JSON file"),
+    "import": ("src.importer", "ImporterCommand", "Imports stock tickers from an Excel file."),
+    "market-value": (
+        "src.market_value",
+        "MarketValueCommand",
+        "generates a graph in HTML display the daily value of a stock",
+    ),
+    "backtest": ("src.backtest", "BacktestCommand", "backtests the rules over the cached price history"),
+    "sweep": (
+        "src.sweep",
+        "SweepCommand",
+        "counts the tickers that pass the rules for every combination of a grid of param values",
+    ),
+    "serve": (
+        "src.rule_server",
+        "ServeCommand",
+        "keeps the tickers in memory, screens them on a schedule and serves the results over HTTP",
+    ),
+}
+
 
 class CommandLineInterface(CLI_Interface):
     """A command line interface to manage OpenTA running in Kubernetes"""
@@ -16,6 +38,8 @@ class CommandLineInterface(CLI_Interface):
         self.subparsers = self.parser.add_subparsers(dest="command", help="Available commands")
 
         self.commands = {}
+        self.lazy_commands = {}
+        self.command_parsers = {}
 
     def add_command(self, name: str, handler: "BaseCommand", help_text: str) -> None:
         """Registers a new command to the CLI."""
@@ -23,9 +47,27 @@ class CommandLineInterface(CLI_Interface):
         subparser = self.subparsers.add_parser(name, help=help_text)
         handler.add_arguments(subparser)
 
-    def execute(self) -> None:
+    def add_lazy_command(self, name: str, module: str, class_name: str, help_text: str) -> None:
+        """Registers a command by name, its module is imported when the command is dispatched."""
+        self.lazy_commands[name] = (module, class_name)
+        self.command_parsers[name] = self.subparsers.add_parser(name, help=help_text)
+
+    def load_command(self, name: str) -> "BaseCommand":
+        module, class_name = self.lazy_commands.pop(name)
+        handler = getattr(importlib.import_module(module), class_name)()
+        handler.add_arguments(self.command_parsers[name])
+        self.commands[name] = handler
+        return handler
+
+    def execute(self, argv: list[str] | None = None) -> None:
         """Parses and executes the command provided in the command line arguments."""
-        args = self.parser.parse_args()
+        argv = sys.argv[1:] if argv is None else argv
+        # the top level parser has no options of its own, so the first known name is the command
+        name = next((arg for arg in argv if not arg.startswith("-")), None)
+        if name in self.lazy_commands:
+            self.load_command(name)
+
+        args = self.parser.parse_args(argv)
         if args.command in self.commands:
             self.commands[args.command].handle(args)
         else:
@@ -34,9 +76,8 @@ class CommandLineInterface(CLI_Interface):
 
 def main() -> None:
     cli = CommandLineInterface()
-    RuleRunnerCommand().add_to_cli(cli)
-    ImporterCommand().add_to_cli(cli)
-    MarketValueCommand().add_to_cli(cli)
+    for name, (module, class_name, help_text) in COMMANDS.items():
+        cli.add_lazy_command(name, module, class_name, help_text)
     cli.execute()
 
 
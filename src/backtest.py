@@ -0,0 +1,189 @@
+import argparse
+from typing import List
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from src.base_command import BaseCommand
+from src.ticker_group import load_universe
+from .price_store import PriceStore
+from .rule_engine import RuleSet
+from .rule_runner import RuleRunnerCommand
+
+console = Console()
+
+# per-ticker sums the group statistics are built from, each shaped (horizons, tickers)
+_STATS = ("signals", "hits", "signal_returns", "bars", "up_bars", "bar_returns")
+
+
+def parse_horizon(value: str) -> int:
+    """Parses one of ``--horizons``, a positive number of bars."""
+    try:
+        horizon = int(value)
+    except ValueError:
+        horizon = 0
+    if horizon < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive number of bars, got '{value}'")
+    return horizon
+
+
+class BacktestCommand(BaseCommand):
+    _NAME = "backtest"
+    _DESCRIPTION = "backtests the rules over the cached price history"
+
+    _YEARS = 5
+    _HORIZONS = [5, 20, 60]
+    _CHUNK_SIZE = 500
+
+    def __init__(self) -> None:
+        super().__init__(self._NAME, self._DESCRIPTION)
+        self._store = PriceStore(RuleRunnerCommand._DATA_DIR)
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("--json", required=True, help="use the stock tickers from the JSON file")
+        parser.add_argument("--sector", help="filter groups by sector name (case-insensitive)")
+        parser.add_argument("--rules", help="JSON rule set to backtest (default: rule_sets/default.json)")
+        parser.add_argument(
+            "--years",
+            type=float,
+            default=self._YEARS,
+            help=f"number of years of signals to evaluate (default: {self._YEARS})",
+        )
+        parser.add_argument(
+            "--horizons",
+            type=parse_horizon,
+            nargs="+",
+            default=self._HORIZONS,
+            help=f"forward return horizons in bars (default: {' '.join(map(str, self._HORIZONS))})",
+        )
+        parser.add_argument(
+            "--signal",
+            choices=["core", "top"],
+            default="core",
+            help="'core' when all core criteria are met, 'top' when the Top Criteria threshold is reached",
+        )
+        parser.add_argument("--output", help="also write the per-group statistics to this CSV file")
+
+    def handle(self, args: argparse.Namespace) -> None:
+        rules = RuleSet.load(args.rules)
+        universe = load_universe(args.json)
+        if args.sector:
+            universe = universe.sector(args.sector)
+            if not universe.groups:
+                console.print(f"[red]❌ No groups found for sector:[/red] '{args.sector}'")
+                return
+
+        groups = universe.groups
+        tickers = universe.tickers()
+        missing = [t for t in tickers if self._store.read_array(t) is None]
+        if missing:
+            print(f"⚠️ No cached prices for tickers: {', '.join(missing)}")
+        tickers = [t for t in tickers if t not in missing]
+        if not tickers:
+            console.print("[red]❌ No cached prices, run rule-runner with a longer --lookback-days first[/red]")
+            return
+
+        print(f"🧪 Backtesting {rules.name} on {len(tickers)} tickers over {args.years:g} years")
+        cutoff = np.datetime64(pd.Timestamp.now().normalize() - pd.DateOffset(years=args.years), "D")
+        stats = self.backtest(tickers, rules, cutoff, args.horizons, args.signal == "top")
+
+        position = {t: i for i, t in enumerate(tickers)}
+        rows = []
+        for group in groups:
+            columns = [position[t] for t in group.tickers if t in position]
+            rows.append(self.summarize(group.sector, group.subsector, stats, columns, args.horizons))
+        rows.append(self.summarize("All", "", stats, list(range(len(tickers))), args.horizons))
+
+        self.print_table(rows, args.horizons, args.signal)
+        if args.output:
+            pd.DataFrame(rows).to_csv(args.output, index=False)
+            print(f"✅ Backtest results saved to: {args.output}")
+
+    def backtest(
+        self, tickers: List[str], rules: RuleSet, cutoff: np.datetime64, horizons: List[int], top: bool
+    ) -> dict:
+        """Evaluates ``rules`` at every cached bar of every ticker and returns the per-ticker forward return sums.
+
+        The tickers are processed in column chunks of an aligned price panel. Each chunk computes every indicator as a
+        full series in one vectorized pass, so the cost grows with ``dates x tickers`` rather than with
+        ``dates x tickers x window`` as re-screening each day would. Only bars on or after ``cutoff`` count as signals.
+        """
+        stats = {key: np.zeros((len(horizons), len(tickers))) for key in _STATS}
+        for start in range(0, len(tickers), self._CHUNK_SIZE):
+            chunk = tickers[start : start + self._CHUNK_SIZE]
+            close, volume, counted = self.load_panel(chunk, cutoff)
+            score, valid = rules.score_history(close, volume)
+            signal = valid & counted & (score >= (rules.top_threshold if top else len(rules.core)))
+            baseline = valid & counted
+
+            for h, horizon in enumerate(horizons):
+                forward = np.full(close.shape, np.nan)
+                forward[:-horizon] = close[horizon:] / close[:-horizon] - 1
+                known = ~np.isnan(forward)
+                returns = np.where(known, forward, 0.0)
+
+                columns = slice(start, start + len(chunk))
+                stats["signals"][h, columns] = (signal & known).sum(axis=0)
+                stats["hits"][h, columns] = (signal & (returns > 0)).sum(axis=0)
+                stats["signal_returns"][h, columns] = np.where(signal, returns, 0.0).sum(axis=0)
+                stats["bars"][h, columns] = (baseline & known).sum(axis=0)
+                stats["up_bars"][h, columns] = (baseline & (returns > 0)).sum(axis=0)
+                stats["bar_returns"][h, columns] = np.where(baseline, returns, 0.0).sum(axis=0)
+        return stats
+
+    def load_panel(self, tickers: List[str], cutoff: np.datetime64) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Reads the cached prices of ``tickers`` into ``(dates, tickers)`` arrays aligned on their last bar.
+
+        Also returns a mask of the bars dated on or after ``cutoff``. The earlier bars only warm up the indicators.
+        """
+        arrays = [self._store.read_array(t) for t in tickers]
+        rows = max(len(a) for a in arrays)
+        close = np.full((rows, len(tickers)), np.nan)
+        volume = np.full((rows, len(tickers)), np.nan)
+        counted = np.zeros((rows, len(tickers)), dtype=bool)
+        for i, arr in enumerate(arrays):
+            first = rows - len(arr)
+            close[first:, i] = arr["close"]
+            volume[first:, i] = arr["volume"]
+            counted[first + int(np.searchsorted(arr["date"], cutoff)) :, i] = True
+        return close, volume, counted
+
+    def summarize(self, sector: str, subsector: str, stats: dict, columns: List[int], horizons: List[int]) -> dict:
+        row = {"Sector": sector, "Subsector": subsector, "Tickers": len(columns)}
+        for h, horizon in enumerate(horizons):
+            total = {key: stats[key][h, columns].sum() for key in _STATS}
+            signals = int(total["signals"])
+            row[f"Signals {horizon}d"] = signals
+            row[f"Hit Rate {horizon}d"] = total["hits"] / signals if signals else None
+            row[f"Avg Return {horizon}d"] = total["signal_returns"] / signals if signals else None
+            row[f"Base Hit Rate {horizon}d"] = total["up_bars"] / total["bars"] if total["bars"] else None
+            row[f"Base Return {horizon}d"] = total["bar_returns"] / total["bars"] if total["bars"] else None
+        return row
+
+    def print_table(self, rows: List[dict], horizons: List[int], signal: str) -> None:
+        title = "Core Criteria Met" if signal == "core" else "Top Criteria"
+        table = Table(title=f"Backtest: {title} signals, hit rate and average forward return (base: all bars)")
+        table.add_column("Group")
+        table.add_column("Tickers", justify="right")
+        for horizon in horizons:
+            table.add_column(f"{horizon}d signals", justify="right")
+            table.add_column(f"{horizon}d hit / base", justify="right")
+            table.add_column(f"{horizon}d return / base", justify="right")
+
+        def percent(value: float | None) -> str:
+            return "–" if value is None else f"{value:.1%}"
+
+        for row in rows:
+            if row["Sector"] == "All":
+                table.add_section()
+            cells = [" / ".join(filter(None, [row["Sector"], row["Subsector"]])), str(row["Tickers"])]
+            for horizon in horizons:
+                cells += [
+                    str(row[f"Signals {horizon}d"]),
+                    f"{percent(row[f'Hit Rate {horizon}d'])} / {percent(row[f'Base Hit Rate {horizon}d'])}",
+                    f"{percent(row[f'Avg Return {horizon}d'])} / {percent(row[f'Base Return {horizon}d'])}",
+                ]
+            table.add_row(*cells)
+        console.print(table)
@@ -1,7 +1,4 @@
 import argparse
-from rich.console import Console
-
-console = Console()
 
 
 class CLI_Interface:
@@ -0,0 +1,106 @@
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+import pandas as pd
+import plotly
+from jinja2 import Environment, FileSystemLoader
+
+from .report_renderer import TEMPLATES_DIR
+
+
+def lttb(x: np.ndarray, y: np.ndarray, points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets downsampling, returns the indices of at most ``points`` points to keep.
+
+    The first and last points are always kept. The points in between are split into ``points - 2`` buckets and each
+    bucket keeps the point forming the largest triangle with the point kept in the previous bucket and the average of
+    the next bucket, which preserves the visual peaks and troughs of the line.
+    """
+    n = len(y)
+    if points >= n or points < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype="f8")
+    y = np.nan_to_num(np.asarray(y, dtype="f8"))
+    edges = np.linspace(1, n - 1, points - 1).astype(int)
+    keep = np.empty(points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    previous = 0
+    for i in range(points - 2):
+        start, stop = edges[i], edges[i + 1]
+        next_stop = edges[i + 2] if i + 2 < len(edges) else n
+        next_x = x[stop:next_stop].mean()
+        next_y = y[stop:next_stop].mean()
+        area = np.abs(
+            (x[previous] - next_x) * (y[start:stop] - y[previous])
+            - (x[previous] - x[start:stop]) * (next_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        keep[i + 1] = previous
+    return keep
+
+
+@dataclass
+class Chart:
+    """One line chart of the bundle. The first trace drives the downsampling of all of them."""
+
+    key: str
+    title: str
+    dates: pd.DatetimeIndex
+    traces: List[dict] = field(default_factory=list)  # name, values and optional dash
+
+    def add_trace(self, name: str, values, dash: str | None = None) -> None:
+        self.traces.append({"name": name, "values": np.asarray(values, dtype="f8"), "dash": dash})
+
+    def to_dict(self, max_points: int) -> dict:
+        keep = np.arange(len(self.dates))
+        if max_points and self.traces:
+            keep = lttb(self.dates.asi8, self.traces[0]["values"], max_points)
+        dates = self.dates[keep].strftime("%Y-%m-%d").tolist()
+        return {
+            "title": self.title,
+            "traces": [
+                {"name": t["name"], "x": dates, "y": np.round(t["values"][keep], 2).tolist(), "dash": t["dash"]}
+                for t in self.traces
+            ],
+        }
+
+
+def write_chart_bundle(output_dir: str, title: str, charts: List[Chart], max_points: int = 0) -> str:
+    """Writes ``charts`` as a lightweight bundle below ``output_dir`` and returns the path of its index page.
+
+    The bundle is one shared, versioned plotly.js asset, one small JSON data file per chart, and an index page that
+    only fetches a chart's data and draws it when the chart scrolls into view. With ``max_points``, every chart is
+    downsampled to at most that many points with :func:`lttb`. The page must be served over HTTP for the data files
+    to load. Data files of charts no longer in the bundle are removed.
+    """
+    data_dir = os.path.join(output_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+
+    plotly_js = f"plotly-{plotly.__version__}.min.js"
+    if not os.path.exists(os.path.join(output_dir, plotly_js)):
+        with open(os.path.join(output_dir, plotly_js), "w", encoding="utf-8") as f:
+            f.write(plotly.offline.get_plotlyjs())
+
+    entries = []
+    filenames = set()
+    for chart in charts:
+        filename = f"{re.sub(r'[^A-Za-z0-9_-]+', '_', chart.key)}.json"
+        with open(os.path.join(data_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(chart.to_dict(max_points), f, separators=(",", ":"))
+        entries.append({"title": chart.title, "data": f"data/{filename}"})
+        filenames.add(filename)
+
+    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    index_path = os.path.join(output_dir, "index.html")
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(env.get_template("charts.html").render(title=title, plotly_js=plotly_js, charts=entries))
+
+    # after the index is written, so that it never lists a missing file
+    for filename in os.listdir(data_dir):
+        if filename.endswith(".json") and filename not in filenames:
+            os.remove(os.path.join(data_dir, filename))
+    return index_path
@@ -1,28 +1,55 @@
-from dotenv import load_dotenv
+from functools import cache
 import os
 import sys
 
-# is there input from stdin?
-if not sys.stdin.isatty():
-    load_dotenv(stream=sys.stdin)
-else:
-    load_dotenv()
+
+@cache
+def _load_env() -> None:
+    """Loads the settings into the environment the first time one of them is read, rather than at import."""
+    from dotenv import load_dotenv
+
+    # is there input from stdin?
+    if not sys.stdin.isatty():
+        load_dotenv(stream=sys.stdin)
+    else:
+        load_dotenv()
 
 
 class Config:
     @staticmethod
     def get_tiingo_api_key():
+        _load_env()
         return os.getenv("TIINGO_API_KEY")
 
+    @staticmethod
+    def get_tiingo_base_url():
+        """Base URL of the Tiingo API, overridable to point the downloader at a local fake server."""
+        _load_env()
+        return os.getenv("TIINGO_BASE_URL")
+
+    @staticmethod
+    def get_tiingo_requests_per_hour():
+        _load_env()
+        return float(os.getenv("TIINGO_REQUESTS_PER_HOUR", "10000"))
+
+    @staticmethod
+    def get_tiingo_max_in_flight():
+        _load_env()
+        return int(os.getenv("TIINGO_MAX_IN_FLIGHT", "8"))
+
     @staticmethod
     def get_config():
         """Get all config values as a dictionary."""
+        _load_env()
         result = {
             "TIINGO_API_KEY": Config.get_tiingo_api_key(),
         }
 
         optional_keys = [
             "TIINGO_API_KEY",
+            "TIINGO_BASE_URL",
+            "TIINGO_REQUESTS_PER_HOUR",
+            "TIINGO_MAX_IN_FLIGHT",
         ]
 
         for key in optional_keys:
@@ -0,0 +1,95 @@
+import json
+import os
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+
+
+@dataclass
+class Failure:
+    reason: str
+    failures: int
+    first_failed_at: str
+    last_failed_at: str
+    retry_at: str
+    quarantined: bool = False
+
+
+class FailureCache:
+    """Persistent negative cache of the tickers whose downloads failed.
+
+    Every consecutive failure doubles the time before the ticker is requested again, starting at ``backoff`` and
+    capped at ``max_backoff``. A ticker that failed ``quarantine_after`` times in a row because Tiingo does not know it
+    or has no prices for it is quarantined and only retried every ``quarantine_retry``. Other reasons, e.g. timeouts
+    or HTTP 5xx, affect every ticker during an outage and never lead to a quarantine. A successful download clears
+    the ticker's entry.
+    """
+
+    _FILE = "failures.json"
+    # reasons that are about the symbol itself rather than about Tiingo or the network
+    _SYMBOL_REASONS = {"not_found", "empty"}
+
+    def __init__(
+        self,
+        data_dir: str,
+        backoff: timedelta = timedelta(hours=1),
+        max_backoff: timedelta = timedelta(days=2),
+        quarantine_after: int = 5,
+        quarantine_retry: timedelta = timedelta(days=30),
+    ) -> None:
+        self._path = os.path.join(data_dir, self._FILE)
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._quarantine_after = quarantine_after
+        self._quarantine_retry = quarantine_retry
+        self._failures = self._read()
+        self._dirty = False
+
+    def _read(self) -> dict[str, Failure]:
+        try:
+            with open(self._path, "r") as f:
+                return {ticker: Failure(**failure) for ticker, failure in json.load(f).items()}
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return {}
+
+    def get(self, ticker: str) -> Failure | None:
+        return self._failures.get(ticker)
+
+    def backing_off(self, ticker: str, now: datetime) -> bool:
+        """Whether ``ticker`` failed recently and should not be requested yet."""
+        failure = self._failures.get(ticker)
+        return failure is not None and now < datetime.fromisoformat(failure.retry_at)
+
+    def record(self, ticker: str, reason: str, now: datetime) -> Failure:
+        previous = self._failures.get(ticker)
+        failures = previous.failures + 1 if previous else 1
+        quarantined = reason in self._SYMBOL_REASONS and failures >= self._quarantine_after
+        delay = self._quarantine_retry if quarantined else min(self._backoff * 2 ** (failures - 1), self._max_backoff)
+        failure = Failure(
+            reason=reason,
+            failures=failures,
+            first_failed_at=previous.first_failed_at if previous else now.isoformat(timespec="seconds"),
+            last_failed_at=now.isoformat(timespec="seconds"),
+            retry_at=(now + delay).isoformat(timespec="seconds"),
+            quarantined=quarantined,
+        )
+        self._failures[ticker] = failure
+        self._dirty = True
+        return failure
+
+    def clear(self, ticker: str) -> None:
+        if self._failures.pop(ticker, None) is not None:
+            self._dirty = True
+
+    def quarantined(self) -> dict[str, Failure]:
+        return {ticker: failure for ticker, failure in sorted(self._failures.items()) if failure.quarantined}
+
+    def flush(self) -> None:
+        """Atomically writes the failures to disk if they changed."""
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        tmp_path = f"{self._path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({ticker: asdict(failure) for ticker, failure in self._failures.items()}, f)
+        os.replace(tmp_path, self._path)
+        self._dirty = False
@@ -1,33 +1,109 @@
 import argparse
+import json
+import os
+import re
 from .base_command import BaseCommand
 from rich.console import Console
-import pandas as pd
+from .ticker_group import TickerGroup, Universe
 
 console = Console()
 
+# letters and digits, optionally with a class or exchange suffix after a dot or dash, e.g. BRK-B or SHOP.TO
+_SYMBOL = re.compile(r"^[A-Z0-9]{1,10}([.-][A-Z0-9]{1,4}){0,2}$")
+
+
+def normalize_symbol(value) -> str:
+    """Upper-cases a symbol and removes the whitespace and ``$`` prefix spreadsheets tend to add."""
+    if isinstance(value, float) and value.is_integer():
+        # numeric symbols, e.g. 7203 for Toyota, come back from Excel as floats
+        value = int(value)
+    return str(value).strip().lstrip("$").replace(" ", "").upper()
+
 
 class ImporterCommand(BaseCommand):
     _NAME = "import"
     _DESCRIPTION = "Imports stock tickers from an Excel file."
 
+    _OUTPUT_FILE = "output.json"
+    _COLUMNS = ("Sector", "Subsector", "Company Ticker Symbols")
+
     def __init__(self) -> None:
         super().__init__(self._NAME, self._DESCRIPTION)
 
     def add_arguments(self, parser: argparse.ArgumentParser) -> None:
-        parser.add_argument("--excel", help="import ticker symbols from an Excel file")
+        parser.add_argument("--excel", required=True, help="import ticker symbols from an Excel file")
+        parser.add_argument("--sheet", help="worksheet to import (default: the active one)")
+        parser.add_argument(
+            "--output",
+            default=self._OUTPUT_FILE,
+            help=f"universe file to write, the --json file of rule-runner (default: {self._OUTPUT_FILE})",
+        )
 
     def handle(self, args: argparse.Namespace) -> None:
-        excel_filename = args.excel
-        if excel_filename is not None:
-            self.excel_import(excel_filename)
+        universe = self.excel_import(args.excel, args.sheet)
+        if universe is None:
+            return
+        self.write_universe(args.output, universe)
+        print(f"✅ {len(universe.groups)} groups with {len(universe.index)} unique tickers saved to: {args.output}")
+
+    def excel_import(self, filename: str, sheet: str | None = None) -> Universe | None:
+        """Streams the rows of the workbook and returns the groups with normalized, valid and unique symbols.
+
+        Rows with the same sector and subsector are merged into one group. Invalid symbols are reported with their
+        row number and skipped.
+        """
+        # openpyxl is only needed by this command
+        import openpyxl
+
+        workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+        try:
+            if sheet and sheet not in workbook.sheetnames:
+                console.print(f"[red]❌ No sheet '{sheet}' in {filename}:[/red] {', '.join(workbook.sheetnames)}")
+                return None
+            worksheet = workbook[sheet] if sheet else workbook.active
+            rows = worksheet.iter_rows(values_only=True)
+            header = [str(cell).strip() if cell is not None else "" for cell in next(rows, ())]
+            missing = [column for column in self._COLUMNS if column not in header]
+            if missing:
+                console.print(f"[red]❌ Missing columns in {filename}:[/red] {', '.join(missing)}")
+                return None
+            positions = [header.index(column) for column in self._COLUMNS]
+
+            groups = {}
+            invalid = duplicates = 0
+            for row_number, row in enumerate(rows, start=2):
+                sector, subsector, symbols = (row[p] if p < len(row) else None for p in positions)
+                if sector is None and subsector is None and symbols is None:
+                    continue
+                if not sector or not symbols:
+                    print(f"⚠️ Row {row_number}: no sector or no ticker symbols, skipped")
+                    continue
 
-    def excel_import(self, filename: str) -> None:
-        excel_file = filename
-        df = pd.read_excel(excel_file)
+                key = (str(sector).strip(), str(subsector or "").strip())
+                tickers = groups.setdefault(key, {})
+                for symbol in re.split(r"[,;\n]", str(symbols)) if isinstance(symbols, str) else [symbols]:
+                    ticker = normalize_symbol(symbol)
+                    if not ticker:
+                        continue
+                    if not _SYMBOL.match(ticker):
+                        print(f"⚠️ Row {row_number}: invalid ticker symbol '{str(symbol).strip()}', skipped")
+                        invalid += 1
+                    elif ticker in tickers:
+                        duplicates += 1
+                    else:
+                        tickers[ticker] = None
+        finally:
+            workbook.close()
 
-        # Convert to JSON
-        json_data = df.to_json(orient="records", indent=4)
+        if duplicates or invalid:
+            print(f"🧹 Dropped {duplicates} duplicate and {invalid} invalid ticker symbols")
+        groups = [TickerGroup(sector, subsector, list(tickers)) for (sector, subsector), tickers in groups.items()]
+        return Universe.from_groups([group for group in groups if group.tickers])
 
-        # Save to a .json file
-        with open("output.json", "w") as f:
-            f.write(json_data)
+    @staticmethod
+    def write_universe(path: str, universe: Universe) -> None:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(universe.to_dict(), f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
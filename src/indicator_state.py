@@ -0,0 +1,143 @@
+import math
+from collections import deque
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+
+_CLOSE_WINDOW = 74  # the 50DMA is needed 24 bars back
+_VOLUME_WINDOW = 21  # the 20 day average volume and the 10 day maximum excluding today
+_EMA_SPAN = 10
+_RSI_WINDOW = 14
+_MACD_FAST, _MACD_SLOW, _MACD_SIGNAL = 12, 26, 9
+
+
+def _ewm_step(state: float, x: float, alpha: float) -> float:
+    return x if math.isnan(state) else (1 - alpha) * state + alpha * x
+
+
+@dataclass
+class IndicatorState:
+    """Indicator accumulators of one ticker that can be advanced one bar at a time.
+
+    Holds the 10EMA numerator and denominator, the Wilder averages of the RSI, the fast, slow and signal EMAs of the
+    MACD, and ring buffers with the most recent closes and volumes for the rolling windows. Advancing by one bar costs
+    the same no matter how long the history is.
+
+    The recursive indicators are seeded from the first bar ever seen rather than from the start of the lookback
+    window, so they follow the long-run values and can differ slightly from a recompute over the trimmed window.
+    """
+
+    last_date: str | None = None
+    bars: int = 0
+    ema_num: float = 0.0
+    ema_den: float = 0.0
+    rsi_up: float = math.nan
+    rsi_down: float = math.nan
+    macd_fast: float = math.nan
+    macd_slow: float = math.nan
+    macd_signal: float = math.nan
+    signal_bars: int = 0
+    closes: deque = field(default_factory=lambda: deque(maxlen=_CLOSE_WINDOW))
+    volumes: deque = field(default_factory=lambda: deque(maxlen=_VOLUME_WINDOW))
+
+    @staticmethod
+    def from_dict(data: dict) -> "IndicatorState":
+        data = dict(data)
+        closes = deque(data.pop("closes"), maxlen=_CLOSE_WINDOW)
+        volumes = deque(data.pop("volumes"), maxlen=_VOLUME_WINDOW)
+        return IndicatorState(closes=closes, volumes=volumes, **data)
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["closes"] = list(self.closes)
+        data["volumes"] = list(self.volumes)
+        return data
+
+    def push(self, date: pd.Timestamp, close: float, volume: float) -> None:
+        """Consumes one new bar."""
+        decay = 1 - 2 / (_EMA_SPAN + 1)
+        self.ema_num = self.ema_num * decay + close
+        self.ema_den = self.ema_den * decay + 1
+
+        diff = close - self.closes[-1] if self.closes else 0.0
+        self.rsi_up = _ewm_step(self.rsi_up, max(diff, 0.0), 1 / _RSI_WINDOW)
+        self.rsi_down = _ewm_step(self.rsi_down, max(-diff, 0.0), 1 / _RSI_WINDOW)
+
+        self.macd_fast = _ewm_step(self.macd_fast, close, 2 / (_MACD_FAST + 1))
+        self.macd_slow = _ewm_step(self.macd_slow, close, 2 / (_MACD_SLOW + 1))
+        self.bars += 1
+        if self.bars >= _MACD_SLOW:
+            self.macd_signal = _ewm_step(self.macd_signal, self.macd_fast - self.macd_slow, 2 / (_MACD_SIGNAL + 1))
+            self.signal_bars += 1
+
+        self.closes.append(close)
+        self.volumes.append(volume)
+        self.last_date = date.strftime("%Y-%m-%d")
+
+    def advance(self, df: pd.DataFrame) -> bool:
+        """Consumes the bars of ``df`` that are newer than the state.
+
+        If ``df`` does not contain the last consumed bar, or its recent closes differ from the ones in the ring buffer
+        (the history was re-adjusted after a split or dividend), the state is rebuilt from all of ``df``. Returns
+        ``True`` when that full recompute happened.
+        """
+        start = self._resume_position(df)
+        rebuilt = start is None
+        if rebuilt:
+            self.__dict__.update(vars(IndicatorState()))
+            start = 0
+
+        dates = df.index[start:]
+        closes = df["Close"].to_numpy(dtype="f8")[start:]
+        volumes = df["Volume"].to_numpy(dtype="f8")[start:]
+        for date, close, volume in zip(dates, closes.tolist(), volumes.tolist()):
+            self.push(date, close, volume)
+        return rebuilt
+
+    def _resume_position(self, df: pd.DataFrame) -> int | None:
+        if self.last_date is None:
+            return None
+        position = df.index.searchsorted(pd.Timestamp(self.last_date))
+        if position >= len(df) or df.index[position] != pd.Timestamp(self.last_date):
+            return None
+
+        overlap = min(len(self.closes), position + 1)
+        recent = df["Close"].to_numpy(dtype="f8")[position + 1 - overlap : position + 1]
+        if not np.allclose(recent, list(self.closes)[-overlap:], rtol=1e-9, atol=0):
+            return None
+        return position + 1
+
+    def latest_values(self) -> dict:
+        """Returns the indicator values of the last consumed bar keyed by rule expression, see ``RuleSet.evaluate()``.
+
+        Rule sets that use other windows or periods compute those indicators from the price history instead.
+        """
+        closes = np.array(self.closes)
+        volumes = np.array(self.volumes)
+
+        def window_mean(values: np.ndarray, window: int, offset: int = 0) -> float:
+            end = len(values) - offset
+            return float(values[end - window : end].mean()) if end >= window else math.nan
+
+        def window_max(values: np.ndarray, window: int, offset: int = 0) -> float:
+            end = len(values) - offset
+            return float(values[end - window : end].max()) if end >= window else math.nan
+
+        rsi_val = math.nan
+        if self.bars >= _RSI_WINDOW:
+            rsi_val = 100.0 if self.rsi_down == 0 else 100 - 100 / (1 + self.rsi_up / self.rsi_down)
+
+        return {
+            "sma(Volume, 20)": window_mean(volumes, 20),
+            "shift(rolling_max(Volume, 10), 1)": window_max(volumes, 10, offset=1),
+            "shift(rolling_max(Close, 20), 1)": window_max(closes, 20, offset=1),
+            "shift(rolling_max(Close, 60), 1)": window_max(closes, 60, offset=1),
+            "sma(Close, 50)": window_mean(closes, 50),
+            "shift(sma(Close, 50), 14)": window_mean(closes, 50, offset=14),
+            "shift(sma(Close, 50), 24)": window_mean(closes, 50, offset=24),
+            "ema(Close, 10)": self.ema_num / self.ema_den,
+            "rsi(Close, 14)": rsi_val,
+            "macd(Close, 12, 26)": self.macd_fast - self.macd_slow if self.bars >= _MACD_SLOW else math.nan,
+            "macd_signal(Close, 12, 26, 9)": self.macd_signal if self.signal_bars >= _MACD_SIGNAL else math.nan,
+        }
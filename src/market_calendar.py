@@ -0,0 +1,174 @@
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+from typing import Callable
+
+import pytz
+
+
+def easter(year: int) -> date:
+    """Easter Sunday of ``year`` (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (b - (b + 8) // 25 + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday) // 451
+    month, day = divmod(h + weekday - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th ``weekday`` (Monday is 0) of the month, or the last one when ``n`` is -1."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def nearest_weekday(day: date) -> date:
+    """US rule for fixed-date holidays: Saturday moves to Friday, Sunday to Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+def next_weekday(day: date, taken: set[date]) -> date:
+    """Canadian rule for fixed-date holidays: weekends and days already taken move to the next weekday."""
+    while day.weekday() >= 5 or day in taken:
+        day += timedelta(days=1)
+    return day
+
+
+def nyse_holidays(year: int) -> set[date]:
+    holidays = {
+        nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        easter(year) - timedelta(days=2),  # Good Friday
+        nth_weekday(year, 5, 0, -1),  # Memorial Day
+        nearest_weekday(date(year, 7, 4)),
+        nth_weekday(year, 9, 0, 1),  # Labor Day
+        nth_weekday(year, 11, 3, 4),  # Thanksgiving
+        nearest_weekday(date(year, 12, 25)),
+    }
+    # New Year's Day on a Saturday is not observed on the Friday before, which belongs to the previous year
+    if date(year, 1, 1).weekday() != 5:
+        holidays.add(nearest_weekday(date(year, 1, 1)))
+    if year >= 2022:
+        holidays.add(nearest_weekday(date(year, 6, 19)))  # Juneteenth
+    return holidays
+
+
+def nyse_early_closes(year: int) -> set[date]:
+    """Days the NYSE closes at 1 pm: the eve of Independence Day, the day after Thanksgiving and Christmas Eve."""
+    days = {date(year, 7, 3), nth_weekday(year, 11, 3, 4) + timedelta(days=1), date(year, 12, 24)}
+    return {day for day in days if day.weekday() < 5 and day not in nyse_holidays(year)}
+
+
+def tsx_holidays(year: int) -> set[date]:
+    holidays = {
+        nth_weekday(year, 2, 0, 3),  # Family Day
+        easter(year) - timedelta(days=2),  # Good Friday
+        date(year, 5, 24) - timedelta(days=date(year, 5, 24).weekday()),  # Victoria Day, the Monday before May 25
+        nth_weekday(year, 8, 0, 1),  # Civic Holiday
+        nth_weekday(year, 9, 0, 1),  # Labour Day
+        nth_weekday(year, 10, 0, 2),  # Thanksgiving
+    }
+    for day in (date(year, 1, 1), date(year, 7, 1), date(year, 12, 25), date(year, 12, 26)):
+        holidays.add(next_weekday(day, holidays))
+    return holidays
+
+
+def tsx_early_closes(year: int) -> set[date]:
+    """The TSX closes at 1 pm on Christmas Eve."""
+    day = date(year, 12, 24)
+    return {day} if day.weekday() < 5 and day not in tsx_holidays(year) else set()
+
+
+@dataclass(frozen=True)
+class Exchange:
+    """The regular trading sessions of an exchange, computed offline from its holiday rules.
+
+    Unscheduled closures, e.g. a national day of mourning, are not known in advance and are not included.
+    """
+
+    name: str
+    timezone: str
+    close: time
+    early_close: time
+    holiday_rules: Callable[[int], set[date]]
+    early_close_rules: Callable[[int], set[date]]
+
+    def holidays(self, year: int) -> set[date]:
+        return _holidays(self, year)
+
+    def is_session(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays(day.year)
+
+    def close_at(self, day: date) -> datetime:
+        """When the session of ``day`` closes, as an aware datetime."""
+        close = self.early_close if day in _early_closes(self, day.year) else self.close
+        return pytz.timezone(self.timezone).localize(datetime.combine(day, close))
+
+    def previous_session(self, day: date) -> date:
+        """The last session before ``day``."""
+        day -= timedelta(days=1)
+        while not self.is_session(day):
+            day -= timedelta(days=1)
+        return day
+
+    def last_completed_session(self, now: datetime) -> date:
+        """The most recent session that has closed by ``now``, an aware datetime."""
+        today = now.astimezone(pytz.timezone(self.timezone)).date()
+        if self.is_session(today) and now >= self.close_at(today):
+            return today
+        return self.previous_session(today)
+
+
+@lru_cache(maxsize=None)
+def _holidays(exchange: Exchange, year: int) -> frozenset[date]:
+    return frozenset(exchange.holiday_rules(year))
+
+
+@lru_cache(maxsize=None)
+def _early_closes(exchange: Exchange, year: int) -> frozenset[date]:
+    return frozenset(exchange.early_close_rules(year))
+
+
+NYSE = Exchange("NYSE", "America/New_York", time(16), time(13), nyse_holidays, nyse_early_closes)
+TSX = Exchange("TSX", "America/Toronto", time(16), time(13), tsx_holidays, tsx_early_closes)
+
+# Toronto Stock Exchange and TSX Venture listings, everything else trades on the US calendar
+_TSX_SUFFIXES = (".TO", ".V")
+
+
+def exchange_for(ticker: str) -> Exchange:
+    return TSX if ticker.upper().endswith(_TSX_SUFFIXES) else NYSE
+
+
+class LastSessions:
+    """The last session of each exchange whose end-of-day prices should be published, computed once per exchange.
+
+    Prices that include it are up to date, so nothing has to be downloaded on weekends, holidays or overnight.
+    """
+
+    # how long after the close Tiingo's and Yahoo's end-of-day prices are expected
+    PUBLISH_DELAY = timedelta(minutes=30)
+
+    def __init__(self) -> None:
+        self._sessions: dict[str, date] = {}
+
+    def of(self, ticker: str) -> date:
+        exchange = exchange_for(ticker)
+        if exchange.name not in self._sessions:
+            now = datetime.now(pytz.utc) - self.PUBLISH_DELAY
+            self._sessions[exchange.name] = exchange.last_completed_session(now)
+        return self._sessions[exchange.name]
+
+    def includes(self, ticker: str, last_date: date | None) -> bool:
+        """Whether prices ending on ``last_date`` include the last session of the ticker's exchange."""
+        return last_date is not None and last_date >= self.of(ticker)
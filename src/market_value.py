@@ -1,15 +1,17 @@
 from datetime import date, datetime, timedelta
-from jinja2 import Environment, FileSystemLoader
 from rich.console import Console
 import argparse
 import os
 import pandas as pd
 import plotly.graph_objs as go
 import yfinance as yf
+from typing import List
 
-from .config import Config
+from .chart_bundle import Chart, write_chart_bundle
+from .market_calendar import LastSessions
+from .portfolio import Valuation, load_holdings, symbols_of, value_portfolio
+from .price_store import PriceStore
 from .base_command import BaseCommand
-from .ticker_group import TickerGroup
 
 console = Console()
 
@@ -19,118 +21,198 @@ class MarketValueCommand(BaseCommand):
     _DESCRIPTION = "generates a graph in HTML display the daily value of a stock"
 
     _DATA_DIR = "stock_data"
+    # the Yahoo Finance downloads are kept apart, the prices in stock_data/ are Tiingo's and only rule-runner and
+    # backtest write them
+    _YAHOO_DIR = os.path.join(_DATA_DIR, "yahoo")
+    _BUNDLE_DIR = os.path.join("public", "market_value")
+    _MAX_POINTS = 1000
+    _CACHE_TTL = timedelta(hours=1)
 
     def __init__(self) -> None:
         super().__init__(self._NAME, self._DESCRIPTION)
-        os.makedirs(self._DATA_DIR, exist_ok=True)
-
-    # def add_arguments(self, parser: argparse.ArgumentParser) -> None:
-    # parser.add_argument("--json", help="use the stock tickers from the JSON file")
-    # parser.add_argument("--sector", help="filter groups by sector name (case-insensitive)")
+        self._store = PriceStore(self._DATA_DIR)
+        self._yahoo_store = PriceStore(self._YAHOO_DIR)
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument(
+            "--holdings",
+            required=True,
+            help="CSV or JSON file with the purchase lots (symbol, date, shares and optional account and price)",
+        )
+        parser.add_argument("--account", help="only value the lots of this account")
+        parser.add_argument("--start", help="first date of the charts (default: the date of the first lot)")
+        parser.add_argument(
+            "--bundle",
+            action="store_true",
+            help=f"write the charts to {self._BUNDLE_DIR}/ as one lazy-loading page with a shared plotly.js",
+        )
+        parser.add_argument(
+            "--max-points",
+            type=int,
+            default=self._MAX_POINTS,
+            help=f"with --bundle, downsample each chart to this many points, 0 keeps all (default: {self._MAX_POINTS})",
+        )
 
     def handle(self, args: argparse.Namespace) -> None:
-        holdings = {
-            "XUS.TO": [
-                {"date": "2025-04-10", "shares": 100},
-                {"date": "2025-04-15", "shares": 100},
-                {"date": "2025-05-13", "shares": 100},
-                {"date": "2025-05-13", "shares": 200},
-            ],
-            # "MSFT": [{"date": "2025-04-10", "shares": 3}, {"date": "2025-04-15", "shares": 2}],
-        }
-
-        start_date = "2025-04-10"
+        lots = load_holdings(args.holdings)
+        if args.account:
+            lots = lots[lots["account"] == args.account]
+        if lots.empty:
+            print("⚠️ No holdings to value. Check the holdings file and --account.")
+            return
+
+        start_date = pd.Timestamp(args.start) if args.start else lots["date"].min()
         end_date = date.today()
-        all_prices = {}
-
-        for symbol, purchases in holdings.items():
-            # try:
-            df = yf.download(symbol, start=start_date, end=end_date)
-            df.columns = [f"{col}" for col, _ in df.columns]
-            print(f"df: {df.columns}")
-            if df.empty:
-                print(f"❌ No data for {symbol}")
-                continue
-
-            # Build a time series of cumulative shares held
-            shares_series = pd.Series(0, index=df.index)
-            book_value_series = pd.Series(0.0, index=df.index)
-            for purchase in purchases:
-                purchase_date = pd.to_datetime(purchase["date"])
-                # Use the close price on the purchase date (or next available date)
-                if purchase_date in df.index:
-                    price = df.loc[purchase_date, "Close"]
-                    shares_series.loc[purchase_date] += purchase["shares"]
-                    book_value_series.loc[purchase_date] += purchase["shares"] * price
-                else:
-                    next_idx = shares_series.index.searchsorted(purchase_date)
-                    if next_idx < len(shares_series):
-                        next_date = shares_series.index[next_idx]
-                        price = df.loc[next_date, "Close"]
-                        shares_series.iloc[next_idx] += purchase["shares"]
-                        book_value_series.iloc[next_idx] += purchase["shares"] * price
-                    else:
-                        print(f"⚠️ Purchase date {purchase['date']} for {symbol} is after available data.")
-
-            df["SharesHeld"] = shares_series.cumsum()
-            df["MarketValue"] = df["Close"] * df["SharesHeld"]
-            df["BookValue"] = book_value_series.cumsum()
-            all_prices[symbol] = df["MarketValue"].rename(symbol)
-            # Store book value for plotting
-            all_prices[f"{symbol}_BookValue"] = df["BookValue"].rename(f"{symbol}_BookValue")
-            print(f"✅ Loaded {symbol}")
-        # except Exception as e:
-        #     print(f"❌ Failed to load {symbol}: {e}")
-
-        print(f"all_prices: {all_prices}")
-
-        # Combine into one DataFrame
-        if all_prices:
-            combined = pd.concat(all_prices.values(), axis=1).fillna(0)
-            combined["TotalValue"] = combined[[k for k in combined.columns if not k.endswith("_BookValue")]].sum(axis=1)
-            combined.index.name = "Date"
-
-            # Plot a separate graph for each ticker
-            for symbol in holdings:
-                if symbol in combined:
-                    fig = go.Figure()
-                    fig.add_trace(
-                        go.Scatter(x=combined.index, y=combined[symbol], mode="lines", name=f"{symbol} Market Value")
-                    )
-                    # Add Book Value line
-                    book_value_col = f"{symbol}_BookValue"
-                    if book_value_col in combined:
-                        fig.add_trace(
-                            go.Scatter(
-                                x=combined.index,
-                                y=combined[book_value_col],
-                                mode="lines",
-                                name=f"{symbol} Book Value",
-                                line=dict(dash="dash", color="gray"),
-                            )
-                        )
-                    fig.update_layout(
-                        title=f"Daily Market Value of {symbol}",
-                        xaxis_title="Date",
-                        yaxis_title="Value",
-                        template="plotly_white",
-                    )
-                    filename = f"public/market_value_{symbol.replace('.', '_')}.html"
-                    fig.write_html(filename)
-                    print(f"📊 Chart for {symbol} saved to: {filename}")
-
-            # Optionally, keep the total portfolio chart as well
-            fig_total = go.Figure()
-            fig_total.add_trace(
-                go.Scatter(x=combined.index, y=combined["TotalValue"], mode="lines", name="Total Portfolio Value")
+        symbols = symbols_of(lots)
+        print(f"💼 Valuing {len(lots)} lots of {len(symbols)} symbols in {lots['account'].nunique()} accounts")
+
+        close = self.load_prices(symbols, start_date, end_date)
+        if close.empty:
+            print("⚠️ No data was loaded. Check your symbols.")
+            return
+
+        valuation = value_portfolio(lots, close, start_date)
+        for symbol in symbols_of(valuation.unknown_lots):
+            print(f"⚠️ No prices for {symbol}, its lots are not valued.")
+        for lot in valuation.early_lots.itertuples():
+            cost = f"at {lot.price:g}" if pd.notna(lot.price) else "at that close"
+            print(
+                f"⚠️ Purchase date {lot.date.date()} for {lot.symbol} is before the first price, "
+                f"counted from {lot.counted_from.date()} {cost}."
+            )
+        for lot in valuation.unpriced_lots.itertuples():
+            print(f"⚠️ Purchase date {lot.date.date()} for {lot.symbol} is after available data.")
+
+        if args.bundle:
+            self.write_bundle(close.index, valuation, args.max_points)
+            return
+
+        os.makedirs("public", exist_ok=True)
+        # Plot a separate graph for each ticker
+        for symbol in close.columns:
+            fig = go.Figure()
+            fig.add_trace(
+                go.Scatter(
+                    x=close.index,
+                    y=valuation.market_value[symbol],
+                    mode="lines",
+                    name=f"{symbol} Market Value",
+                )
             )
-            fig_total.update_layout(
-                title="Daily Market Value of Holdings",
+            fig.add_trace(
+                go.Scatter(
+                    x=close.index,
+                    y=valuation.book_value[symbol],
+                    mode="lines",
+                    name=f"{symbol} Book Value",
+                    line=dict(dash="dash", color="gray"),
+                )
+            )
+            fig.update_layout(
+                title=f"Daily Market Value of {symbol}",
                 xaxis_title="Date",
                 yaxis_title="Value",
                 template="plotly_white",
             )
-            fig_total.write_html("public/market_value.html")
-            print("📊 Total portfolio chart saved to: market_value_chart_total.html")
-        else:
-            print("⚠️ No data was loaded. Check your symbols.")
+            filename = f"public/market_value_{symbol.replace('.', '_')}.html"
+            fig.write_html(filename)
+            print(f"📊 Chart for {symbol} saved to: {filename}")
+
+        # The total portfolio chart, with one line per account when there are several
+        fig_total = go.Figure()
+        fig_total.add_trace(go.Scatter(x=close.index, y=valuation.total, mode="lines", name="Total Portfolio Value"))
+        if len(valuation.account_value.columns) > 1:
+            for account in valuation.account_value.columns:
+                fig_total.add_trace(
+                    go.Scatter(x=close.index, y=valuation.account_value[account], mode="lines", name=account)
+                )
+        fig_total.update_layout(
+            title="Daily Market Value of Holdings",
+            xaxis_title="Date",
+            yaxis_title="Value",
+            template="plotly_white",
+        )
+        fig_total.write_html("public/market_value.html")
+        print("📊 Total portfolio chart saved to: public/market_value.html")
+
+    def write_bundle(self, dates: pd.DatetimeIndex, valuation: Valuation, max_points: int) -> None:
+        total = Chart("total", "Daily Market Value of Holdings", dates)
+        total.add_trace("Total Portfolio Value", valuation.total)
+        if len(valuation.account_value.columns) > 1:
+            for account in valuation.account_value.columns:
+                total.add_trace(account, valuation.account_value[account])
+        charts = [total]
+
+        for symbol in valuation.market_value.columns:
+            chart = Chart(symbol, f"Daily Market Value of {symbol}", dates)
+            chart.add_trace(f"{symbol} Market Value", valuation.market_value[symbol])
+            chart.add_trace(f"{symbol} Book Value", valuation.book_value[symbol], dash="dash")
+            charts.append(chart)
+
+        index_path = write_chart_bundle(self._BUNDLE_DIR, "Market Value of Holdings", charts, max_points)
+        print(f"📊 {len(charts)} charts saved to: {index_path}")
+
+    def load_prices(self, symbols: List[str], start_date: pd.Timestamp, end_date: date) -> pd.DataFrame:
+        """Returns the closes of ``symbols`` from ``start_date`` as a ``(dates, symbols)`` frame.
+
+        Prices come from the shared price store, or from the Yahoo Finance downloads of earlier runs, when they are
+        fresh and cover ``start_date``. All the other symbols are downloaded from Yahoo Finance in one batched request
+        and kept in ``stock_data/yahoo/``, the shared store is never written.
+        """
+        closes = {}
+        stale = []
+        sessions = LastSessions()
+        for symbol in symbols:
+            cached = self.read_cached(self._store, symbol, start_date, sessions)
+            if cached is None:
+                cached = self.read_cached(self._yahoo_store, symbol, start_date, sessions)
+            if cached is None:
+                stale.append(symbol)
+            else:
+                closes[symbol] = cached.loc[start_date:, "Close"]
+
+        if stale:
+            print(f"⬇️ Downloading data for symbols: {', '.join(stale)}")
+            # the end date is exclusive, the bar of a session that has closed today is needed to be fresh, the bar of
+            # one still trading is dropped below
+            df = yf.download(
+                stale, start=start_date, end=end_date + timedelta(days=1), group_by="ticker", progress=False
+            )
+            for symbol in stale:
+                prices = df[symbol] if isinstance(df.columns, pd.MultiIndex) else df
+                prices = prices.dropna(subset=["Close"]) if "Close" in prices else prices.iloc[0:0]
+                # a partial close and volume would pass for the last session's
+                prices = prices.loc[: pd.Timestamp(sessions.of(symbol))]
+                if prices.empty:
+                    print(f"❌ No data for {symbol}")
+                    continue
+                self._yahoo_store.write(symbol, prices)
+                closes[symbol] = prices["Close"]
+            self._yahoo_store.flush()
+
+        return pd.DataFrame({symbol: closes[symbol] for symbol in symbols if symbol in closes})
+
+    def read_cached(
+        self, store: PriceStore, symbol: str, start_date: pd.Timestamp, sessions: LastSessions
+    ) -> pd.DataFrame | None:
+        """The prices of ``symbol`` in ``store`` if they are fresh and start by ``start_date``, otherwise ``None``."""
+        if not self.is_fresh(store, symbol, sessions):
+            return None
+        cached = store.read(symbol)
+        # allow for the start date falling on a weekend or holiday
+        if cached is None or cached.empty or cached.index[0] > start_date + timedelta(days=4):
+            return None
+        return cached
+
+    def is_fresh(self, store: PriceStore, symbol: str, sessions: LastSessions) -> bool:
+        """Whether the prices of ``symbol`` in ``store`` are up to date, by the same rule as ``rule-runner``.
+
+        They are when they include the last completed session of the symbol's exchange, or were fetched within the
+        hour, so nothing is downloaded again on weekends and holidays.
+        """
+        meta = store.meta(symbol)
+        if meta is None:
+            return False
+        if datetime.now() - datetime.fromisoformat(meta["fetched_at"]) <= self._CACHE_TTL:
+            return True
+        return sessions.includes(symbol, date.fromisoformat(meta["last_date"]) if meta["last_date"] else None)
@@ -0,0 +1,157 @@
+import json
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+_PERCENTILES = (50, 90, 99)
+
+
+def _key(name: str, labels: dict) -> str:
+    """``name{label="value",...}``, the Prometheus notation, used as the key of every series."""
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metrics:
+    """Stage timers, counters and latency samples of one run, safe to update from the download threads.
+
+    Counters take optional labels, e.g. ``metrics.count("failures", reason="http_404")``. The summary is written as
+    JSON and, optionally, in the Prometheus text format for the node exporter's textfile collector.
+    """
+
+    def __init__(self, prefix: str = "rule_runner") -> None:
+        self.prefix = prefix
+        self.started_at = datetime.now()
+        self.finished_at: datetime | None = None
+        self._lock = threading.Lock()
+        self._stages: dict[str, float] = {}
+        self._counters: dict[str, float] = {}
+        self._samples: dict[str, list[float]] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        """Times the enclosed block, stages entered several times accumulate."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stages[name] = self._stages.get(name, 0.0) + elapsed
+
+    def finish(self) -> None:
+        """Marks the run as finished, the time of the first call is the last run's timestamp."""
+        if self.finished_at is None:
+            self.finished_at = datetime.now()
+
+    def count(self, name: str, value: float = 1, **labels) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+
+    def snapshot(self) -> dict:
+        """The stage times, counters and latency samples as plain dicts, which can be pickled, see ``merge()``."""
+        with self._lock:
+            return {
+                "stages": dict(self._stages),
+                "counters": dict(self._counters),
+                "samples": {name: list(samples) for name, samples in self._samples.items()},
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        """Adds the ``snapshot()`` of other metrics, e.g. those of a worker process, to these."""
+        with self._lock:
+            for name, seconds in snapshot["stages"].items():
+                self._stages[name] = self._stages.get(name, 0.0) + seconds
+            for key, value in snapshot["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for name, samples in snapshot["samples"].items():
+                self._samples.setdefault(name, []).extend(samples)
+
+    def summary(self) -> dict:
+        with self._lock:
+            latencies = {}
+            for name, samples in self._samples.items():
+                values = np.array(samples)
+                latencies[name] = {
+                    "count": len(values),
+                    "mean": float(values.mean()),
+                    "max": float(values.max()),
+                    **{f"p{p}": float(v) for p, v in zip(_PERCENTILES, np.percentile(values, _PERCENTILES))},
+                }
+            return {
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "finished_at": self.finished_at and self.finished_at.isoformat(timespec="seconds"),
+                "stages": dict(self._stages),
+                "counters": dict(self._counters),
+                "latencies": latencies,
+            }
+
+    def write_json(self, path: str) -> None:
+        self._write(path, json.dumps(self.summary(), indent=2) + "\n")
+
+    def write_prometheus(self, path: str) -> None:
+        """Writes the summary in the Prometheus text format, for the node exporter's textfile collector."""
+        self._write(path, self.prometheus_text())
+
+    def prometheus_text(self) -> str:
+        """The summary in the Prometheus text exposition format."""
+        summary = self.summary()
+        last_run = self.finished_at or self.started_at
+        lines = [
+            f"# TYPE {self.prefix}_last_run_timestamp_seconds gauge",
+            f"{self.prefix}_last_run_timestamp_seconds {last_run.timestamp():.0f}",
+            f"# TYPE {self.prefix}_stage_seconds gauge",
+        ]
+        for stage, seconds in summary["stages"].items():
+            lines.append(_key(f"{self.prefix}_stage_seconds", {"stage": stage}) + f" {seconds:.6f}")
+
+        typed = set()
+        for key, value in sorted(summary["counters"].items()):
+            name, brace, labels = key.partition("{")
+            name = f"{self.prefix}_{name}_total"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{brace}{labels} {value:g}")
+
+        for name, stats in summary["latencies"].items():
+            metric = f"{self.prefix}_{name}_seconds"
+            lines.append(f"# TYPE {metric} summary")
+            for p in _PERCENTILES:
+                lines.append(_key(metric, {"quantile": p / 100}) + f" {stats[f'p{p}']:.6f}")
+            lines.append(f"{metric}_sum {stats['mean'] * stats['count']:.6f}")
+            lines.append(f"{metric}_count {stats['count']}")
+        return "\n".join(lines) + "\n"
+
+    def format_stages(self) -> str:
+        return ", ".join(f"{name} {seconds:.2f}s" for name, seconds in self.summary()["stages"].items())
+
+    @staticmethod
+    def _write(path: str, text: str) -> None:
+        # the textfile collector must never read a partial file
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+
+def failure_reason(error: Exception) -> str:
+    """A short label for why a download failed, e.g. ``not_found``, ``http_503`` or ``connection``."""
+    if hasattr(error, "status"):
+        if error.status == 404:
+            return "not_found"
+        # a TiingoError without a status is a connection failure or exhausted retries
+        return f"http_{error.status}" if error.status else "connection"
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", type(error).__name__).lower()
@@ -0,0 +1,39 @@
+from typing import List
+
+import numpy as np
+
+from .rule_engine import Result, RuleSet
+
+
+def build_panel(tickers: List[str], data_map: dict) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Aligns the price histories of ``tickers`` into ``(dates, tickers)`` close and volume arrays.
+
+    Histories are aligned on their last bar and padded with ``NaN`` at the top, so row ``-k`` is the k-th most recent
+    bar of every ticker. This is what the per-ticker rules index into, and it equals date alignment whenever the
+    tickers trade on the same calendar. Also returns the number of bars of each ticker.
+    """
+    lengths = np.array([len(data_map[t]) for t in tickers], dtype=np.int64)
+    rows = int(lengths.max()) if len(lengths) else 0
+    close = np.full((rows, len(tickers)), np.nan)
+    volume = np.full((rows, len(tickers)), np.nan)
+    for i, ticker in enumerate(tickers):
+        df = data_map[ticker]
+        n = lengths[i]
+        if n:
+            close[rows - n :, i] = df["Close"].to_numpy(dtype="f8")
+            volume[rows - n :, i] = df["Volume"].to_numpy(dtype="f8")
+    return close, volume, lengths
+
+
+def screen_panel(tickers: List[str], data_map: dict, rules: RuleSet) -> List[Result]:
+    """Evaluates ``rules`` for all ``tickers`` at once.
+
+    The indicators are computed for the whole universe in one vectorized pass over the aligned panel, and only the
+    final result assembly loops over tickers. Returns the same results as ``check_stock_criteria``, in ``tickers``
+    order.
+    """
+    if not tickers:
+        return []
+
+    close, volume, lengths = build_panel(tickers, data_map)
+    return rules.evaluate_panel(tickers, close, volume, lengths)
@@ -0,0 +1,155 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from .metrics import Metrics
+from .panel_screener import build_panel
+
+# set by _init_worker() in each worker process
+_runner = None
+
+
+class SharedArray:
+    """A NumPy array backed by a named shared memory block that worker processes can attach to without copying."""
+
+    def __init__(self, shape: tuple, dtype: str, name: str | None = None) -> None:
+        size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        self._owner = name is None
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=max(size, 1))
+        self.shape = shape
+        self.dtype = dtype
+        self.array = np.ndarray(shape, dtype=dtype, buffer=self.shm.buf)
+
+    @staticmethod
+    def copy_of(values: np.ndarray) -> "SharedArray":
+        shared = SharedArray(values.shape, values.dtype.str)
+        shared.array[...] = values
+        return shared
+
+    def spec(self) -> tuple:
+        """What a worker needs to attach to the block: ``(name, shape, dtype)``."""
+        return self.shm.name, self.shape, self.dtype
+
+    @staticmethod
+    def attach(spec: tuple) -> "SharedArray":
+        name, shape, dtype = spec
+        return SharedArray(shape, dtype, name=name)
+
+    def close(self) -> None:
+        del self.array
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _init_worker(incremental: bool, rules_file: str | None, top_only: bool) -> None:
+    global _runner
+    # imported here, the rule runner imports this module
+    from .rule_engine import RuleSet
+    from .rule_runner import RuleRunnerCommand
+
+    _runner = RuleRunnerCommand()
+    _runner._incremental = incremental
+    _runner._rules = RuleSet.load(rules_file)
+    _runner._top_only = top_only
+
+
+def _screen_shard(
+    tickers: List[str], start: int, stop: int, lengths: np.ndarray, specs: dict, panel: bool
+) -> tuple[list, list, dict]:
+    """Screens one shard, returns its results, its invalid tickers and the ``Metrics.snapshot()`` of the shard."""
+    # a shard's own metrics, the parent merges them into those of the run
+    _runner._metrics = Metrics()
+    arrays = {key: SharedArray.attach(spec) for key, spec in specs.items()}
+    try:
+        close = arrays["close"].array[:, start:stop]
+        volume = arrays["volume"].array[:, start:stop]
+        if panel:
+            return _runner._rules.evaluate_panel(tickers, close, volume, lengths), [], _runner._metrics.snapshot()
+
+        dates = arrays["dates"].array[:, start:stop]
+        rows = len(close)
+
+        def frames():
+            for i, ticker in enumerate(tickers):
+                first = rows - lengths[i]
+                yield ticker, pd.DataFrame(
+                    {"Close": close[first:, i], "Volume": volume[first:, i]},
+                    index=pd.DatetimeIndex(dates[first:, i].astype("datetime64[ns]"), name="date"),
+                )
+
+        results, invalid_tickers = _runner.screen_each(frames())
+        return results, invalid_tickers, _runner._metrics.snapshot()
+    finally:
+        for shared in arrays.values():
+            shared.close()
+
+
+def screen_parallel(
+    tickers: List[str],
+    data_map: dict,
+    workers: int,
+    panel: bool = False,
+    incremental: bool = False,
+    rules_file: str | None = None,
+    top_only: bool = False,
+    metrics: Metrics | None = None,
+) -> tuple[list, list]:
+    """Screens ``tickers`` on a pool of ``workers`` processes.
+
+    The aligned price panel is placed in shared memory once and every worker attaches to it and screens a contiguous
+    shard of its columns, so no DataFrames are pickled. Shards are gathered in order, so the results are in
+    ``tickers`` order no matter which worker finishes first. Returns the results and the tickers that failed.
+
+    The per-ticker timings and failure counts of the workers are added to ``metrics``.
+    """
+    if not tickers:
+        return [], []
+
+    close, volume, lengths = build_panel(tickers, data_map)
+    shared = {"close": SharedArray.copy_of(close), "volume": SharedArray.copy_of(volume)}
+    if not panel:
+        dates = np.zeros(close.shape, dtype="datetime64[D]")
+        for i, ticker in enumerate(tickers):
+            index = pd.DatetimeIndex(data_map[ticker].index)
+            if index.tz is not None:
+                index = index.tz_localize(None)
+            dates[len(dates) - lengths[i] :, i] = index.values.astype("datetime64[D]")
+        shared["dates"] = SharedArray.copy_of(dates)
+    del close, volume
+
+    # a few shards per worker keep the pool busy when some shards are slower than others
+    shards = [s for s in np.array_split(np.arange(len(tickers)), workers * 4) if len(s)]
+    specs = {key: array.spec() for key, array in shared.items()}
+    results = []
+    invalid_tickers = []
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(incremental, rules_file, top_only)
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _screen_shard,
+                    tickers[s[0] : s[-1] + 1],
+                    int(s[0]),
+                    int(s[-1]) + 1,
+                    lengths[s[0] : s[-1] + 1],
+                    specs,
+                    panel,
+                )
+                for s in shards
+            ]
+            for future in futures:
+                shard_results, shard_invalid, shard_metrics = future.result()
+                results.extend(shard_results)
+                invalid_tickers.extend(shard_invalid)
+                if metrics is not None:
+                    metrics.merge(shard_metrics)
+    finally:
+        for array in shared.values():
+            array.close()
+
+    return results, invalid_tickers
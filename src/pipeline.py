@@ -0,0 +1,85 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
+
+class _Failure:
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Pipeline:
+    """Runs functions on a pool of worker threads and hands their results to the consuming thread through a bounded
+    queue, in the order they complete.
+
+    A worker that finishes while ``capacity`` results are waiting blocks until the consumer takes one, so workers
+    that get ahead of the consumer are held back instead of piling their results up in memory. An exception raised by
+    a function is re-raised in the consumer. The time each side spent waiting for the other is kept in
+    ``worker_wait`` and ``consumer_wait``.
+    """
+
+    _POLL_SECONDS = 0.1
+
+    def __init__(self, workers: int, capacity: int) -> None:
+        self._executor = ThreadPoolExecutor(max(1, workers), thread_name_prefix="pipeline")
+        self._queue = queue.Queue(maxsize=max(1, capacity))
+        self._closed = threading.Event()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.worker_wait = 0.0
+        self.consumer_wait = 0.0
+
+    def __enter__(self) -> "Pipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def submit(self, fn: Callable, *args) -> None:
+        self._pending += 1
+        self._executor.submit(self._run, fn, args)
+
+    def completed(self) -> Iterator:
+        """Yields the results that are ready, without waiting for the others."""
+        while self._pending:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            yield self._take(item)
+
+    def remaining(self) -> Iterator:
+        """Yields the result of every function submitted so far, waiting for each."""
+        while self._pending:
+            start = time.perf_counter()
+            item = self._queue.get()
+            self.consumer_wait += time.perf_counter() - start
+            yield self._take(item)
+
+    def close(self) -> None:
+        """Cancels the functions that have not started and waits for the running ones, whose results are dropped."""
+        self._closed.set()
+        self._executor.shutdown(cancel_futures=True)
+
+    def _take(self, item):
+        self._pending -= 1
+        if isinstance(item, _Failure):
+            raise item.error
+        return item
+
+    def _run(self, fn: Callable, args: tuple) -> None:
+        try:
+            item = fn(*args)
+        except BaseException as e:
+            item = _Failure(e)
+        start = time.perf_counter()
+        while not self._closed.is_set():
+            try:
+                self._queue.put(item, timeout=self._POLL_SECONDS)
+                break
+            except queue.Full:
+                pass
+        with self._lock:
+            self.worker_wait += time.perf_counter() - start
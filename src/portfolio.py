@@ -0,0 +1,116 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+_LOT_COLUMNS = ["account", "symbol", "date", "shares", "price"]
+
+
+def load_holdings(path: str) -> pd.DataFrame:
+    """Reads the purchase lots of a portfolio from a CSV or JSON file.
+
+    CSV files have ``symbol``, ``date`` and ``shares`` columns, and optionally ``account`` and ``price`` (the price
+    paid per share; the close on the purchase date is used when it is missing). JSON files hold either a list of lot
+    objects with the same keys, or an object mapping each symbol to its lots, e.g.
+    ``{"XUS.TO": [{"date": "2025-04-10", "shares": 100}]}``. Sales are lots with negative shares.
+    """
+    if os.path.splitext(path)[1].lower() == ".json":
+        with open(path) as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [dict(lot, symbol=symbol) for symbol, lots in data.items() for lot in lots]
+        lots = pd.DataFrame(data)
+    else:
+        lots = pd.read_csv(path, skipinitialspace=True)
+
+    lots.columns = [str(c).strip().lower() for c in lots.columns]
+    missing = [c for c in ("symbol", "date", "shares") if c not in lots.columns]
+    if missing:
+        raise ValueError(f"{path}: missing columns {', '.join(missing)}")
+
+    if "account" not in lots.columns:
+        lots["account"] = "default"
+    if "price" not in lots.columns:
+        lots["price"] = np.nan
+    lots = lots[_LOT_COLUMNS].copy()
+    lots["account"] = lots["account"].fillna("default").astype(str).str.strip()
+    lots["symbol"] = lots["symbol"].astype(str).str.strip().str.upper()
+    lots["date"] = pd.to_datetime(lots["date"])
+    lots["shares"] = pd.to_numeric(lots["shares"])
+    lots["price"] = pd.to_numeric(lots["price"])
+    return lots
+
+
+@dataclass
+class Valuation:
+    """Daily values of a portfolio, every frame is indexed by date."""
+
+    shares: pd.DataFrame  # shares held per symbol
+    market_value: pd.DataFrame  # per symbol
+    book_value: pd.DataFrame  # per symbol
+    account_value: pd.DataFrame  # market value per account
+    unpriced_lots: pd.DataFrame  # lots dated after the last available price
+    unknown_lots: pd.DataFrame  # lots of symbols without any price
+    early_lots: pd.DataFrame  # lots dated before the start or the first price, with the date they count from
+
+    @property
+    def total(self) -> pd.Series:
+        return self.market_value.sum(axis=1).rename("TotalValue")
+
+
+def value_portfolio(lots: pd.DataFrame, close: pd.DataFrame, start: pd.Timestamp | None = None) -> Valuation:
+    """Values ``lots`` against ``close``, a ``(dates, symbols)`` frame of closing prices.
+
+    All lots are applied at once: each lot is mapped to the first date on or after its purchase date and to its
+    account and symbol, and the share and cost changes are scatter-added into ``(dates, accounts, symbols)`` arrays
+    with ``np.add.at`` before a cumulative sum over the dates. Closes are carried forward over dates on which a
+    symbol did not trade, such as holidays of another exchange.
+
+    Lots dated before ``start`` (default: the first date of ``close``) or before the first close of their symbol
+    count from that first close, which is also their cost when they have no price.
+    """
+    close = close.sort_index().ffill()
+    dates = close.index
+    prices = close.to_numpy(dtype="f8")
+    accounts, account_codes = np.unique(lots["account"].to_numpy(dtype=str), return_inverse=True)
+    symbol_codes = close.columns.get_indexer(lots["symbol"])
+    lot_dates = lots["date"].to_numpy()
+    rows = dates.searchsorted(lot_dates)
+
+    known = symbol_codes >= 0
+    first_rows = np.argmax(~np.isnan(prices), axis=0)[np.where(known, symbol_codes, 0)]
+    early = known & ((lot_dates < (dates[0] if start is None else start)) | (rows < first_rows))
+    rows = np.where(known, np.maximum(rows, first_rows), rows)
+    early_lots = lots[early].assign(counted_from=dates[rows[early]])
+
+    priced = (rows < len(dates)) & known
+    rows, symbol_codes, account_codes = rows[priced], symbol_codes[priced], account_codes[priced]
+    lot_shares = lots["shares"].to_numpy(dtype="f8")[priced]
+    lot_prices = lots["price"].to_numpy(dtype="f8")[priced]
+    lot_prices = np.where(np.isnan(lot_prices), prices[rows, symbol_codes], lot_prices)
+
+    shares = np.zeros((len(dates), len(accounts), len(close.columns)))
+    np.add.at(shares, (rows, account_codes, symbol_codes), lot_shares)
+    shares = shares.cumsum(axis=0)
+    book = np.zeros((len(dates), len(close.columns)))
+    np.add.at(book, (rows, symbol_codes), lot_shares * lot_prices)
+
+    # no price yet (before the first bar of a symbol) counts as no value
+    prices = np.nan_to_num(prices)
+    symbol_shares = shares.sum(axis=1)
+    return Valuation(
+        shares=pd.DataFrame(symbol_shares, index=dates, columns=close.columns),
+        market_value=pd.DataFrame(symbol_shares * prices, index=dates, columns=close.columns),
+        book_value=pd.DataFrame(book.cumsum(axis=0), index=dates, columns=close.columns),
+        account_value=pd.DataFrame(np.einsum("das,ds->da", shares, prices), index=dates, columns=accounts),
+        unpriced_lots=lots[known & ~priced],
+        unknown_lots=lots[~known],
+        early_lots=early_lots,
+    )
+
+
+def symbols_of(lots: pd.DataFrame) -> List[str]:
+    return list(dict.fromkeys(lots["symbol"]))
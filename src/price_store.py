@@ -0,0 +1,148 @@
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+class PriceStore:
+    """Columnar on-disk cache of daily prices.
+
+    Each ticker is stored as a structured NumPy array in its own ``.npy`` file, which can be memory-mapped on
+    read instead of parsed. A single ``index.json`` file keeps the metadata for every ticker (last bar date, fetch
+    timestamp and row count), so freshness checks never have to open the price files.
+
+    Prices and volumes are stored as ``float32``, 16 bytes per bar instead of 24; the screen computes its indicators
+    in ``float64`` from them. Files written with ``float64`` columns are read with the same precision.
+    """
+
+    _INDEX_FILE = "index.json"
+
+    # float32 volumes rather than int32, split-adjusted volumes are fractional and can exceed 2**31
+    DTYPE = np.dtype([("date", "datetime64[D]"), ("close", "f4"), ("volume", "f4")])
+
+    def __init__(self, data_dir: str) -> None:
+        self._data_dir = data_dir
+        os.makedirs(self._data_dir, exist_ok=True)
+        self._index = self._read_index()
+        self._dirty = False
+
+    def _index_path(self) -> str:
+        return os.path.join(self._data_dir, self._INDEX_FILE)
+
+    def _ticker_path(self, ticker: str) -> str:
+        return os.path.join(self._data_dir, f"{ticker}.npy")
+
+    def _state_path(self, ticker: str) -> str:
+        return os.path.join(self._data_dir, f"{ticker}.state.json")
+
+    def _read_index(self) -> dict:
+        try:
+            with open(self._index_path(), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def tickers(self) -> list[str]:
+        return list(self._index.keys())
+
+    def meta(self, ticker: str) -> dict | None:
+        """Returns the metadata entry for ``ticker``, or ``None`` if it has never been stored."""
+        return self._index.get(ticker)
+
+    def fetched_at(self, ticker: str) -> datetime | None:
+        meta = self.meta(ticker)
+        return datetime.fromisoformat(meta["fetched_at"]) if meta else None
+
+    def read_array(self, ticker: str) -> np.ndarray | None:
+        """Memory-maps the stored structured array for ``ticker`` without copying it."""
+        if ticker not in self._index:
+            return None
+        try:
+            return np.load(self._ticker_path(ticker), mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def read(self, ticker: str) -> pd.DataFrame | None:
+        """Returns the stored prices for ``ticker`` as a DataFrame with ``Close`` and ``Volume`` columns."""
+        arr = self.read_array(ticker)
+        if arr is None:
+            return None
+        return self.to_frame(arr)
+
+    @classmethod
+    def to_frame(cls, arr: np.ndarray) -> pd.DataFrame:
+        """The prices of ``arr`` as a DataFrame, with the precision of ``DTYPE`` whatever ``arr`` was written with."""
+        return pd.DataFrame(
+            {"Close": arr["close"].astype(cls.DTYPE["close"]), "Volume": arr["volume"].astype(cls.DTYPE["volume"])},
+            index=pd.DatetimeIndex(arr["date"].astype("datetime64[ns]"), name="date"),
+        )
+
+    @classmethod
+    def compact(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """``df`` with the precision it is stored with, see ``DTYPE``."""
+        return cls.to_frame(cls.from_frame(df))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> np.ndarray:
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        arr = np.empty(len(df), dtype=cls.DTYPE)
+        arr["date"] = index.values.astype("datetime64[D]")
+        arr["close"] = df["Close"].to_numpy(dtype="f8")
+        arr["volume"] = df["Volume"].to_numpy(dtype="f8")
+        return arr
+
+    def write(
+        self, ticker: str, df: pd.DataFrame, fetched_at: datetime | None = None, lookback_days: int | None = None
+    ) -> None:
+        """Stores the prices for ``ticker``. The index is only persisted when :meth:`flush` is called.
+
+        ``lookback_days`` records how many days of history ``df`` was downloaded for, see ``lookback_days()``.
+        """
+        arr = self.from_frame(df)
+        path = self._ticker_path(ticker)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.save(f, arr)
+        os.replace(tmp_path, path)
+
+        self._index[ticker] = {
+            "last_date": str(arr["date"][-1]) if len(arr) else None,
+            "fetched_at": (fetched_at or datetime.now()).isoformat(),
+            "rows": len(arr),
+        }
+        if lookback_days is not None:
+            self._index[ticker]["lookback_days"] = lookback_days
+        self._dirty = True
+
+    def lookback_days(self, ticker: str) -> int | None:
+        """How many days of history were downloaded for ``ticker``, ``None`` when that was not recorded."""
+        meta = self.meta(ticker)
+        return meta.get("lookback_days") if meta else None
+
+    def read_state(self, ticker: str) -> dict | None:
+        """Returns the persisted indicator state of ``ticker``, see :class:`src.indicator_state.IndicatorState`."""
+        try:
+            with open(self._state_path(ticker), "r") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def write_state(self, ticker: str, state: dict) -> None:
+        tmp_path = f"{self._state_path(ticker)}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self._state_path(ticker))
+
+    def flush(self) -> None:
+        """Atomically writes the metadata index to disk if it changed."""
+        if not self._dirty:
+            return
+        tmp_path = f"{self._index_path()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, self._index_path())
+        self._dirty = False
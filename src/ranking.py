@@ -0,0 +1,201 @@
+"""Cross-sectional ranking of the screened universe.
+
+Every feature is computed for all tickers at once from the aligned ``(dates, tickers)`` close panel, see
+``src/panel_screener.py``. The per-group and per-sector aggregates are ``np.bincount`` reductions over one array of
+``(group, ticker)`` memberships and one sort ranks every group, so no group is sorted on its own.
+"""
+
+import math
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from .ticker_group import Universe
+
+# (bars, weight) of the returns that make up relative strength, the last month counts double like in IBD's RS rating
+_RS_PERIODS = ((21, 2.0), (63, 1.0))
+_BREADTH_WINDOW = 50
+# the closes rank_universe() looks at, the longest return needs the bar before it
+HISTORY_BARS = max(max(bars for bars, _ in _RS_PERIODS) + 1, _BREADTH_WINDOW)
+
+
+def close_panel(closes: List[np.ndarray]) -> np.ndarray:
+    """Aligns the last ``HISTORY_BARS`` closes of each ticker on their last bar into a ``(HISTORY_BARS, tickers)``
+    panel, padded with ``NaN`` at the top like ``build_panel()``."""
+    panel = np.full((HISTORY_BARS, len(closes)), np.nan)
+    for i, close in enumerate(closes):
+        close = close[-HISTORY_BARS:]
+        panel[HISTORY_BARS - len(close) :, i] = close
+    return panel
+
+
+def relative_strength(close: np.ndarray) -> np.ndarray:
+    """Weighted return over the last month and quarter of each column of ``(dates, tickers)`` closes.
+
+    ``NaN`` for the tickers with too short a history.
+    """
+    total = np.zeros(close.shape[1])
+    for bars, weight in _RS_PERIODS:
+        if len(close) <= bars:
+            return np.full(close.shape[1], np.nan)
+        total += weight * (close[-1] / close[-1 - bars] - 1)
+    return total / sum(weight for _, weight in _RS_PERIODS)
+
+
+def percentile_rank(values: np.ndarray, groups: np.ndarray | None = None) -> np.ndarray:
+    """The 1 to 99 percentile rank of each value within its group, or within all ``values`` without ``groups``.
+
+    Equal values get the same rank and ``NaN`` values stay ``NaN`` without counting towards the group sizes. Every
+    value is first replaced by its ordinal in the whole array, so that ``(group, value)`` pairs become single integer
+    keys and one sort ranks all groups.
+    """
+    out = np.full(len(values), np.nan)
+    valid = ~np.isnan(values)
+    if not valid.any():
+        return out
+    value = values[valid]
+    group = np.zeros(len(value), dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)[valid]
+
+    ordinal = np.searchsorted(np.sort(value), value, side="right")
+    stride = len(value) + 1
+    keys = group * stride + ordinal
+    sorted_keys = np.sort(keys)
+    # the members of the same group with a value less than or equal to this one, including itself
+    at_most = np.searchsorted(sorted_keys, keys, side="right") - np.searchsorted(sorted_keys, group * stride)
+    out[valid] = np.ceil(99 * at_most / np.bincount(group)[group])
+    return out
+
+
+def top_n(values: np.ndarray, n: int) -> np.ndarray:
+    """The positions of the ``n`` largest values, largest first, ignoring ``NaN``.
+
+    ``np.argpartition`` selects them in linear time and only the selected ``n`` are sorted.
+    """
+    candidates = np.flatnonzero(~np.isnan(values))
+    if n <= 0:
+        return candidates[:0]
+    if n < len(candidates):
+        candidates = candidates[np.argpartition(values[candidates], len(candidates) - n)[len(candidates) - n :]]
+    return candidates[np.argsort(-values[candidates], kind="stable")]
+
+
+@dataclass
+class Breadth:
+    """How the tickers of a group or sector are doing as a whole."""
+
+    tickers: int
+    above_50dma: int | None  # percent of the tickers with 50 bars of history
+    avg_rs_rank: float | None
+    leader: str | None  # the ticker with the highest relative strength
+
+    def describe(self) -> str:
+        details = f"{self.above_50dma}% above 50DMA"
+        return details if self.avg_rs_rank is None else f"{details}, avg RS Rank {self.avg_rs_rank:g}"
+
+
+@dataclass
+class Ranking:
+    """Relative strength percentiles of the screened tickers against the universe and against each group, and the
+    breadth of every group and sector. Groups are keyed by ``(sector, subsector)``."""
+
+    tickers: List[str]
+    rs: np.ndarray
+    rs_rank: dict[str, int] = field(default_factory=dict)
+    group_rs_rank: dict[tuple[str, str], dict[str, int]] = field(default_factory=dict)
+    groups: dict[tuple[str, str], Breadth] = field(default_factory=dict)
+    sectors: dict[str, Breadth] = field(default_factory=dict)
+
+    def strongest(self, n: int, tickers: List[str] | None = None) -> List[str]:
+        """The ``n`` tickers with the highest relative strength, among ``tickers`` when given. Unranked tickers are
+        left out."""
+        if tickers is None:
+            return [self.tickers[i] for i in top_n(self.rs, n)]
+        position = {t: i for i, t in enumerate(self.tickers)}
+        ranked = [t for t in tickers if t in position]
+        values = self.rs[[position[t] for t in ranked]] if ranked else np.empty(0)
+        return [ranked[i] for i in top_n(values, n)]
+
+
+def rank_universe(universe: Universe, tickers: List[str], close: np.ndarray) -> Ranking:
+    """Ranks ``tickers``, the columns of the ``(dates, tickers)`` ``close`` panel, within ``universe``."""
+    if not tickers:
+        return Ranking(tickers, np.empty(0))
+    rs = relative_strength(close)
+    rs_rank = percentile_rank(rs)
+    window = close[-_BREADTH_WINDOW:]
+    has_dma = np.zeros(len(tickers), dtype=bool)
+    if len(close) >= _BREADTH_WINDOW:
+        has_dma = ~np.isnan(window).any(axis=0)
+    above = has_dma & (close[-1] > np.where(has_dma, window.mean(axis=0), np.inf))
+
+    ranking = Ranking(tickers, rs, rs_rank=_as_ints(tickers, rs_rank))
+
+    # one entry per membership of a screened ticker, groups with the same sector and subsector are merged
+    position = {t: i for i, t in enumerate(tickers)}
+    group_keys = list(dict.fromkeys((g.sector, g.subsector) for g in universe.groups))
+    group_code = {key: code for code, key in enumerate(group_keys)}
+    # encoded as group * len(tickers) + ticker, so np.unique drops repeated memberships and sorts them by group
+    pairs = [
+        group_code[(g.sector, g.subsector)] * len(tickers) + position[t]
+        for g in universe.groups
+        for t in g.tickers
+        if t in position
+    ]
+    group, member = np.divmod(np.unique(np.array(pairs, dtype=np.int64)), len(tickers))
+
+    group_rank = percentile_rank(rs[member], group)
+    # the memberships are sorted by group, so each group is one slice
+    bounds = np.searchsorted(group, np.arange(len(group_keys) + 1)).tolist()
+    names = [tickers[m] for m in member.tolist()]
+    for code, key in enumerate(group_keys):
+        start, end = bounds[code], bounds[code + 1]
+        ranking.group_rs_rank[key] = _as_ints(names[start:end], group_rank[start:end])
+    breadth = _breadth(group, member, len(group_keys), tickers, rs, rs_rank, has_dma, above)
+    ranking.groups = dict(zip(group_keys, breadth))
+
+    sector_code = {sector: code for code, sector in enumerate(dict.fromkeys(sector for sector, _ in group_keys))}
+    sector_of_group = np.array([sector_code[sector] for sector, _ in group_keys], dtype=np.int64)
+    # a ticker listed in two subsectors of a sector only counts once for the sector
+    sector, sector_member = np.divmod(np.unique(sector_of_group[group] * len(tickers) + member), len(tickers))
+    breadth = _breadth(sector, sector_member, len(sector_code), tickers, rs, rs_rank, has_dma, above)
+    ranking.sectors = dict(zip(sector_code, breadth))
+    return ranking
+
+
+def _breadth(
+    codes: np.ndarray,
+    members: np.ndarray,
+    count: int,
+    tickers: List[str],
+    rs: np.ndarray,
+    rs_rank: np.ndarray,
+    has_dma: np.ndarray,
+    above: np.ndarray,
+) -> List[Breadth]:
+    """Reduces the ``(code, member)`` memberships to the breadth of each of the ``count`` codes."""
+    sizes = np.bincount(codes, minlength=count)
+    with_dma = np.bincount(codes, weights=has_dma[members], minlength=count)
+    above_dma = np.bincount(codes, weights=above[members], minlength=count)
+    ranked = ~np.isnan(rs_rank[members])
+    rank_sum = np.bincount(codes, weights=np.where(ranked, rs_rank[members], 0.0), minlength=count)
+    rank_count = np.bincount(codes, weights=ranked, minlength=count)
+
+    # sorted by code and then relative strength, the last member of every code is its leader
+    order = np.lexsort((np.nan_to_num(rs[members], nan=-np.inf), codes))
+    last = order[np.r_[codes[order][1:] != codes[order][:-1], True]] if len(order) else order
+    leaders = {int(codes[i]): tickers[members[i]] for i in last if not np.isnan(rs[members[i]])}
+
+    return [
+        Breadth(
+            tickers=int(sizes[c]),
+            above_50dma=round(100 * above_dma[c] / with_dma[c]) if with_dma[c] else None,
+            avg_rs_rank=round(rank_sum[c] / rank_count[c], 1) if rank_count[c] else None,
+            leader=leaders.get(c),
+        )
+        for c in range(count)
+    ]
+
+
+def _as_ints(tickers: List[str], ranks: np.ndarray) -> dict[str, int]:
+    return {t: int(r) for t, r in zip(tickers, ranks.tolist()) if not math.isnan(r)}
@@ -0,0 +1,86 @@
+import os
+import re
+from dataclasses import dataclass
+from typing import Iterable, List
+
+from jinja2 import Environment, FileSystemLoader
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "..", "templates")
+
+
+@dataclass
+class ReportSection:
+    """One table of the report: the result rows of a group, the Top Criteria table or one of the universe-wide
+    tables such as the Sector Breadth."""
+
+    title: str
+    subtitle: str
+    rows: List[dict]
+    invalid_tickers: List[str]
+
+    @property
+    def columns(self) -> List[str]:
+        """The keys of all rows in first-seen order, rows that miss a column show it as ``–``."""
+        return list(dict.fromkeys(key for row in self.rows for key in row))
+
+
+@dataclass
+class SectorPage:
+    sector: str
+    href: str
+    groups: int
+    tickers: int
+
+
+class ReportRenderer:
+    """Renders the screening report with the Jinja templates in ``templates/``.
+
+    Pages are produced with ``Template.generate()`` and written chunk by chunk, so a section is written as soon as the
+    iterable passed in yields it and the whole document is never held in memory. Each page is written to a temporary
+    file that replaces the previous one when complete.
+    """
+
+    def __init__(self, output_dir: str = "public") -> None:
+        self._output_dir = output_dir
+        self._env = Environment(loader=FileSystemLoader(TEMPLATES_DIR), trim_blocks=True, lstrip_blocks=True)
+
+    def write_page(
+        self,
+        filename: str,
+        title: str,
+        current_time: str,
+        sections: Iterable[ReportSection] = (),
+        top: ReportSection | None = None,
+        sector_pages: List[SectorPage] | None = None,
+        leaders: ReportSection | None = None,
+        breadth: ReportSection | None = None,
+        index_href: str | None = None,
+        quarantined: ReportSection | None = None,
+    ) -> str:
+        """Streams one page to ``filename`` below the output directory and returns its path."""
+        output_path = os.path.join(self._output_dir, filename)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+        template = self._env.get_template("index.html")
+        chunks = template.generate(
+            title=title,
+            current_time=current_time,
+            top=top,
+            sector_pages=sector_pages,
+            leaders=leaders,
+            breadth=breadth,
+            sections=sections,
+            index_href=index_href,
+            quarantined=quarantined,
+        )
+        tmp_path = f"{output_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, output_path)
+        return output_path
+
+    @staticmethod
+    def sector_filename(sector: str) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", sector.lower()).strip("-") or "sector"
+        return os.path.join("sectors", f"{slug}.html")
@@ -0,0 +1,104 @@
+import json
+import os
+from datetime import datetime
+from typing import List
+
+from .rule_engine import Result, RuleSet
+
+# 2: the Core Criteria Score is the number of core criteria met instead of a string of squares
+SNAPSHOT_VERSION = 2
+
+
+def write_snapshot(
+    path: str,
+    results: List[Result],
+    invalid_tickers: List[str],
+    rules: RuleSet,
+    top_only: bool = False,
+    rs_rank: dict | None = None,
+) -> None:
+    """Writes the result rows of a run to ``path`` as JSON Lines.
+
+    The first line is a header with the run metadata and the type of every column, followed by one result row per
+    ticker, see ``RuleSet.row()``, with its RS Rank from ``rs_rank``. Rows are built one at a time while writing. The
+    file is replaced atomically so readers never see a partial snapshot.
+    """
+    rs_rank = rs_rank or {}
+    columns = {}
+    for result in results:
+        for key, value in rules.row(result, rs_rank.get(result.ticker)).items():
+            if value is not None:
+                columns.setdefault(key, type(value).__name__)
+
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "rules": rules.name,
+        "top_threshold": rules.top_threshold,
+        "top_only": top_only,
+        "columns": columns,
+        "invalid_tickers": list(invalid_tickers),
+    }
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(header, ensure_ascii=False) + "\n")
+        for result in results:
+            f.write(json.dumps(rules.row(result, rs_rank.get(result.ticker)), ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> tuple[dict, dict] | None:
+    """Returns the header and the result rows keyed by ticker of the snapshot at ``path``, or ``None``."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            header = json.loads(f.readline())
+            rows = {}
+            for line in f:
+                row = json.loads(line)
+                rows[row["Ticker"]] = row
+    except (FileNotFoundError, json.JSONDecodeError, KeyError):
+        return None
+    if header.get("version") != SNAPSHOT_VERSION:
+        return None
+    return header, rows
+
+
+def diff_results(previous: dict, current: dict, rules: RuleSet) -> List[dict]:
+    """Compares the result rows of a previous snapshot with the current results, both keyed by ticker.
+
+    Returns one entry per ticker that appeared, disappeared, changed one of the rule set's ``diff`` columns (by
+    default the Core Criteria Score and the criteria flags) or entered or left the Top Criteria table. Changed
+    columns are listed as ``[previous, current]`` pairs.
+    """
+    changes = []
+    for ticker in dict.fromkeys([*previous, *current]):
+        before = previous.get(ticker)
+        after = rules.row(current[ticker]) if ticker in current else None
+        if before is None or after is None:
+            row = after or before
+            change = "added" if before is None else "removed"
+            changes.append({"Ticker": ticker, "change": change, "top": rules.is_top(row.get("Core Criteria Score"))})
+            continue
+
+        fields = {
+            label: [before.get(label), after.get(label)]
+            for label in rules.diff_labels
+            if before.get(label) != after.get(label)
+        }
+        top = [rules.is_top(before.get("Core Criteria Score")), rules.is_top(after.get("Core Criteria Score"))]
+        if fields or top[0] != top[1]:
+            change = {"Ticker": ticker, "change": "changed", "fields": fields}
+            if top[0] != top[1]:
+                change["top"] = top
+            changes.append(change)
+    return changes
+
+
+def write_diff(path: str, changes: List[dict]) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for change in changes:
+            f.write(json.dumps(change, ensure_ascii=False) + "\n")
+    os.replace(tmp_path, path)
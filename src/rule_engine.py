@@ -0,0 +1,515 @@
+import ast
+import itertools
+import json
+import math
+import os
+import operator
+from dataclasses import dataclass, field
+from typing import List
+
+import numpy as np
+
+from . import indicators
+
+DEFAULT_RULES_FILE = os.path.join(os.path.dirname(__file__), "..", "rule_sets", "default.json")
+
+_LEAVES = {"Close", "Volume"}
+
+_BINARY_OPS = {ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul, ast.Div: operator.truediv}
+
+_COMPARE_OPS = {
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+
+# name -> (number of series arguments, default values of the integer arguments)
+_FUNCTIONS = {
+    "sma": (1, (None,)),
+    "ema": (1, (None,)),
+    "rolling_max": (1, (None,)),
+    "rolling_min": (1, (None,)),
+    "shift": (1, (None,)),
+    "rsi": (1, (14,)),
+    "macd": (1, (12, 26)),
+    "macd_signal": (1, (12, 26, 9)),
+}
+
+
+class RuleError(Exception):
+    """Raised when a rule file or one of its expressions is invalid."""
+
+
+@dataclass(slots=True, eq=False)
+class Result:
+    """What screening one ticker produced, kept for every ticker of the universe until the report is written.
+
+    ``score`` is the number of core criteria met and ``values`` a ``float64`` array with the value of every field
+    and criterion of the rule set, in ``RuleSet.columns`` order: criteria are 0 or 1 and missing fields ``NaN``.
+    ``RuleSet.row()`` turns it into a result row when it is written out.
+    """
+
+    ticker: str
+    score: int = 0
+    values: np.ndarray | None = None
+    error: str | None = None
+
+
+def not_enough_data(ticker: str) -> Result:
+    return Result(ticker, error="Not enough data")
+
+
+@dataclass
+class Column:
+    name: str
+    label: str
+    node: tuple
+    kind: str  # "field" or "criterion"
+    decimals: int | None = None
+    integer: bool = False
+
+
+@dataclass
+class RuleSet:
+    """A screening rule set compiled into an expression DAG.
+
+    Rules are read from a JSON file with ``params`` (named constants), ``fields`` (indicator values shown in the
+    report), ``criteria`` (boolean conditions) and ``core`` (the criteria counted in the Core Criteria Score).
+    Expressions use Python syntax over the ``Close`` and ``Volume`` series, the functions in ``_FUNCTIONS``, and the
+    names of params, fields and criteria defined earlier in the file. The optional ``columns`` and ``diff`` lists set
+    the report column order and the columns whose changes ``rule-runner --diff`` reports.
+
+    Every expression is compiled into a hashable node. Structurally equal subexpressions get equal nodes, so something
+    like ``sma(Close, 50)`` is only computed once per evaluation however many rules use it.
+    """
+
+    name: str
+    min_bars: int
+    top_threshold: int
+    columns: List[Column]
+    core: List[Column]
+    params: dict = field(default_factory=dict)
+    diff_labels: List[str] = field(default_factory=list)
+    # params that change an indicator series, e.g. a window, rather than a threshold applied to it
+    indicator_params: set = field(default_factory=set)
+    definition: dict = field(default_factory=dict, repr=False)
+
+    @staticmethod
+    def load(path: str | None = None) -> "RuleSet":
+        path = path or DEFAULT_RULES_FILE
+        with open(path) as f:
+            try:
+                data = json.load(f)
+            except json.JSONDecodeError as e:
+                raise RuleError(f"{path}: {e}") from e
+        return RuleSet.from_dict(data, name=os.path.basename(path))
+
+    @staticmethod
+    def from_dict(data: dict, name: str = "rules", swept: tuple = ()) -> "RuleSet":
+        """Compiles a rule set. The ``swept`` threshold params compile to ``("param", name)`` nodes, see ``sweep()``."""
+        params = dict(data.get("params", {}))
+        compiler = _Compiler(params, swept)
+        columns = {}
+
+        for kind, key in (("field", "fields"), ("criterion", "criteria")):
+            for item in data.get(key, []):
+                node = compiler.compile(item["expr"])
+                if item.get("min_bars"):
+                    node = ("min_bars", node, int(item["min_bars"]))
+                compiler.names[item["name"]] = node
+                columns[item["name"]] = Column(
+                    name=item["name"],
+                    label=item.get("label", item["name"]),
+                    node=node,
+                    kind=kind,
+                    decimals=item.get("round"),
+                    integer=item.get("format") == "int",
+                )
+
+        core = []
+        for item in data.get("core", []):
+            if isinstance(item, str):
+                item = {"name": item, "expr": item}
+            core.append(Column(name=item["name"], label=item["name"], node=compiler.compile(item["expr"]), kind="core"))
+        if not core:
+            raise RuleError(f"{name}: the rule set has no core criteria")
+
+        order = data.get("columns") or ["core_met", "core_score", *columns]
+        unknown = [c for c in order if c not in columns and c not in ("core_met", "core_score")]
+        if unknown:
+            raise RuleError(f"{name}: unknown columns {', '.join(unknown)}")
+
+        # the columns compared between runs, see src/results_snapshot.py
+        labels = {"core_met": "Core Criteria Met", "core_score": "Core Criteria Score"}
+        labels.update({key: column.label for key, column in columns.items()})
+        diff = data.get("diff") or ["core_score", *(k for k, c in columns.items() if c.kind == "criterion")]
+        unknown = [c for c in diff if c not in labels]
+        if unknown:
+            raise RuleError(f"{name}: unknown diff columns {', '.join(unknown)}")
+
+        return RuleSet(
+            name=name,
+            min_bars=int(data.get("min_bars", 60)),
+            top_threshold=int(data.get("top_criteria_threshold", len(core))),
+            columns=[columns.get(c) or Column(name=c, label=c, node=(), kind=c) for c in order],
+            core=core,
+            params=params,
+            diff_labels=[labels[c] for c in diff],
+            indicator_params=compiler.indicator_params,
+            definition=data,
+        )
+
+    def nodes(self) -> set:
+        """The distinct nodes of the DAG, shared subexpressions are only counted once."""
+        found = set()
+
+        def visit(node: tuple) -> None:
+            if node in found or not node:
+                return
+            found.add(node)
+            for child in node[1:]:
+                if isinstance(child, tuple):
+                    visit(child)
+
+        for column in self.columns + self.core:
+            visit(column.node)
+        return found
+
+    def evaluate_arrays(self, close: np.ndarray, volume: np.ndarray, nodes: List[tuple]) -> dict:
+        """Evaluates ``nodes`` over whole ``(dates,)`` or ``(dates, tickers)`` series and returns them by node."""
+        evaluator = _Evaluator(close, volume)
+        return {node: evaluator.value(node) for node in nodes}
+
+    def evaluate(
+        self,
+        ticker: str,
+        close: np.ndarray,
+        volume: np.ndarray,
+        seeds: dict | None = None,
+        short_circuit: bool = False,
+    ) -> Result | None:
+        """Evaluates the rules for one ticker and returns its result for the most recent bar.
+
+        ``seeds`` maps expressions (e.g. ``"sma(Close, 50)"``) to precomputed values for the last bar, which are used
+        instead of computing those subexpressions from the series. With ``short_circuit``, evaluation stops and
+        ``None`` is returned as soon as the ticker can no longer reach the Top Criteria threshold.
+        """
+        if len(close) < self.min_bars:
+            return not_enough_data(ticker)
+
+        evaluator = _Evaluator(close, volume, self._compile_seeds(seeds))
+        met = []
+        for i, column in enumerate(self.core):
+            met.append(bool(evaluator.last(column.node)))
+            if short_circuit and sum(met) + len(self.core) - i - 1 < self.top_threshold:
+                return None
+
+        return self._result(ticker, met, lambda node: evaluator.last(node))
+
+    def evaluate_panel(self, tickers: List[str], close: np.ndarray, volume: np.ndarray, lengths: np.ndarray) -> list:
+        """Evaluates the rules for every column of an aligned ``(dates, tickers)`` panel in one vectorized pass."""
+        if len(close) < self.min_bars:
+            return [not_enough_data(t) for t in tickers]
+
+        evaluator = _Evaluator(close, volume)
+        core = [evaluator.value(c.node)[-1] for c in self.core]
+        values = {c.node: evaluator.value(c.node)[-1].tolist() for c in self.columns if c.node}
+
+        results = []
+        for i, ticker in enumerate(tickers):
+            if lengths[i] < self.min_bars:
+                results.append(not_enough_data(ticker))
+            else:
+                results.append(self._result(ticker, [bool(m[i]) for m in core], lambda node: values[node][i]))
+        return results
+
+    def score_history(self, close: np.ndarray, volume: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Evaluates the core criteria at every bar of ``(dates,)`` or ``(dates, tickers)`` series at once.
+
+        Returns the number of core criteria met at each bar and a mask of the bars with at least ``min_bars`` bars of
+        history, the only ones a screen would have reported on.
+        """
+        evaluator = _Evaluator(close, volume)
+        score = np.zeros(np.shape(close), dtype=np.int64)
+        for column in self.core:
+            score += np.asarray(evaluator.value(column.node), dtype=bool)
+        valid = np.cumsum(~np.isnan(evaluator.value(("leaf", "Close"))), axis=0) >= self.min_bars
+        return score, valid
+
+    def sweep(self, grid: dict, close: np.ndarray, volume: np.ndarray) -> tuple[List[dict], np.ndarray, dict]:
+        """Evaluates the core criteria at the last bar of a ``(dates, tickers)`` panel for every combination of the
+        param values in ``grid``.
+
+        Indicator params (windows and periods) change which series are computed, so the rules are compiled once per
+        combination of their values. Every other param becomes a variant axis: a ``(variants, 1)`` array broadcast
+        against the ``(tickers,)`` values of the last bar, so all combinations of the thresholds cost one operation
+        per criterion. Indicator series are computed once for all variants that share them.
+
+        Returns the param values of every variant, the ``(variants, tickers)`` core criteria scores and, by label, the
+        ``(variants, tickers)`` masks of the tickers that meet each criterion.
+        """
+        unknown = [name for name in grid if name not in self.params]
+        if unknown:
+            raise RuleError(f"{self.name}: unknown params {', '.join(unknown)}")
+
+        indicator = [name for name in grid if name in self.indicator_params]
+        thresholds = [name for name in grid if name not in self.indicator_params]
+        combinations = list(itertools.product(*(grid[name] for name in thresholds)))
+        values = np.array(combinations, dtype="f8").reshape(len(combinations), len(thresholds))
+        evaluator = _LastBarEvaluator(close, volume, {name: values[:, [i]] for i, name in enumerate(thresholds)})
+
+        shape = (len(combinations), np.shape(close)[1])
+        variants = []
+        scores = []
+        passes = {column.label: [] for column in self.columns if column.kind == "criterion"}
+        for indicator_values in itertools.product(*(grid[name] for name in indicator)):
+            fixed = dict(zip(indicator, indicator_values))
+            definition = {**self.definition, "params": {**self.params, **fixed}}
+            rules = RuleSet.from_dict(definition, self.name, swept=tuple(thresholds))
+            score = np.zeros(shape, dtype=np.int64)
+            for column in rules.core:
+                score += np.broadcast_to(evaluator.value(column.node), shape)
+            scores.append(score)
+            for column in rules.columns:
+                if column.kind == "criterion":
+                    passes[column.label].append(np.broadcast_to(evaluator.value(column.node), shape).astype(bool))
+            for combination in combinations:
+                variant = {**fixed, **dict(zip(thresholds, combination))}
+                variants.append({name: variant[name] for name in grid})
+        return variants, np.concatenate(scores), {label: np.concatenate(masks) for label, masks in passes.items()}
+
+    def is_top(self, score: int | None) -> bool:
+        return score is not None and score >= self.top_threshold
+
+    def score_bar(self, score: int) -> str:
+        """The Core Criteria Score as one square per core criterion, ``🟩`` for the ones met."""
+        return "🟩" * score + "⬜" * (len(self.core) - score)
+
+    def row(self, result: Result, rs_rank: int | None = None) -> dict:
+        """The result row of ``result``, as written to the snapshot and served by ``serve``, with the Core Criteria
+        Score as the number of core criteria met."""
+        if result.error is not None:
+            return {"Ticker": result.ticker, "RS Rank": rs_rank, "Error": result.error}
+        row = {"Ticker": result.ticker, "RS Rank": rs_rank}
+        values = iter(result.values.tolist())
+        for column in self.columns:
+            if column.kind == "core_met":
+                row["Core Criteria Met"] = result.score == len(self.core)
+            elif column.kind == "core_score":
+                row["Core Criteria Score"] = result.score
+            elif column.kind == "criterion":
+                row[column.label] = bool(next(values))
+            else:
+                value = next(values)
+                if math.isnan(value):
+                    row[column.label] = None
+                elif column.integer:
+                    row[column.label] = int(value)
+                else:
+                    row[column.label] = value
+        return row
+
+    def _result(self, ticker: str, met: List[bool], value_of) -> Result:
+        values = []
+        for column in self.columns:
+            if column.kind == "criterion":
+                values.append(bool(value_of(column.node)))
+            elif column.kind == "field":
+                value = float(value_of(column.node))
+                if column.integer and not math.isnan(value):
+                    value = int(value)
+                elif column.decimals is not None:
+                    value = round(value, column.decimals)
+                values.append(value)
+        return Result(ticker, sum(met), np.array(values, dtype="f8"))
+
+    def _compile_seeds(self, seeds: dict | None) -> dict:
+        if not seeds:
+            return {}
+        compiler = _Compiler(self.params)
+        return {compiler.compile(expr): np.array([value]) for expr, value in seeds.items()}
+
+
+class _Compiler:
+    def __init__(self, params: dict, swept: tuple = ()) -> None:
+        self.params = params
+        self.swept = set(swept)
+        self.names: dict[str, tuple] = {}
+        self.indicator_params: set[str] = set()
+        self._series_depth = 0
+
+    def compile(self, expr: str) -> tuple:
+        try:
+            tree = ast.parse(str(expr), mode="eval")
+        except SyntaxError as e:
+            raise RuleError(f"invalid expression {expr!r}: {e.msg}") from e
+        return self._node(tree.body, expr)
+
+    def _constant(self, node: ast.expr, expr: str) -> float:
+        if isinstance(node, ast.Name) and node.id in self.params and node.id not in self.names:
+            self.indicator_params.add(node.id)
+            return float(self.params[node.id])
+        compiled = self._node(node, expr)
+        if compiled[0] != "const":
+            raise RuleError(f"{expr!r}: window and period arguments must be numbers or params")
+        return compiled[1]
+
+    def _node(self, node: ast.expr, expr: str) -> tuple:
+        if isinstance(node, ast.Constant) and isinstance(node.value, (int, float)):
+            return ("const", float(node.value))
+        if isinstance(node, ast.Name):
+            if node.id in _LEAVES:
+                return ("leaf", node.id)
+            if node.id in self.names:
+                return self.names[node.id]
+            if node.id in self.params:
+                if self._series_depth:
+                    self.indicator_params.add(node.id)
+                elif node.id in self.swept:
+                    return ("param", node.id)
+                return ("const", float(self.params[node.id]))
+            raise RuleError(f"{expr!r}: unknown name '{node.id}'")
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+            return ("neg", self._node(node.operand, expr))
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return ("not", self._node(node.operand, expr))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            return ("bin", type(node.op).__name__, self._node(node.left, expr), self._node(node.right, expr))
+        if isinstance(node, ast.BoolOp):
+            op = "and" if isinstance(node.op, ast.And) else "or"
+            result = self._node(node.values[0], expr)
+            for value in node.values[1:]:
+                result = (op, result, self._node(value, expr))
+            return result
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE_OPS for op in node.ops):
+            # a < b < c becomes (a < b) and (b < c)
+            operands = [self._node(n, expr) for n in [node.left, *node.comparators]]
+            result = None
+            for op, left, right in zip(node.ops, operands, operands[1:]):
+                compare = ("cmp", type(op).__name__, left, right)
+                result = compare if result is None else ("and", result, compare)
+            return result
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS:
+            name = node.func.id
+            series_args, defaults = _FUNCTIONS[name]
+            args = node.args
+            if len(args) < series_args or len(args) > series_args + len(defaults) or node.keywords:
+                raise RuleError(f"{expr!r}: wrong arguments for {name}()")
+            self._series_depth += 1
+            series = [self._node(a, expr) for a in args[:series_args]]
+            self._series_depth -= 1
+            numbers = [int(self._constant(a, expr)) for a in args[series_args:]]
+            numbers += list(defaults[len(numbers) :])
+            if None in numbers:
+                raise RuleError(f"{expr!r}: missing arguments for {name}()")
+            return ("call", name, *series, *numbers)
+        raise RuleError(f"{expr!r}: unsupported syntax '{ast.unparse(node)}'")
+
+
+class _Evaluator:
+    """Evaluates nodes over the series of one evaluation, memoizing every node so shared subexpressions run once."""
+
+    _WINDOW_FUNCTIONS = {
+        "sma": indicators.sma,
+        "ema": indicators.ema,
+        "rolling_max": indicators.rolling_max,
+        "rolling_min": indicators.rolling_min,
+        "shift": indicators.shift,
+        "rsi": indicators.rsi,
+    }
+
+    def __init__(self, close: np.ndarray, volume: np.ndarray, seeds: dict | None = None) -> None:
+        self._leaves = {"Close": np.asarray(close, dtype="f8"), "Volume": np.asarray(volume, dtype="f8")}
+        self._seeds = seeds or {}
+        self._memo: dict[tuple, np.ndarray] = {}
+
+    def last(self, node: tuple):
+        return self.value(node)[-1]
+
+    def value(self, node: tuple, use_seeds: bool = True) -> np.ndarray:
+        if use_seeds and node in self._seeds:
+            return self._seeds[node]
+        # seeded values only hold the last bar, so windowed functions must not see them
+        key = node if use_seeds or not self._seeds else ("unseeded", node)
+        if key not in self._memo:
+            self._memo[key] = self._compute(node, use_seeds)
+        return self._memo[key]
+
+    def _compute(self, node: tuple, use_seeds: bool) -> np.ndarray:
+        kind = node[0]
+        if kind == "const":
+            return np.float64(node[1])
+        if kind == "leaf":
+            return self._leaves[node[1]]
+        if kind == "neg":
+            return -self.value(node[1], use_seeds)
+        if kind == "not":
+            return np.logical_not(self.value(node[1], use_seeds))
+        if kind == "bin":
+            op = _BINARY_OPS[getattr(ast, node[1])]
+            with np.errstate(invalid="ignore", divide="ignore"):
+                return op(self.value(node[2], use_seeds), self.value(node[3], use_seeds))
+        if kind == "cmp":
+            with np.errstate(invalid="ignore"):
+                compare = _COMPARE_OPS[getattr(ast, node[1])]
+                return compare(self.value(node[2], use_seeds), self.value(node[3], use_seeds))
+        if kind == "and":
+            return np.logical_and(self.value(node[1], use_seeds), self.value(node[2], use_seeds))
+        if kind == "or":
+            return np.logical_or(self.value(node[1], use_seeds), self.value(node[2], use_seeds))
+        if kind == "min_bars":
+            value = self.value(node[1], use_seeds)
+            bars = np.cumsum(~np.isnan(self._leaves["Close"]), axis=0)
+            return np.where(bars >= node[2], value, np.nan)
+        if kind == "call":
+            return self._call(node[1], node[2], node[3:])
+        raise RuleError(f"unknown node {node!r}")
+
+    def _call(self, name: str, series_node: tuple, numbers: tuple) -> np.ndarray:
+        series = self.value(series_node, use_seeds=False)
+        if name in self._WINDOW_FUNCTIONS:
+            return self._WINDOW_FUNCTIONS[name](series, *numbers)
+        if name == "macd":
+            fast, slow = numbers
+            return indicators.ewm(series, 2 / (fast + 1), fast) - indicators.ewm(series, 2 / (slow + 1), slow)
+        if name == "macd_signal":
+            fast, slow, signal = numbers
+            macd_line = self.value(("call", "macd", series_node, fast, slow), use_seeds=False)
+            return indicators.ewm(macd_line, 2 / (signal + 1), signal)
+        raise RuleError(f"unknown function {name}()")
+
+
+class _LastBarEvaluator(_Evaluator):
+    """Evaluates nodes at the last bar only, for ``RuleSet.sweep()``.
+
+    Function calls are still computed as whole series and their last row is taken, everything above them combines
+    ``(tickers,)`` rows, and ``("param", name)`` nodes are ``(variants, 1)`` arrays that broadcast the comparisons
+    they appear in to ``(variants, tickers)``.
+    """
+
+    def __init__(self, close: np.ndarray, volume: np.ndarray, params: dict) -> None:
+        super().__init__(close, volume)
+        self._params = params
+        self._bars = np.sum(~np.isnan(self._leaves["Close"]), axis=0)
+
+    def value(self, node: tuple, use_seeds: bool = True) -> np.ndarray:
+        # function calls ask for their series arguments without seeds, those must be whole series
+        if not use_seeds:
+            return super().value(node, use_seeds=False)
+        key = ("last", node)
+        if key not in self._memo:
+            self._memo[key] = self._compute_last(node)
+        return self._memo[key]
+
+    def _compute_last(self, node: tuple) -> np.ndarray:
+        kind = node[0]
+        if kind == "param":
+            return self._params[node[1]]
+        if kind in ("leaf", "call"):
+            return super().value(node, use_seeds=False)[-1]
+        if kind == "min_bars":
+            return np.where(self._bars >= node[2], self.value(node[1]), np.nan)
+        return self._compute(node, use_seeds=True)
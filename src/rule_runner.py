@@ -1,19 +1,30 @@
+import numpy as np
 import pandas as pd
-from ta.momentum import RSIIndicator
-from ta.trend import MACD
 import os
-import json
-import io
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import pytz
 import argparse
+import cProfile
+import pstats
+import time
 from src.base_command import BaseCommand
 from rich.console import Console
-from src.ticker_group import TickerGroup
-from typing import List
-from jinja2 import Environment, FileSystemLoader
-from tiingo import TiingoClient
+from src.ticker_group import TickerGroup, Universe, load_universe
+from typing import Iterable, Iterator, List
 from .config import Config
+from .failure_cache import FailureCache
+from .indicator_state import IndicatorState
+from .market_calendar import LastSessions
+from .metrics import Metrics, failure_reason
+from .panel_screener import screen_panel
+from .parallel_screener import screen_parallel
+from .pipeline import Pipeline
+from .price_store import PriceStore
+from .ranking import HISTORY_BARS, Ranking, close_panel, rank_universe
+from .results_snapshot import diff_results, read_snapshot, write_diff, write_snapshot
+from .report_renderer import ReportRenderer, ReportSection, SectorPage
+from .rule_engine import Result, RuleSet, not_enough_data
+from .tiingo_fetcher import TiingoFetcher
 
 console = Console()
 
@@ -23,297 +34,722 @@ class RuleRunnerCommand(BaseCommand):
     _DESCRIPTION = "runs the rules on ticker symbols in a JSON file"
 
     _DATA_DIR = "stock_data"
+    _LOOKBACK_DAYS = 120
+    _CACHE_TTL = timedelta(hours=1)
+    _SNAPSHOT_FILE = os.path.join("public", "results.jsonl")
+    _METRICS_FILE = os.path.join("public", "metrics.json")
+    _PROFILE_FILE = "rule_runner.prof"
+    _PROFILE_TOP = 25
+    _TOP_N = 25
+    # downloaded tickers waiting to be screened, see stream_price_data()
+    _PIPELINE_CAPACITY = 64
     _YAHOO_CHART_HASH = "#eyJsYXlvdXQiOnsiaW50ZXJ2YWwiOiJkYXkiLCJwZXJpb2RpY2l0eSI6MSwidGltZVVuaXQiOm51bGwsImNhbmRsZVdpZHRoIjoxOS4zMTc0NjAzMTc0NjAzMTYsImZsaXBwZWQiOmZhbHNlLCJ2b2x1bWVVbmRlcmxheSI6dHJ1ZSwiYWRqIjp0cnVlLCJjcm9zc2hhaXIiOnRydWUsImNoYXJ0VHlwZSI6ImNhbmRsZSIsImV4dGVuZGVkIjpmYWxzZSwibWFya2V0U2Vzc2lvbnMiOnt9LCJhZ2dyZWdhdGlvblR5cGUiOiJvaGxjIiwiY2hhcnRTY2FsZSI6ImxpbmVhciIsInN0dWRpZXMiOnsi4oCMdm9sIHVuZHLigIwiOnsidHlwZSI6InZvbCB1bmRyIiwiaW5wdXRzIjp7IlNlcmllcyI6InNlcmllcyIsImlkIjoi4oCMdm9sIHVuZHLigIwiLCJkaXNwbGF5Ijoi4oCMdm9sIHVuZHLigIwifSwib3V0cHV0cyI6eyJVcCBWb2x1bWUiOiIjMGRiZDZlZWUiLCJEb3duIFZvbHVtZSI6IiNmZjU1NDdlZSJ9LCJwYW5lbCI6ImNoYXJ0IiwicGFyYW1ldGVycyI6eyJjaGFydE5hbWUiOiJjaGFydCIsImVkaXRNb2RlIjp0cnVlLCJwYW5lbE5hbWUiOiJjaGFydCJ9LCJkaXNhYmxlZCI6ZmFsc2V9LCLigIxtYeKAjCAoMTAwLG1hLDApIjp7InR5cGUiOiJtYSIsImlucHV0cyI6eyJQZXJpb2QiOiIxMDAiLCJGaWVsZCI6ImZpZWxkIiwiVHlwZSI6Im1hIiwiT2Zmc2V0IjowLCJpZCI6IuKAjG1h4oCMICgxMDAsbWEsMCkiLCJkaXNwbGF5Ijoi4oCMbWHigIwgKDEwMCxtYSwwKSJ9LCJvdXRwdXRzIjp7Ik1BIjp7ImNvbG9yIjoiIzAwYWZlZCJ9fSwicGFuZWwiOiJjaGFydCIsInBhcmFtZXRlcnMiOnsiY2hhcnROYW1lIjoiY2hhcnQiLCJlZGl0TW9kZSI6dHJ1ZSwiY2hhcnROYW1lIjoiY2hhcnQifSwiZGlzYWJsZWQiOmZhbHNlfSwi4oCMbWHigIwgKDIwMCxtYSwwKSI6eyJ0eXBlIjoibWEiLCJpbnB1dHMiOnsiUGVyaW9kIjoiMjAwIiwiRmllbGQiOiJmaWVsZCIsIlR5cGUiOiJtYSIsIk9mZnNldCI6MCwiaWQiOiLigIxtYeKAjCAoMjAwLG1hLDApIiwiZGlzcGxheSI6IuKAjG1h4oCMICgyMDAsbWEsMCkifSwib3V0cHV0cyI6eyJNQSI6eyJjb2xvciI6IiMwMDcyMzgifX0sInBhbmVsIjoiY2hhcnQiLCJwYXJhbWV0ZXJzIjp7ImNoYXJ0TmFtZSI6ImNoYXJ0IiwiZWRpdE1vZGUiOnRydWUsInBhbmVsTmFtZSI6ImNoYXJ0In0sImRpc2FibGVkIjpmYWxzZX0sIuKAjG1h4oCMICg1MCxtYSwwKS0yIjp7InR5cGUiOiJtYSIsImlucHV0cyI6eyJQZXJpb2QiOjUwLCJGaWVsZCI6ImZpZWxkIiwiVHlwZSI6Im1hIiwiT2Zmc2V0IjowLCJpZCI6IuKAjG1h4oCMICg1MCxtYSwwKS0yIiwiZGlzcGxheSI6IuKAjG1h4oCMICg1MCxtYSwwKS0yIn0sIm91dHB1dHMiOnsiTUEiOiIjRkYwMDAwIn0sInBhbmVsIjoiY2hhcnQiLCJwYXJhbWV0ZXJzIjp7ImNoYXJ0TmFtZSI6ImNoYXJ0IiwiZWRpdE1vZGUiOnRydWUsInBhbmVsTmFtZSI6ImNoYXJ0In0sImRpc2FibGVkIjpmYWxzZX0sIuKAjHJzaeKAjCAoMTQpLTIiOnsidHlwZSI6InJzaSIsImlucHV0cyI6eyJQZXJpb2QiOjE0LCJGaWVsZCI6ImZpZWxkIiwiaWQiOiLigIxyc2nigIwgKDE0KS0yIiwiZGlzcGxheSI6IuKAjHJzaeKAjCAoMTQpLTIifSwib3V0cHV0cyI6eyJSU0kiOiJhdXRvIn0sInBhbmVsIjoi4oCMcnNp4oCMICgxNCktMiIsInBhcmFtZXRlcnMiOnsic3R1ZHlPdmVyWm9uZXNFbmFibGVkIjp0cnVlLCJzdHVkeU92ZXJCb3VnaHRWYWx1ZSI6ODAsInN0dWR5T3ZlckJvdWdodENvbG9yIjoiYXV0byIsInN0dWR5T3ZlclNvbGRWYWx1ZSI6MjAsInN0dWR5T3ZlclNvbGRDb2xvciI6ImF1dG8iLCJjaGFydE5hbWUiOiJjaGFydCIsImVkaXRNb2RlIjp0cnVlLCJwYW5lbE5hbWUiOiLigIxyc2nigIwgKDE0KS0yIn0sImRpc2FibGVkIjpmYWxzZX0sIuKAjG1h4oCMICgxMCxlbWEsMCkiOnsidHlwZSI6Im1hIiwiaW5wdXRzIjp7IlBlcmlvZCI6IjEwIiwiRmllbGQiOiJmaWVsZCIsIlR5cGUiOiJleHBvbmVudGlhbCIsIk9mZnNldCI6MCwiaWQiOiLigIxtYeKAjCAoMTAsZW1hLDApIiwiZGlzcGxheSI6IuKAjG1h4oCMICgxMCxlbWEsMCkifSwib3V0cHV0cyI6eyJNQSI6eyJjb2xvciI6IiM4NTYxYTcifX0sInBhbmVsIjoiY2hhcnQiLCJwYXJhbWV0ZXJzIjp7ImNoYXJ0TmFtZSI6ImNoYXJ0IiwiZWRpdE1vZGUiOnRydWV9LCJkaXNhYmxlZCI6ZmFsc2V9fSwicGFuZWxzIjp7ImNoYXJ0Ijp7InBlcmNlbnQiOjAuNzYxOTA0NzYxOTA0NzYyLCJkaXNwbGF5IjoiTlZTIiwiY2hhcnROYW1lIjoiY2hhcnQiLCJpbmRleCI6MCwieUF4aXMiOnsibmFtZSI6ImNoYXJ0IiwicG9zaXRpb24iOm51bGx9LCJ5YXhpc0xIUyI6W10sInlheGlzUkhTIjpbImNoYXJ0Iiwi4oCMdm9sIHVuZHLigIwiXX0sIuKAjHJzaeKAjCAoMTQpLTIiOnsicGVyY2VudCI6MC4yMzgwOTUyMzgwOTUyMzgwNSwiZGlzcGxheSI6IuKAjHJzaeKAjCAoMTQpLTIiLCJjaGFydE5hbWUiOiJjaGFydCIsImluZGV4IjoxLCJ5QXhpcyI6eyJuYW1lIjoi4oCMcnNp4oCMICgxNCktMiIsInBvc2l0aW9uIjpudWxsfSwieWF4aXNMSFMiOltdLCJ5YXhpc1JIUyI6WyLigIxyc2nigIwgKDE0KS0yIl19fSwic2V0U3BhbiI6eyJtdWx0aXBsaWVyIjozLCJiYXNlIjoibW9udGgiLCJwZXJpb2RpY2l0eSI6eyJwZXJpb2QiOjEsInRpbWVVbml0IjoiZGF5In0sInNob3dFdmVudHNRdW90ZSI6dHJ1ZSwiZm9yY2VMb2FkIjpmYWxzZSwidXNlRXhpc3RpbmdEYXRhIjp0cnVlfSwib3V0bGllcnMiOmZhbHNlLCJhbmltYXRpb24iOnRydWUsImhlYWRzVXAiOnsic3RhdGljIjp0cnVlLCJkeW5hbWljIjpmYWxzZSwiZmxvYXRpbmciOmZhbHNlfSwibGluZVdpZHRoIjoyLCJmdWxsU2NyZWVuIjp0cnVlLCJzdHJpcGVkQmFja2dyb3VuZCI6dHJ1ZSwiY29sb3IiOiIjMDA4MWYyIiwiY3Jvc3NoYWlyU3RpY2t5IjpmYWxzZSwiZG9udFNhdmVSYW5nZVRvTGF5b3V0Ijp0cnVlLCJzeW1ib2xzIjpbeyJzeW1ib2wiOiJOVlMiLCJzeW1ib2xPYmplY3QiOnsic3ltYm9sIjoiTlZTIiwicXVvdGVUeXBlIjoiRVFVSVRZIiwiZXhjaGFuZ2VUaW1lWm9uZSI6IkFtZXJpY2EvTmV3X1lvcmsiLCJwZXJpb2QxIjoxNjYzNjI0ODAwLCJwZXJpb2QyIjoxNzQ1ODcwNDAwfSwicGVyaW9kaWNpdHkiOjEsImludGVydmFsIjoiZGF5IiwidGltZVVuaXQiOm51bGwsInNldFNwYW4iOnsibXVsdGlwbGllciI6MywiYmFzZSI6Im1vbnRoIiwicGVyaW9kaWNpdHkiOnsicGVyaW9kIjoxLCJ0aW1lVW5pdCI6ImRheSJ9LCJzaG93RXZlbnRzUXVvdGUiOnRydWUsImZvcmNlTG9hZCI6ZmFsc2UsInVzZUV4aXN0aW5nRGF0YSI6dHJ1ZX19XX0sImV2ZW50cyI6eyJkaXZzIjp0cnVlLCJzcGxpdHMiOnRydWUsInRyYWRpbmdIb3Jpem9uIjoibm9uZSIsInNpZ0RldkV2ZW50cyI6W119LCJwcmVmZXJlbmNlcyI6e319"
 
     def __init__(self) -> None:
         super().__init__(self._NAME, self._DESCRIPTION)
-        os.makedirs(self._DATA_DIR, exist_ok=True)
+        self._store = PriceStore(self._DATA_DIR)
+        self._failures = FailureCache(self._DATA_DIR)
+        self._retry_failed = False
+        self._lookback_days = self._LOOKBACK_DAYS
+        self._full_refresh = False
+        self._max_in_flight = None
+        self._requests_per_hour = None
+        self._fetcher = None
+        self._panel = False
+        self._incremental = False
+        self._workers = 1
+        self._rules_file = None
+        self._rules = RuleSet.load()
+        self._top_only = False
+        self._top_n = self._TOP_N
+        self._ranking = Ranking([], np.empty(0))
+        self._metrics = Metrics()
+        self._sessions = LastSessions()
 
     def add_arguments(self, parser: argparse.ArgumentParser) -> None:
         parser.add_argument("--json", help="use the stock tickers from the JSON file")
         parser.add_argument("--sector", help="filter groups by sector name (case-insensitive)")
+        parser.add_argument(
+            "--lookback-days",
+            type=int,
+            default=self._LOOKBACK_DAYS,
+            help=f"number of calendar days of price history to download, a longer history already in the cache is "
+            f"kept (default: {self._LOOKBACK_DAYS})",
+        )
+        parser.add_argument(
+            "--full-refresh",
+            action="store_true",
+            help="download the whole lookback window for stale tickers instead of only the missing days",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            help="maximum number of concurrent Tiingo requests (default: TIINGO_MAX_IN_FLIGHT or 8)",
+        )
+        parser.add_argument(
+            "--requests-per-hour",
+            type=float,
+            help="Tiingo request rate limit (default: TIINGO_REQUESTS_PER_HOUR or 10000)",
+        )
+        mode = parser.add_mutually_exclusive_group()
+        mode.add_argument(
+            "--panel",
+            action="store_true",
+            help="evaluate all tickers in one vectorized pass instead of one at a time",
+        )
+        mode.add_argument(
+            "--incremental",
+            action="store_true",
+            help="persist each ticker's indicator state and only advance it by the bars added since the last run",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="number of processes to screen the tickers with (default: 1)",
+        )
+        parser.add_argument("--rules", help="JSON rule set to screen with (default: rule_sets/default.json)")
+        parser.add_argument(
+            "--snapshot",
+            default=self._SNAPSHOT_FILE,
+            help=f"JSON Lines file the results of the run are written to (default: {self._SNAPSHOT_FILE})",
+        )
+        parser.add_argument(
+            "--diff",
+            action="store_true",
+            help="compare the results with the previous snapshot and write the changed tickers to *_diff.jsonl",
+        )
+        parser.add_argument(
+            "--skip-unchanged",
+            action="store_true",
+            help="do not regenerate the HTML report when no ticker changed since the previous snapshot, implies --diff",
+        )
+        parser.add_argument(
+            "--metrics",
+            default=self._METRICS_FILE,
+            help=f"JSON file the stage timings and counters of the run are written to (default: {self._METRICS_FILE})",
+        )
+        parser.add_argument("--prometheus", help="also write the metrics to this Prometheus textfile collector file")
+        parser.add_argument(
+            "--profile",
+            action="store_true",
+            help=f"profile the run, print the {self._PROFILE_TOP} slowest calls and save them to {self._PROFILE_FILE}",
+        )
+        parser.add_argument(
+            "--sector-pages",
+            action="store_true",
+            help="write one page per sector to public/sectors/ and only link to them from public/index.html",
+        )
+        parser.add_argument(
+            "--top-only",
+            action="store_true",
+            help="only report the Top Criteria table, skipping tickers as soon as they cannot reach it",
+        )
+        parser.add_argument(
+            "--top-n",
+            type=int,
+            default=self._TOP_N,
+            help=f"number of tickers in the Relative Strength Leaders table, 0 leaves it out (default: {self._TOP_N})",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="download the tickers that failed recently or are quarantined instead of waiting for their retry time",
+        )
 
     def handle(self, args: argparse.Namespace) -> None:
-        json_file = args.json
-        sector_filter = args.sector.lower() if args.sector else None
+        profiler = cProfile.Profile() if args.profile else None
+        if profiler:
+            profiler.enable()
+        try:
+            with self._metrics.stage("total"):
+                self.run(args)
+        finally:
+            if profiler:
+                profiler.disable()
+                self.report_profile(profiler)
+            self.write_metrics(args.metrics, args.prometheus)
+
+    def run(self, args: argparse.Namespace) -> None:
+        self.configure(args)
+        universe = self.read_universe(args)
+        if universe.groups:
+            self.screen_and_report(args, universe)
+
+    def configure(self, args: argparse.Namespace) -> None:
+        self._lookback_days = args.lookback_days
+        self._full_refresh = args.full_refresh
+        self._max_in_flight = args.max_in_flight
+        self._requests_per_hour = args.requests_per_hour
+        self._panel = args.panel
+        self._incremental = args.incremental
+        self._workers = args.workers
+        self._rules_file = args.rules
+        self._rules = RuleSet.load(args.rules)
+        self._top_only = args.top_only
+        self._top_n = args.top_n
+        self._retry_failed = args.retry_failed
+
+    def read_universe(self, args: argparse.Namespace) -> Universe:
+        """Reads the ticker groups from the ``--json`` file, keeping only the ``--sector`` ones when given."""
+        universe = load_universe(args.json)
+        if args.sector:
+            universe = universe.sector(args.sector)
+            if not universe.groups:
+                console.print(f"[red]❌ No groups found for sector:[/red] '{args.sector}'")
+        return universe
+
+    def screen_and_report(self, args: argparse.Namespace, universe: Universe) -> None:
+        results_by_ticker, invalid_tickers = self.screen_groups(universe)
+
+        with self._metrics.stage("snapshot"):
+            diff = args.diff or args.skip_unchanged
+            previous = read_snapshot(args.snapshot) if diff else None
+            write_snapshot(
+                args.snapshot,
+                list(results_by_ticker.values()),
+                sorted(invalid_tickers),
+                self._rules,
+                self._top_only,
+                self._ranking.rs_rank,
+            )
+            print(f"✅ Results snapshot saved to: {args.snapshot}")
+            changes = None
+            if diff:
+                diff_path = f"{os.path.splitext(args.snapshot)[0]}_diff.jsonl"
+                changes = self.diff_with_previous(previous, results_by_ticker, diff_path)
+        if changes is not None and not changes and args.skip_unchanged:
+            print("⏭️ No changes since the previous run, the report was not regenerated")
+            return
+
+        with self._metrics.stage("render"):
+            self.render_report(args, universe, results_by_ticker, invalid_tickers)
+
+    def render_report(
+        self, args: argparse.Namespace, universe: Universe, results_by_ticker: dict, invalid_tickers: set
+    ) -> None:
+        groups = universe.groups
+
+        # Filter top criteria tickers, each ticker was only screened once, and show the strongest first
+        unique_top_criteria = [r for r in results_by_ticker.values() if self._rules.is_top(r.score)]
+        strongest = self._ranking.strongest(len(unique_top_criteria), [r.ticker for r in unique_top_criteria])
+        ranked = set(strongest)
+        unique_top_criteria = [results_by_ticker[t] for t in strongest] + [
+            r for r in unique_top_criteria if r.ticker not in ranked
+        ]
+        top = None
+        if unique_top_criteria:
+            subtitle = f"Tickers with Core Criteria ≥ {self._rules.top_threshold}, strongest relative strength first"
+            rows = [self.report_row(r, self._ranking.rs_rank.get(r.ticker)) for r in unique_top_criteria]
+            top = ReportSection("Top Criteria", subtitle, rows, [])
 
-        with open(json_file) as f:
-            data = json.load(f)
-            groups = [TickerGroup.from_dict(item) for item in data]
+        # Get the current timestamp with timezone
+        timezone = pytz.timezone("America/New_York")  # Replace with your desired timezone
+        current_time = datetime.now(timezone).strftime("%Y-%m-%d %H:%M:%S %Z")
 
-        if sector_filter:
-            groups = [g for g in groups if g.sector.lower() == sector_filter]
-            if not groups:
-                console.print(f"[red]❌ No groups found for sector:[/red] '{args.sector}'")
-                return
+        renderer = ReportRenderer()
+        title = "Stock Screening Results"
+        sector_pages = None
+        ranking = self._ranking
+        index_sections = (
+            [] if self._top_only else self.report_sections(groups, results_by_ticker, invalid_tickers, ranking)
+        )
+
+        if args.sector_pages and not self._top_only:
+            sector_pages = []
+            for sector, sector_groups in self.groups_by_sector(groups).items():
+                filename = renderer.sector_filename(sector)
+                renderer.write_page(
+                    filename,
+                    f"{title}: {sector}",
+                    current_time,
+                    sections=self.report_sections(sector_groups, results_by_ticker, invalid_tickers, ranking),
+                    index_href="../index.html",
+                )
+                tickers = {t for g in sector_groups for t in g.tickers}
+                sector_pages.append(SectorPage(sector, filename, len(sector_groups), len(tickers)))
+            index_sections = []
+            print(f"✅ {len(sector_pages)} sector pages saved to: {os.path.join('public', 'sectors')}")
+
+        output_path = renderer.write_page(
+            "index.html",
+            title,
+            current_time,
+            sections=index_sections,
+            top=top,
+            sector_pages=sector_pages,
+            leaders=None if self._top_only else self.leaders_section(universe, results_by_ticker),
+            breadth=None if self._top_only else self.breadth_section(),
+            quarantined=self.quarantine_section(),
+        )
+        print(f"✅ Styled HTML saved to: {output_path}")
 
-        top_criteria_results = []
-        html_sections = []
+    def leaders_section(self, universe: Universe, results_by_ticker: dict) -> ReportSection | None:
+        """The ``--top-n`` tickers of the universe with the highest relative strength, whatever their criteria."""
+        leaders = self._ranking.strongest(self._top_n)
+        if not leaders:
+            return None
+        rows = []
+        for ticker in leaders:
+            group = universe.groups[universe.index[ticker][0]]
+            result = results_by_ticker.get(ticker)
+            scored = result is not None and result.error is None
+            rows.append(
+                {
+                    "Ticker": ticker,
+                    "RS Rank": self._ranking.rs_rank.get(ticker),
+                    "Group RS Rank": self._ranking.group_rs_rank[(group.sector, group.subsector)].get(ticker),
+                    "Sector": group.sector,
+                    "Subsector": group.subsector,
+                    "Core Criteria Met": result.score == len(self._rules.core) if scored else None,
+                    "Core Criteria Score": self._rules.score_bar(result.score) if scored else None,
+                }
+            )
+        subtitle = f"The {len(rows)} tickers with the highest RS Rank, their return percentile in the universe"
+        return ReportSection("Relative Strength Leaders", subtitle, rows, [])
+
+    def breadth_section(self) -> ReportSection | None:
+        if not self._ranking.sectors:
+            return None
+        rows = [
+            {
+                "Sector": sector,
+                "Tickers": breadth.tickers,
+                "% Above 50DMA": breadth.above_50dma,
+                "Avg RS Rank": breadth.avg_rs_rank,
+                "Leader": breadth.leader,
+            }
+            for sector, breadth in self._ranking.sectors.items()
+        ]
+        rows.sort(key=lambda row: -1 if row["% Above 50DMA"] is None else row["% Above 50DMA"], reverse=True)
+        return ReportSection("Sector Breadth", "Share of each sector's tickers trading above their 50DMA", rows, [])
+
+    def quarantine_section(self) -> ReportSection | None:
+        quarantined = self._failures.quarantined()
+        if not quarantined:
+            return None
+        rows = [
+            {
+                "Ticker": ticker,
+                "Reason": failure.reason,
+                "Failures": failure.failures,
+                "Failing Since": failure.first_failed_at,
+                "Next Retry": failure.retry_at,
+            }
+            for ticker, failure in quarantined.items()
+        ]
+        subtitle = "Not downloaded until their next retry, see --retry-failed"
+        return ReportSection("Quarantined Tickers", subtitle, rows, [])
+
+    def write_metrics(self, path: str, prometheus_path: str | None) -> None:
+        self._metrics.finish()
+        self._metrics.write_json(path)
+        if prometheus_path:
+            self._metrics.write_prometheus(prometheus_path)
+        print(f"⏱️ {self._metrics.format_stages()}, metrics saved to: {path}")
+
+    def report_profile(self, profiler: cProfile.Profile) -> None:
+        profiler.dump_stats(self._PROFILE_FILE)
+        print(f"🔥 {self._PROFILE_TOP} slowest calls by cumulative time, full profile saved to: {self._PROFILE_FILE}")
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(self._PROFILE_TOP)
+
+    def diff_with_previous(
+        self, previous: tuple[dict, dict] | None, results_by_ticker: dict, diff_path: str
+    ) -> List[dict] | None:
+        """Writes the tickers whose results changed since the ``previous`` snapshot to ``diff_path`` and returns them.
+
+        Returns ``None`` when there is no comparable previous snapshot, in which case every ticker counts as changed.
+        """
+        if previous is None:
+            print("⚠️ No previous snapshot to compare with")
+            return None
+        header, previous_results = previous
+        if header.get("top_only") != self._top_only:
+            print("⚠️ The previous snapshot was taken with a different --top-only setting, not comparing")
+            return None
 
+        changes = diff_results(previous_results, results_by_ticker, self._rules)
+        write_diff(diff_path, changes)
+        for change in changes:
+            details = [f"{label}: {old} → {new}" for label, (old, new) in change.get("fields", {}).items()]
+            if change["change"] == "changed" and "top" in change:
+                details.append("entered Top Criteria" if change["top"][1] else "left Top Criteria")
+            print(f"🔀 {change['Ticker']} {change['change']}{': ' + ', '.join(details) if details else ''}")
+        print(f"✅ {len(changes)} changed tickers saved to: {diff_path}")
+        return changes
+
+    @staticmethod
+    def groups_by_sector(groups: List[TickerGroup]) -> dict[str, List[TickerGroup]]:
+        by_sector = {}
+        for group in groups:
+            by_sector.setdefault(group.sector, []).append(group)
+        return by_sector
+
+    def report_sections(
+        self,
+        groups: List[TickerGroup],
+        results_by_ticker: dict,
+        invalid_tickers: set,
+        ranking: Ranking | None = None,
+    ):
+        """Yields the report section of each group that has results, one at a time while the page is written.
+
+        The rows of a section are only built when it is yielded. With a ``ranking``, the rows also show each ticker's
+        RS Rank and its RS Rank within the group, and the subtitle the breadth of the group.
+        """
         for group in groups:
-            results, invalids = self.screen_multiple_stocks(group.tickers)
+            results = [results_by_ticker[t] for t in group.tickers if t in results_by_ticker]
+            if results:
+                invalids = [t for t in group.tickers if t in invalid_tickers]
+                subtitle = group.subsector
+                if ranking is None:
+                    rows = [self.report_row(r) for r in results]
+                else:
+                    key = (group.sector, group.subsector)
+                    group_rank = ranking.group_rs_rank.get(key, {})
+                    rows = [
+                        self.report_row(r, ranking.rs_rank.get(r.ticker), {"Group RS Rank": group_rank.get(r.ticker)})
+                        for r in results
+                    ]
+                    breadth = ranking.groups.get(key)
+                    if breadth is not None and breadth.above_50dma is not None:
+                        subtitle = f"{subtitle} · {breadth.describe()}" if subtitle else breadth.describe()
+                yield ReportSection(group.sector, subtitle, rows, invalids)
+
+    def report_row(self, result: Result, rs_rank: int | None = None, ranks: dict | None = None) -> dict:
+        """The row of ``result`` in the HTML report: the ticker, its ranks and the result row, with the Core Criteria
+        Score drawn as squares."""
+        row = {"Ticker": result.ticker, "RS Rank": rs_rank, **(ranks or {}), **self._rules.row(result, rs_rank)}
+        if "Core Criteria Score" in row:
+            row["Core Criteria Score"] = self._rules.score_bar(row["Core Criteria Score"])
+        return row
 
-            # Filter top criteria tickers
-            top_criteria_results.extend([r for r in results if r.get("Core Criteria Score", "").count("🟩") >= 4])
+    def load_cached_data(self, ticker: str) -> pd.DataFrame | None:
+        meta = self._store.meta(ticker)
+        if meta is None:
+            self._metrics.count("cache_lookups", result="miss")
+            return None
+        if self.stored_lookback_days(ticker) < self._lookback_days:
+            # downloaded with a shorter --lookback-days, the missing history is backfilled
+            self._metrics.count("cache_lookups", result="short")
+            return None
+        last_date = date.fromisoformat(meta["last_date"]) if meta["last_date"] else None
+        if not self.is_fresh(ticker, datetime.fromisoformat(meta["fetched_at"]), last_date):
+            self._metrics.count("cache_lookups", result="expired")
+            return None
+        cached = self.read_stored(ticker)
+        self._metrics.count("cache_lookups", result="hit" if cached is not None else "miss")
+        return cached
 
-            # Generate section for the group
-            html_sections.append(self.generate_html_table(results, group.sector, group.subsector, invalids))
+    def is_fresh(self, ticker: str, fetched_at: datetime, last_date: date | None) -> bool:
+        """Whether the cached prices of ``ticker`` can be used without asking Tiingo for newer bars.
 
-        # Remove duplicates from top_criteria_results
-        unique_top_criteria = {r["Ticker"]: r for r in top_criteria_results}.values()
+        They can when they include the last completed session of the ticker's exchange, so nothing is downloaded on
+        weekends, holidays or overnight. Prices fetched recently are also used, so that a bar Tiingo has not
+        published yet, or a halted ticker, is not requested again on every run.
+        """
+        if self.fetched_recently(fetched_at):
+            return True
+        return self._sessions.includes(ticker, last_date)
 
-        # Generate "Top Criteria" section
-        top_criteria_html = ""
-        if unique_top_criteria:
-            top_criteria_html = self.generate_html_table(
-                list(unique_top_criteria), "Top Criteria", "Tickers with Core Criteria ≥ 4", []
+    def fetched_recently(self, fetched_at: datetime) -> bool:
+        return datetime.now() - fetched_at <= self._CACHE_TTL
+
+    def read_stored(self, ticker: str) -> pd.DataFrame | None:
+        arr = self._store.read_array(ticker)
+        if arr is None:
+            return None
+        self._metrics.count("cache_bytes_read", arr.nbytes)
+        return self._store.to_frame(arr)
+
+    def save_cached_data(self, ticker: str, df: pd.DataFrame, lookback_days: int | None = None) -> None:
+        self._store.write(ticker, df, lookback_days=lookback_days)
+
+    def download_batch_data(self, tickers: List[str]) -> dict:
+        """Returns the prices of every ticker that has some, see ``stream_price_data()``."""
+        with self._metrics.stage("download"):
+            return dict(self.stream_price_data(tickers))
+
+    def stream_price_data(self, tickers: List[str]) -> Iterator[tuple[str, pd.DataFrame]]:
+        """Yields ``(ticker, prices)`` for every ticker with prices as soon as they are available.
+
+        Cached prices are read and yielded in order, while the stale tickers are downloaded on ``max_in_flight``
+        threads. The downloads that completed meanwhile are yielded after each cached ticker and the rest once all
+        cached tickers are done, so the caller screens tickers while the next ones are still downloading. At most
+        ``_PIPELINE_CAPACITY`` downloaded tickers wait to be yielded, the download threads stop until the caller
+        catches up. Tickers that failed recently are not downloaded, see :class:`FailureCache`, and use the prices
+        in the cache if there are any.
+        """
+        now = datetime.now()
+        skipped = []
+        downloads = []
+        pipeline = None
+        try:
+            for ticker in tickers:
+                cached = self.load_cached_data(ticker)
+                if cached is not None:
+                    yield ticker, cached
+                elif not self._retry_failed and self._failures.backing_off(ticker, now):
+                    skipped.append(ticker)
+                    stale = self.read_stored(ticker)
+                    if stale is not None and not stale.empty:
+                        yield ticker, stale
+                else:
+                    if pipeline is None:
+                        fetcher = self.tiingo_fetcher()
+                        pipeline = Pipeline(fetcher.max_in_flight, self._PIPELINE_CAPACITY)
+                    pipeline.submit(self.download_ticker, fetcher, ticker)
+                    downloads.append(ticker)
+                if pipeline is not None:
+                    yield from self.downloaded(pipeline.completed())
+
+            if skipped:
+                print(f"⏭️ Not retrying {len(skipped)} tickers that failed recently: {', '.join(skipped)}")
+                self._metrics.count("failures_skipped", len(skipped))
+            if pipeline is not None:
+                print(f"⬇️ Downloading data for tickers: {', '.join(downloads)}")
+                yield from self.downloaded(pipeline.remaining())
+        finally:
+            if pipeline is not None:
+                pipeline.close()
+                self._store.flush()
+                self._failures.flush()
+                self._metrics.count("pipeline_wait_seconds", pipeline.worker_wait, side="download")
+                self._metrics.count("pipeline_wait_seconds", pipeline.consumer_wait, side="screen")
+
+    def downloaded(self, results: Iterator[tuple[str, pd.DataFrame | None]]) -> Iterator[tuple[str, pd.DataFrame]]:
+        for ticker, price_data in results:
+            if price_data is not None:
+                self._metrics.count("tickers_downloaded")
+                yield ticker, price_data
+
+    def download_ticker(self, fetcher: TiingoFetcher, ticker: str) -> tuple[str, pd.DataFrame | None]:
+        """Downloads and stores the prices of a stale ticker, runs on the download threads.
+
+        Only the bars after the last cached one are requested unless ``--full-refresh`` is given, see
+        ``merge_price_data()``, or the cached history is shorter than ``--lookback-days``, in which case the whole
+        window is downloaded again. The prices are ``None`` when the download failed.
+        """
+        days = self.history_days(ticker)
+        history_start = datetime.now() - timedelta(days=days)
+        stale = None
+        if not self._full_refresh and self.stored_lookback_days(ticker) >= self._lookback_days:
+            stale = self.read_stored(ticker)
+        if stale is not None and stale.empty:
+            stale = None
+        try:
+            start = stale.index[-1].to_pydatetime() if stale is not None else history_start
+            price_data = fetcher.get_prices(ticker, start)
+            if stale is not None:
+                price_data = self.merge_price_data(ticker, stale, price_data, history_start)
+                if price_data is None:
+                    self._metrics.count("history_refetches")
+                    price_data = fetcher.get_prices(ticker, history_start)
+        except Exception as e:
+            print(f"⚠️ Error loading data for {ticker} from Tiingo: {e}")
+            self.record_failure(ticker, failure_reason(e))
+            return ticker, None
+        # screened as stored, so the next run that reads them from the cache gets the same results
+        price_data = self._store.compact(price_data)
+        if not self.store_download(ticker, price_data, days):
+            return ticker, None
+        return ticker, price_data
+
+    def stored_lookback_days(self, ticker: str) -> int:
+        """Days of history the cached prices of ``ticker`` were downloaded for, the default when not recorded."""
+        return self._store.lookback_days(ticker) or self._LOOKBACK_DAYS
+
+    def history_days(self, ticker: str) -> int:
+        """Days of history to keep for ``ticker``: ``--lookback-days``, or more when a run with a longer
+        ``--lookback-days`` stored more, so that the history ``backtest`` reads is not cut back by the next run."""
+        return max(self._lookback_days, self.stored_lookback_days(ticker))
+
+    def store_download(self, ticker: str, price_data: pd.DataFrame, lookback_days: int) -> bool:
+        if price_data.empty:
+            print(f"⚠️ Tiingo returned no prices for {ticker}")
+            self.record_failure(ticker, "empty")
+            return False
+        self._failures.clear(ticker)
+        self.save_cached_data(ticker, price_data, lookback_days)
+        return True
+
+    def record_failure(self, ticker: str, reason: str) -> None:
+        self._metrics.count("failures", reason=reason)
+        failure = self._failures.record(ticker, reason, datetime.now())
+        if failure.quarantined:
+            print(f"🚫 {ticker} quarantined after {failure.failures} failures ({reason}) until {failure.retry_at}")
+
+    def tiingo_fetcher(self) -> TiingoFetcher:
+        if self._fetcher is None:
+            self._fetcher = TiingoFetcher(
+                Config.get_tiingo_api_key(),
+                base_url=Config.get_tiingo_base_url(),
+                max_in_flight=self._max_in_flight or Config.get_tiingo_max_in_flight(),
+                requests_per_hour=self._requests_per_hour or Config.get_tiingo_requests_per_hour(),
+                metrics=self._metrics,
             )
+        return self._fetcher
 
-        # Combine all sections
-        sections_html = "\n".join(html_sections)
+    def merge_price_data(
+        self, ticker: str, cached: pd.DataFrame, new_data: pd.DataFrame, history_start: datetime
+    ) -> pd.DataFrame | None:
+        """Appends the bars in ``new_data`` that are missing from ``cached`` and drops the bars before
+        ``history_start``, see ``history_days()``.
 
-        # Get the current timestamp with timezone
-        timezone = pytz.timezone("America/New_York")  # Replace with your desired timezone
-        current_time = datetime.now(timezone).strftime("%Y-%m-%d %H:%M:%S %Z")
+        ``new_data`` starts at the last cached bar so that its adjusted close can be compared with the cached one. If
+        they differ, the history was re-adjusted (split or dividend) and ``None`` is returned so that the caller
+        downloads the full window instead. An empty ``new_data`` means there are no new bars yet.
+        """
+        if new_data.empty:
+            return cached.loc[cached.index >= pd.Timestamp(history_start.date())]
+        last_bar = cached.index[-1]
+        if last_bar not in new_data.index or not np.isclose(new_data.loc[last_bar, "Close"], cached["Close"].iloc[-1]):
+            print(f"🔁 Adjusted prices changed for {ticker}, downloading full history")
+            return None
+
+        new_bars = new_data.loc[new_data.index > last_bar, ["Close", "Volume"]]
+        merged = pd.concat([cached, new_bars]) if len(new_bars) else cached
+        return merged.loc[merged.index >= pd.Timestamp(history_start.date())]
 
-        # Set up Jinja2 environment
-        env = Environment(loader=FileSystemLoader(os.path.dirname(__file__) + "/../"))
-        template = env.get_template("templates/index.html")
+    def check_stock_criteria(self, ticker: str, df: pd.DataFrame) -> Result | None:
+        """Evaluates the rule set for ``ticker`` and returns its result.
 
-        # Render the template
-        html = template.render(
-            title="Stock Screening Results",
-            top_criteria_html=top_criteria_html,
-            sections_html=sections_html,
-            current_time=current_time,  # Pass the timestamp with timezone to the template
+        Returns ``None`` with ``--top-only`` when the ticker cannot reach the Top Criteria threshold.
+        """
+        if df.empty or len(df) < self._rules.min_bars:
+            self._metrics.count("failures", reason="not_enough_data")
+            return not_enough_data(ticker)
+
+        seeds = self.incremental_seeds(ticker, df) if self._incremental else None
+        return self._rules.evaluate(
+            ticker,
+            df["Close"].to_numpy(dtype="f8"),
+            df["Volume"].to_numpy(dtype="f8"),
+            seeds=seeds,
+            short_circuit=self._top_only,
         )
 
-        # Save the rendered HTML to a file
-        output_path = os.path.join("public", "index.html")
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(html)
+    def incremental_seeds(self, ticker: str, df: pd.DataFrame) -> dict:
+        """Advances the ticker's persisted indicator state by the new bars only and returns its latest values, which
+        the rule set uses instead of recomputing those indicators from the whole history."""
+        state = self.read_indicator_state(ticker)
+        resumed = state.last_date is not None
+        if state.advance(df) and resumed:
+            print(f"🔁 Price history changed for {ticker}, recomputed indicator state")
+        self.write_indicator_state(ticker, state)
+        return state.latest_values()
+
+    def read_indicator_state(self, ticker: str) -> IndicatorState:
+        saved = self._store.read_state(ticker)
+        return IndicatorState.from_dict(saved) if saved else IndicatorState()
+
+    def write_indicator_state(self, ticker: str, state: IndicatorState) -> None:
+        self._store.write_state(ticker, state.to_dict())
+
+    def screen_groups(self, universe: Universe) -> tuple[dict, set]:
+        """Screens every ticker of ``universe`` exactly once.
+
+        Tickers listed in several groups are only downloaded and evaluated once. Screening one ticker at a time, each
+        ticker is evaluated as soon as its prices are loaded, while the next ones are still being read or downloaded;
+        ``--panel`` and ``--workers`` need all the prices first. The screened tickers are then ranked against the
+        whole universe and their groups in one pass, see ``src/ranking.py``. Returns the results keyed by ticker, in
+        universe order, and the set of invalid tickers, which the caller fans back out into the per-group sections.
+        """
+        unique_tickers = universe.tickers()
+        print(f"🧮 Screening {len(unique_tickers)} unique tickers across {len(universe.groups)} groups")
+
+        if self._panel or self._workers > 1:
+            results, invalid_tickers, closes = self.screen_multiple_stocks(unique_tickers)
+        else:
+            results, invalid_tickers, closes = self.screen_streamed(unique_tickers)
+        self._metrics.count("tickers_screened", len(unique_tickers) - len(invalid_tickers))
+        self._metrics.count("tickers_invalid", len(invalid_tickers))
+        if invalid_tickers:
+            print(f"⚠️ Invalid or no data for tickers: {', '.join(invalid_tickers)}")
 
-        print(f"✅ Styled HTML saved to: {output_path}")
+        with self._metrics.stage("rank"):
+            invalid = set(invalid_tickers)
+            screened = [t for t in unique_tickers if t in closes and t not in invalid]
+            self._ranking = rank_universe(universe, screened, close_panel([closes[t] for t in screened]))
 
-    def load_cached_data(self, ticker: str) -> pd.DataFrame | None:
-        file_path = os.path.join(self._DATA_DIR, f"{ticker}.json")
-        if not os.path.exists(file_path):
-            return None
+        # in universe order, streamed results arrive in the order their prices were loaded
+        position = {t: i for i, t in enumerate(unique_tickers)}
+        results_by_ticker = {r.ticker: r for r in sorted(results, key=lambda r: position[r.ticker])}
+        return results_by_ticker, invalid
 
-        with open(file_path, "r") as f:
-            raw = json.load(f)
-            timestamp = datetime.fromisoformat(raw["timestamp"])
-            if datetime.now() - timestamp > timedelta(hours=1):
-                return None
-            df = pd.read_json(io.StringIO(raw["data"]), convert_dates=True)
-            df.index = pd.to_datetime(df.index)
-            if isinstance(df.columns, pd.MultiIndex):
-                df.columns = df.columns.get_level_values(0)
-            return df
-
-    def save_cached_data(self, ticker: str, df: pd.DataFrame) -> None:
-        df_json = df.to_json(date_format="iso")
-        file_path = os.path.join(self._DATA_DIR, f"{ticker}.json")
-        with open(file_path, "w") as f:
-            json.dump({"timestamp": datetime.now().isoformat(), "data": df_json}, f)
+    def screen_multiple_stocks(self, tickers: List[str]) -> tuple[list, list, dict]:
+        """Loads the prices of every ticker and then screens them all, returns the results, the invalid tickers and
+        the recent closes of the tickers with prices."""
+        data_map = self.download_batch_data(tickers)
+        with self._metrics.stage("screen"):
+            results, invalid_tickers = self.screen_data(tickers, data_map)
+        closes = {ticker: self.recent_closes(df) for ticker, df in data_map.items() if not df.empty}
+        return results, invalid_tickers, closes
 
-    def download_batch_data(self, tickers: List[str]) -> dict:
-        data = {}
-        fresh_tickers = []
-
-        for ticker in tickers:
-            cached = self.load_cached_data(ticker)
-            if cached is not None:
-                data[ticker] = cached
-            else:
-                fresh_tickers.append(ticker)
-
-        config = {"session": True, "api_key": Config.get_tiingo_api_key()}
-        client = TiingoClient(config)
-
-        if fresh_tickers:
-            print(f"⬇️ Downloading data for tickers: {', '.join(fresh_tickers)}")
-
-            for ticker in fresh_tickers:
-                try:
-                    price_data = client.get_dataframe(
-                        ticker,
-                        frequency="daily",
-                        startDate=(datetime.now() - timedelta(days=120)).strftime("%Y-%m-%d"),
-                        endDate=datetime.now().strftime("%Y-%m-%d"),
-                        columns="date,adjClose,adjVolume",
-                    )
-                    # print(f"------------> price_data: ticker: {ticker}\n{price_data}")
-                    price_data.rename(columns={"adjClose": "Close", "adjVolume": "Volume"}, inplace=True)
-                    price_data.index = pd.to_datetime(price_data.index)
-                    self.save_cached_data(ticker, price_data)
-                    data[ticker] = price_data
-                except Exception as e:
-                    print(f"⚠️ Error loading data for {ticker} from Tiingo: {e}")
-
-        return data
-
-    def check_stock_criteria(self, ticker: str, df: pd.DataFrame) -> dict:
-        if df.empty or len(df) < 60:
-            return {"Ticker": ticker, "Error": "Not enough data", "Available Columns": ", ".join(df.columns)}
-
-        df["50dma"] = df["Close"].rolling(window=50).mean()
-        df["10ema"] = df["Close"].ewm(span=10).mean()
-        df["volume_avg_20"] = df["Volume"].rolling(window=20).mean()
-        df["max_20d"] = df["Close"].rolling(window=20).max()
-        df["max_60d"] = df["Close"].rolling(window=60).max()
-        df["max_vol_10d"] = df["Volume"].rolling(window=10).max()
-
-        close_series = df["Close"].squeeze()
-        rsi = RSIIndicator(close=close_series).rsi()
-        macd_calc = MACD(close=close_series)
-        macd_line = macd_calc.macd()
-        signal_line = macd_calc.macd_signal()
-
-        price = df["Close"].iloc[-1].item()
-        volume = df["Volume"].iloc[-1].item()
-        avg_vol = df["volume_avg_20"].iloc[-1].item()
-        dma_50 = df["50dma"].iloc[-1].item()
-
-        dma_50_prev = df["50dma"].iloc[-15] if len(df) >= 65 else float("nan")
-        dma_50_early = df["50dma"].iloc[-25] if len(df) >= 75 else float("nan")
-
-        ema_10 = df["10ema"].iloc[-1].item()
-        high_20d = df["max_20d"].iloc[-2].item()
-        high_60d = df["max_60d"].iloc[-2].item()
-        high_vol_10d = df["max_vol_10d"].iloc[-2].item()
-        rsi_val = rsi.iloc[-1].item()
-        macd_val = macd_line.iloc[-1].item()
-        signal_val = signal_line.iloc[-1].item()
-
-        breakout_20d = price > high_20d
-        breakout_60d = price > high_60d
-        breakout_confirmed = volume >= 1.5 * avg_vol and volume >= high_vol_10d
-        price_above_50dma = price > dma_50
-        price_above_10ema = price > ema_10
-        dma_slope_up = dma_50 > dma_50_prev and dma_50_prev > dma_50_early
-        rsi_filter = 50 < rsi_val < 75
-        macd_bullish = macd_val > signal_val
-
-        core_conditions_met = all(
-            [
-                breakout_20d or breakout_60d,
-                breakout_confirmed,
-                price_above_50dma,
-                price_above_10ema,
-                dma_slope_up,
-            ]
-        )
+    def screen_streamed(self, tickers: List[str]) -> tuple[list, list, dict]:
+        """Like ``screen_multiple_stocks()``, but screens each ticker as soon as its prices are loaded.
 
-        core_criteria_count = sum(
-            [
-                breakout_20d or breakout_60d,
-                breakout_confirmed,
-                price_above_50dma,
-                price_above_10ema,
-                dma_slope_up,
-            ]
-        )
+        Only the results and the recent closes the ranking needs are kept, the prices are dropped once screened.
+        """
+        closes = {}
+
+        def loaded() -> Iterator[tuple[str, pd.DataFrame]]:
+            for ticker, df in self.stream_price_data(tickers):
+                if not df.empty:
+                    closes[ticker] = self.recent_closes(df)
+                yield ticker, df
+
+        with self._metrics.stage("screen"):
+            results, failed = self.screen_each(loaded())
+        failed = set(failed)
+        return results, [t for t in tickers if t in failed or t not in closes], closes
 
-        return {
-            "Ticker": ticker,
-            "Price": round(price, 2),
-            "Core Criteria Met": core_conditions_met,
-            "Core Criteria Score": "🟩" * core_criteria_count + "⬜" * (5 - core_criteria_count),
-            "20d High": round(high_20d, 2),
-            "60d High": round(high_60d, 2),
-            "Volume": int(volume),
-            "20d Avg Vol": int(avg_vol),
-            "Max Vol (10d)": int(high_vol_10d),
-            "50DMA": round(dma_50, 2),
-            "10EMA": round(ema_10, 2),
-            "50DMA Prev (15d)": round(dma_50_prev, 2) if pd.notna(dma_50_prev) else None,
-            "50DMA (25d ago)": round(dma_50_early, 2) if pd.notna(dma_50_early) else None,
-            "RSI": round(rsi_val, 2),
-            "MACD": round(macd_val, 2),
-            "Signal": round(signal_val, 2),
-            "Breakout 20d": breakout_20d,
-            "Breakout 60d": breakout_60d,
-            "Breakout Confirmed": breakout_confirmed,
-            "Price > 50DMA": price_above_50dma,
-            "Price > 10EMA": price_above_10ema,
-            "50DMA Rising": dma_slope_up,
-            "RSI 50-75": rsi_filter,
-            "MACD Bullish": macd_bullish,
-        }
-
-    def screen_multiple_stocks(self, tickers) -> tuple[list, list]:
+    @staticmethod
+    def recent_closes(df: pd.DataFrame) -> np.ndarray:
+        # a copy, a view would keep the whole column alive
+        return df["Close"].to_numpy()[-HISTORY_BARS:].astype(PriceStore.DTYPE["close"])
+
+    def screen_data(self, tickers: List[str], data_map: dict) -> tuple[list, list]:
         results = []
         invalid_tickers = []
-        data_map = self.download_batch_data(tickers)
+        if self._workers > 1:
+            invalid_tickers = [t for t in tickers if t not in data_map or data_map[t].empty]
+            results, failed = screen_parallel(
+                [t for t in tickers if t not in invalid_tickers],
+                data_map,
+                self._workers,
+                panel=self._panel,
+                incremental=self._incremental,
+                rules_file=self._rules_file,
+                top_only=self._top_only,
+                metrics=self._metrics,
+            )
+            invalid_tickers.extend(failed)
+        elif self._panel:
+            invalid_tickers = [t for t in tickers if t not in data_map or data_map[t].empty]
+            results = screen_panel([t for t in tickers if t not in invalid_tickers], data_map, self._rules)
+        else:
+            invalid_tickers = [t for t in tickers if t not in data_map]
+            results, failed = self.screen_each((t, data_map[t]) for t in tickers if t in data_map)
+            invalid_tickers.extend(failed)
+        return results, invalid_tickers
 
-        for ticker in tickers:
+    def screen_each(self, prices: Iterable[tuple[str, pd.DataFrame]]) -> tuple[list, list]:
+        """Screens the ``(ticker, prices)`` pairs one at a time, returns the results and the invalid tickers."""
+        results = []
+        invalid_tickers = []
+        for ticker, df in prices:
             try:
-                if ticker not in data_map or data_map[ticker].empty:
+                if df.empty:
                     invalid_tickers.append(ticker)
                     continue
-                result = self.check_stock_criteria(ticker, df=data_map[ticker])
-                results.append(result)
+                start = time.perf_counter()
+                result = self.check_stock_criteria(ticker, df=df)
+                self._metrics.observe("ticker_compute", time.perf_counter() - start)
+                if result is not None:
+                    results.append(result)
             except Exception as e:
                 print(f"⚠️ Error processing ticker {ticker}: {e}")
+                self._metrics.count("failures", reason="exception")
                 invalid_tickers.append(ticker)  # Add to invalid_tickers if an exception occurs
-
-        if invalid_tickers:
-            print(f"⚠️ Invalid or no data for tickers: {', '.join(invalid_tickers)}")
-
         return results, invalid_tickers
-
-    def generate_html_table(self, results: List[dict], sector: str, subsector: str, invalid_tickers: List[str]) -> str:
-        if not results:
-            return ""
-
-        df = pd.DataFrame(results)
-
-        if "Ticker" in df.columns:
-            df["Ticker"] = df["Ticker"].apply(
-                lambda t: f'<a href="https://finance.yahoo.com/quote/{t}" target="_blank" class="text-blue-600 underline">{t}</a>'
-            )
-
-        for col in df.columns:
-            if df[col].dtype == bool:
-                df[col] = df[col].map({True: "✅", False: "❌"})
-
-        table_html = df.to_html(
-            index=False,
-            escape=False,
-            border=0,
-            classes="table-auto w-full text-sm text-gray-700",
-            na_rep="–",
-        ).replace("<table", '<table class="table-auto w-full border-collapse text-sm text-gray-700"')
-        table_html = table_html.replace("<thead>", '<thead class="bg-gray-100 text-left font-semibold">')
-        table_html = table_html.replace("<th>", '<th class="px-4 py-2 whitespace-nowrap border-b border-gray-200">')
-        table_html = table_html.replace("<td>", '<td class="px-4 py-2 border-t border-gray-200 align-top">')
-
-        section_heading_html = f"""
-        <div class=\"mb-6\">
-            <h2 class=\"text-2xl font-bold text-gray-800\">{sector}</h2>
-            <h3 class=\"text-xl font-semibold text-gray-600\">{subsector}</h3>
-        </div>
-        """
-
-        delisted_html = ""
-        if invalid_tickers:
-            delisted_html = f"""
-            <div class=\"mt-4 bg-red-50 border border-red-200 text-red-800 p-4 rounded shadow\">
-                <h4 class=\"font-semibold mb-1\">⚠️ Invalid or Missing Data for Tickers</h4>
-                <ul class=\"list-disc list-inside text-sm\">
-                    {''.join(f'<li>{ticker}</li>' for ticker in invalid_tickers)}
-                </ul>
-            </div>
-            """
-
-        return f"""
-        <div class=\"mb-12\">
-            {section_heading_html}
-            <div class=\"overflow-auto rounded shadow bg-white p-4 border border-gray-200\">
-                {table_html}
-            </div>
-            {delisted_html}
-        </div>
-        """
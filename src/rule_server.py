@@ -0,0 +1,218 @@
+import argparse
+import json
+import signal
+import threading
+from dataclasses import asdict
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+import pandas as pd
+
+from .indicator_state import IndicatorState
+from .market_calendar import LastSessions
+from .metrics import Metrics
+from .rule_runner import RuleRunnerCommand
+from .ticker_group import Universe
+
+
+class RuleServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], command: "ServeCommand") -> None:
+        super().__init__(address, RequestHandler)
+        self.command = command
+
+
+class RequestHandler(BaseHTTPRequestHandler):
+    """``GET /results`` returns the latest results as JSON, ``GET /metrics`` the metrics in the Prometheus text
+    format and ``POST /refresh`` starts a refresh without waiting for the next scheduled one."""
+
+    server: RuleServer
+
+    def do_GET(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/results":
+            self.send_json(200, self.server.command.latest_results())
+        elif path == "/metrics":
+            self.send(200, self.server.command.metrics_text().encode(), "text/plain; version=0.0.4")
+        else:
+            self.send_json(404, {"error": f"unknown path: {path}"})
+
+    def do_POST(self) -> None:
+        path = urlsplit(self.path).path
+        if path == "/refresh":
+            self.server.command.request_refresh()
+            self.send_json(202, {"status": "refresh requested"})
+        else:
+            self.send_json(404, {"error": f"unknown path: {path}"})
+
+    def send_json(self, status: int, data: dict) -> None:
+        self.send(status, json.dumps(data, ensure_ascii=False).encode(), "application/json; charset=utf-8")
+
+    def send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        # one line per request would drown the refresh output
+        pass
+
+
+class ServeCommand(RuleRunnerCommand):
+    """Runs ``rule-runner`` as a long-lived process.
+
+    The universe is read once, and the price frames and indicator state of every ticker are kept in memory between
+    refreshes, so a refresh only downloads the tickers that went stale since the previous one and never re-reads the
+    cache in ``stock_data/``, which is still written so that ``rule-runner`` and a restarted server can use it.
+
+    Every refresh gets its own ``Metrics``, only the refresh counts add up over the life of the process.
+    """
+
+    _NAME = "serve"
+    _DESCRIPTION = "keeps the tickers in memory, screens them on a schedule and serves the results over HTTP"
+
+    _INTERVAL_MINUTES = 60
+    _HOST = "127.0.0.1"
+    _PORT = 8750
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._frames: dict[str, tuple[datetime, pd.DataFrame]] = {}
+        self._states: dict[str, IndicatorState] = {}
+        self._interval = timedelta(minutes=self._INTERVAL_MINUTES)
+        self._refresh_started = datetime.now()
+        self._refresh_requested = threading.Event()
+        self._refreshing = False
+        self._refresh_counts = {"refreshes": 0, "refreshes_failed": 0}
+        self._published = self._metrics
+        self._latest = {"refreshed_at": None, "results": [], "sectors": {}, "invalid_tickers": []}
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=self._INTERVAL_MINUTES,
+            help=f"minutes between refreshes, tickers missing the last session are downloaded at most this often "
+            f"(default: {self._INTERVAL_MINUTES})",
+        )
+        parser.add_argument("--host", default=self._HOST, help=f"address to listen on (default: {self._HOST})")
+        parser.add_argument("--port", type=int, default=self._PORT, help=f"port to listen on (default: {self._PORT})")
+
+    def run(self, args: argparse.Namespace) -> None:
+        self.configure(args)
+        self._interval = timedelta(minutes=args.interval)
+        universe = self.read_universe(args)
+        if not universe.groups:
+            return
+
+        # systemd and docker stop services with SIGTERM
+        signal.signal(signal.SIGTERM, self.stop)
+        server = RuleServer((args.host, args.port), self)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🌐 Serving on http://{args.host}:{server.server_port}: GET /results, GET /metrics, POST /refresh")
+        try:
+            while True:
+                self.refresh(args, universe)
+                self._refresh_requested.wait(self._interval.total_seconds())
+                self._refresh_requested.clear()
+        except KeyboardInterrupt:
+            print("👋 Stopping the server")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def refresh(self, args: argparse.Namespace, universe: Universe) -> None:
+        self._refresh_started = datetime.now()
+        # a new session may have closed since the previous refresh
+        self._sessions = LastSessions()
+        self._metrics = Metrics()
+        if self._fetcher is not None:
+            self._fetcher.metrics = self._metrics
+        self._refreshing = True
+        try:
+            with self._metrics.stage("refresh"):
+                self.screen_and_report(args, universe)
+            self._refresh_counts["refreshes"] += 1
+        except Exception as e:
+            # a failed refresh, e.g. Tiingo being down, is retried at the next one
+            print(f"⚠️ Refresh failed: {e}")
+            self._refresh_counts["refreshes_failed"] += 1
+        finally:
+            self._refreshing = False
+        for name, total in self._refresh_counts.items():
+            self._metrics.count(name, total)
+        self.write_metrics(args.metrics, args.prometheus)
+        # the request threads only see finished refreshes
+        self._published = self._metrics
+        print(f"💤 Next refresh at {(datetime.now() + self._interval).strftime('%H:%M:%S')}")
+
+    def stop(self, signum: int, frame) -> None:
+        raise KeyboardInterrupt
+
+    def request_refresh(self) -> None:
+        self._refresh_requested.set()
+
+    def latest_results(self) -> dict:
+        """The latest results, whose rows are only built for the request, see ``RuleSet.row()``."""
+        latest = dict(self._latest)
+        rs_rank = latest.pop("rs_rank", {})
+        latest["results"] = [self._rules.row(r, rs_rank.get(r.ticker)) for r in latest["results"]]
+        return {**latest, "refreshing": self._refreshing}
+
+    def metrics_text(self) -> str:
+        return self._published.prometheus_text()
+
+    def screen_groups(self, universe: Universe) -> tuple[dict, set]:
+        results_by_ticker, invalid_tickers = super().screen_groups(universe)
+        # replaced in one assignment, the request threads never see a partial refresh
+        self._latest = {
+            "refreshed_at": datetime.now().isoformat(timespec="seconds"),
+            "top_threshold": self._rules.top_threshold,
+            "results": list(results_by_ticker.values()),
+            "rs_rank": self._ranking.rs_rank,
+            "sectors": {sector: asdict(breadth) for sector, breadth in self._ranking.sectors.items()},
+            "invalid_tickers": sorted(invalid_tickers),
+        }
+        return results_by_ticker, invalid_tickers
+
+    def load_cached_data(self, ticker: str) -> pd.DataFrame | None:
+        entry = self._frames.get(ticker)
+        if entry is None:
+            # first time the ticker is needed, fall back to the cache on disk
+            cached = super().load_cached_data(ticker)
+            if cached is not None:
+                self._frames[ticker] = (self._store.fetched_at(ticker), cached)
+            return cached
+
+        fetched_at, frame = entry
+        last_date = frame.index[-1].date() if len(frame) else None
+        if not self.is_fresh(ticker, fetched_at, last_date):
+            self._metrics.count("cache_lookups", result="expired")
+            return None
+        self._metrics.count("cache_lookups", result="memory")
+        return frame
+
+    def fetched_recently(self, fetched_at: datetime) -> bool:
+        # measured from the start of the refresh, so nothing fetched by the previous one counts as recent
+        return self._refresh_started - fetched_at < self._interval
+
+    def read_stored(self, ticker: str) -> pd.DataFrame | None:
+        entry = self._frames.get(ticker)
+        return entry[1] if entry else super().read_stored(ticker)
+
+    def save_cached_data(self, ticker: str, df: pd.DataFrame, lookback_days: int | None = None) -> None:
+        super().save_cached_data(ticker, df, lookback_days)
+        self._frames[ticker] = (datetime.now(), df)
+
+    def read_indicator_state(self, ticker: str) -> IndicatorState:
+        state = self._states.get(ticker)
+        return state if state is not None else super().read_indicator_state(ticker)
+
+    def write_indicator_state(self, ticker: str, state: IndicatorState) -> None:
+        super().write_indicator_state(ticker, state)
+        self._states[ticker] = state
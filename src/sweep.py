@@ -0,0 +1,146 @@
+import argparse
+import json
+import time
+from typing import List
+
+import numpy as np
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from src.base_command import BaseCommand
+from src.ticker_group import load_universe
+from .price_store import PriceStore
+from .rule_engine import RuleError, RuleSet
+from .rule_runner import RuleRunnerCommand
+
+console = Console()
+
+
+def parse_param(value: str) -> tuple[str, List[float]]:
+    """Parses ``--param NAME=V1,V2,...``."""
+    name, sep, values = value.partition("=")
+    try:
+        numbers = [float(v) for v in values.split(",") if v.strip()]
+    except ValueError:
+        numbers = []
+    if not sep or not name.strip() or not numbers:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... with numeric values, got '{value}'")
+    return name.strip(), numbers
+
+
+class SweepCommand(BaseCommand):
+    _NAME = "sweep"
+    _DESCRIPTION = "counts the tickers that pass the rules for every combination of a grid of param values"
+
+    def __init__(self) -> None:
+        super().__init__(self._NAME, self._DESCRIPTION)
+        self._store = PriceStore(RuleRunnerCommand._DATA_DIR)
+
+    def add_arguments(self, parser: argparse.ArgumentParser) -> None:
+        parser.add_argument("--json", required=True, help="use the stock tickers from the JSON file")
+        parser.add_argument("--sector", help="filter groups by sector name (case-insensitive)")
+        parser.add_argument("--rules", help="JSON rule set whose params are swept (default: rule_sets/default.json)")
+        parser.add_argument("--grid", help='JSON file mapping param names to value lists, e.g. {"rsi_low": [40, 50]}')
+        parser.add_argument(
+            "--param",
+            type=parse_param,
+            action="append",
+            default=[],
+            metavar="NAME=V1,V2,...",
+            help="values to sweep for one param, can be repeated and is added to --grid",
+        )
+        parser.add_argument("--output", help="also write the pass counts of every variant to this CSV file")
+
+    def handle(self, args: argparse.Namespace) -> None:
+        rules = RuleSet.load(args.rules)
+        grid = {}
+        if args.grid:
+            with open(args.grid) as f:
+                grid.update(json.load(f))
+        grid.update(dict(args.param))
+        if not grid:
+            console.print("[red]❌ Nothing to sweep, use --grid or --param[/red]")
+            return
+
+        universe = load_universe(args.json)
+        if args.sector:
+            universe = universe.sector(args.sector)
+            if not universe.groups:
+                console.print(f"[red]❌ No groups found for sector:[/red] '{args.sector}'")
+                return
+
+        arrays = {t: self._store.read_array(t) for t in universe.tickers()}
+        missing = [t for t, arr in arrays.items() if arr is None or len(arr) < rules.min_bars]
+        if missing:
+            print(f"⚠️ No or not enough cached prices for tickers: {', '.join(missing)}")
+        tickers = [t for t in arrays if t not in missing]
+        if not tickers:
+            console.print("[red]❌ No cached prices, run rule-runner first[/red]")
+            return
+
+        start = time.perf_counter()
+        close, volume = self.load_panel([arrays[t] for t in tickers])
+        try:
+            variants, scores, passes = rules.sweep(grid, close, volume)
+        except RuleError as e:
+            console.print(f"[red]❌ {e}[/red]")
+            return
+        print(f"🧹 Swept {len(variants)} variants over {len(tickers)} tickers in {time.perf_counter() - start:.2f}s")
+
+        rows = self.summarize(variants, scores, passes, rules)
+        self.print_table(rows, list(grid), rules)
+        if args.output:
+            pd.DataFrame(rows).to_csv(args.output, index=False)
+            print(f"✅ Sweep results saved to: {args.output}")
+
+    @staticmethod
+    def load_panel(arrays: List[np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+        """Aligns the cached price arrays into ``(dates, tickers)`` close and volume arrays on their last bar."""
+        rows = max(len(a) for a in arrays)
+        close = np.full((rows, len(arrays)), np.nan)
+        volume = np.full((rows, len(arrays)), np.nan)
+        for i, arr in enumerate(arrays):
+            close[rows - len(arr) :, i] = arr["close"]
+            volume[rows - len(arr) :, i] = arr["volume"]
+        return close, volume
+
+    @staticmethod
+    def summarize(variants: List[dict], scores: np.ndarray, passes: dict, rules: RuleSet) -> List[dict]:
+        core_met = (scores == len(rules.core)).sum(axis=1)
+        top = (scores >= rules.top_threshold).sum(axis=1)
+        mean_score = scores.mean(axis=1)
+        counts = {label: mask.sum(axis=1) for label, mask in passes.items()}
+
+        rows = []
+        for v, variant in enumerate(variants):
+            row = dict(variant)
+            row["Current"] = all(rules.params[name] == value for name, value in variant.items())
+            row["Core Criteria Met"] = int(core_met[v])
+            row["Top Criteria"] = int(top[v])
+            row["Avg Core Score"] = round(float(mean_score[v]), 2)
+            row.update({label: int(count[v]) for label, count in counts.items()})
+            rows.append(row)
+        return rows
+
+    def print_table(self, rows: List[dict], params: List[str], rules: RuleSet) -> None:
+        # criteria no swept param affects have the same count in every row
+        varying = [key for key in rows[0] if key not in params and len({row[key] for row in rows}) > 1]
+        constant = {key: rows[0][key] for key in rows[0] if key not in params and key not in varying}
+        constant.pop("Current", None)
+
+        table = Table(title=f"Sweep of {rules.name}: tickers passing under each variant (★ current params)")
+        table.add_column("")
+        for name in params:
+            table.add_column(name, justify="right")
+        for key in varying:
+            if key != "Current":
+                table.add_column(key, justify="right")
+        for row in rows:
+            cells = ["★" if row["Current"] else ""]
+            cells += [f"{row[name]:g}" for name in params]
+            cells += [str(row[key]) for key in varying if key != "Current"]
+            table.add_row(*cells)
+        console.print(table)
+        if constant:
+            print("➖ The same for every variant: " + ", ".join(f"{key}: {value}" for key, value in constant.items()))
@@ -1,6 +1,9 @@
+import json
 from dataclasses import dataclass
 from typing import List
 
+UNIVERSE_VERSION = 1
+
 
 @dataclass
 class TickerGroup:
@@ -17,3 +20,59 @@ class TickerGroup:
             subsector=data["Subsector"],
             tickers=tickers,
         )
+
+
+@dataclass
+class Universe:
+    """The ticker groups to screen and, for every ticker, the positions in ``groups`` of the groups it belongs to.
+
+    ``rules.py import`` writes both to the universe file, so loading it neither splits comma separated symbols nor
+    has to work out which tickers appear in several groups.
+    """
+
+    groups: List[TickerGroup]
+    index: dict[str, List[int]]
+
+    @staticmethod
+    def from_groups(groups: List[TickerGroup]) -> "Universe":
+        index = {}
+        for position, group in enumerate(groups):
+            for ticker in group.tickers:
+                index.setdefault(ticker, []).append(position)
+        return Universe(groups, index)
+
+    @staticmethod
+    def from_dict(data: dict) -> "Universe":
+        if data.get("version") != UNIVERSE_VERSION:
+            raise ValueError(f"unsupported universe file version: {data.get('version')}")
+        groups = [TickerGroup(*group) for group in data["groups"]]
+        return Universe(groups, data["tickers"])
+
+    def to_dict(self) -> dict:
+        return {
+            "version": UNIVERSE_VERSION,
+            "groups": [[g.sector, g.subsector, g.tickers] for g in self.groups],
+            "tickers": self.index,
+        }
+
+    def tickers(self) -> List[str]:
+        """Every ticker once, in the order it first appears in the groups."""
+        return list(self.index)
+
+    def sector(self, name: str) -> "Universe":
+        """The groups of sector ``name`` (case-insensitive)."""
+        name = name.lower()
+        return Universe.from_groups([g for g in self.groups if g.sector.lower() == name])
+
+
+def load_universe(path: str) -> Universe:
+    """Reads a universe file written by ``rules.py import``.
+
+    Older imports, a list of spreadsheet rows with the symbols of each group in one comma separated string, are
+    still accepted.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return Universe.from_groups([TickerGroup.from_dict(item) for item in data])
+    return Universe.from_dict(data)
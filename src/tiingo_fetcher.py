@@ -0,0 +1,145 @@
+import random
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from .metrics import Metrics
+
+
+class TiingoError(Exception):
+    """Raised when Tiingo returns a response that should not be retried."""
+
+    def __init__(self, ticker: str, status: int | None, message: str) -> None:
+        super().__init__(f"{ticker}: HTTP {status}: {message}" if status else f"{ticker}: {message}")
+        self.ticker = ticker
+        self.status = status
+
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the request rate to ``rate_per_hour``."""
+
+    def __init__(self, rate_per_hour: float, capacity: int) -> None:
+        self._rate = rate_per_hour / 3600.0
+        self._capacity = max(1, capacity)
+        self._tokens = float(self._capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Blocks until a token is available and consumes it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self._capacity, self._tokens + (now - self._last) * self._rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._rate
+            time.sleep(wait)
+
+
+class TiingoFetcher:
+    """Downloads daily prices from Tiingo concurrently.
+
+    All requests share one pooled HTTP session, at most ``max_in_flight`` requests run at the same time, the request
+    rate is capped by a token bucket, and responses with status 429 or 5xx are retried with exponential backoff.
+    """
+
+    _BASE_URL = "https://api.tiingo.com"
+    _RETRY_STATUS = {429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_key: str | None,
+        base_url: str | None = None,
+        max_in_flight: int = 8,
+        requests_per_hour: float = 10000,
+        max_retries: int = 4,
+        backoff: float = 1.0,
+        timeout: float = 30.0,
+        metrics: Metrics | None = None,
+    ) -> None:
+        self._base_url = (base_url or self._BASE_URL).rstrip("/")
+        self._max_in_flight = max(1, max_in_flight)
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._timeout = timeout
+        self._limiter = TokenBucket(requests_per_hour, self._max_in_flight)
+        self.metrics = metrics
+
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._max_in_flight)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"Content-Type": "application/json", "Authorization": f"Token {api_key}"})
+
+    @property
+    def max_in_flight(self) -> int:
+        return self._max_in_flight
+
+    def close(self) -> None:
+        self._session.close()
+
+    def get_prices(self, ticker: str, start: datetime, end: datetime | None = None) -> pd.DataFrame:
+        """Returns the adjusted daily closes and volumes of ``ticker`` as a DataFrame with a naive date index."""
+        params = {
+            "startDate": start.strftime("%Y-%m-%d"),
+            "endDate": (end or datetime.now()).strftime("%Y-%m-%d"),
+            "columns": "date,adjClose,adjVolume",
+            "format": "json",
+            "resampleFreq": "daily",
+        }
+        url = f"{self._base_url}/tiingo/daily/{ticker}/prices"
+
+        for attempt in range(self._max_retries + 1):
+            self._limiter.acquire()
+            t0 = time.perf_counter()
+            try:
+                resp = self._session.get(url, params=params, timeout=self._timeout)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(t0, "error", attempt)
+                if attempt == self._max_retries:
+                    raise TiingoError(ticker, None, str(e)) from e
+                self._sleep_before_retry(attempt, None)
+                continue
+
+            self._record(t0, resp.status_code, attempt, len(resp.content))
+            if resp.status_code in self._RETRY_STATUS and attempt < self._max_retries:
+                self._sleep_before_retry(attempt, resp.headers.get("Retry-After"))
+                continue
+            if resp.status_code != 200:
+                raise TiingoError(ticker, resp.status_code, resp.text[:200])
+            return self._to_frame(resp.json())
+
+        raise TiingoError(ticker, None, "retries exhausted")
+
+    def _record(self, t0: float, status, attempt: int, size: int = 0) -> None:
+        if self.metrics is None:
+            return
+        self.metrics.observe("tiingo_request", time.perf_counter() - t0)
+        self.metrics.count("tiingo_requests", status=status)
+        self.metrics.count("tiingo_bytes_received", size)
+        if attempt:
+            self.metrics.count("tiingo_retries")
+
+    def _sleep_before_retry(self, attempt: int, retry_after: str | None) -> None:
+        delay = self._backoff * 2**attempt
+        if retry_after is not None:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        time.sleep(delay * random.uniform(0.5, 1.0))
+
+    @staticmethod
+    def _to_frame(rows: list[dict]) -> pd.DataFrame:
+        if not rows:
+            return pd.DataFrame(columns=["Close", "Volume"], index=pd.DatetimeIndex([], name="date"), dtype="f8")
+        df = pd.DataFrame(rows)
+        df.index = pd.DatetimeIndex(pd.to_datetime(df.pop("date"), utc=True).dt.tz_localize(None), name="date")
+        return df.rename(columns={"adjClose": "Close", "adjVolume": "Volume"})[["Close", "Volume"]]